@@ -25,6 +25,7 @@
         'views/views_account_payment.xml',
         'views/views_log_code_runtime.xml',
         'views/views_log_note.xml',
+        'views/views_sync_job.xml',
         'views/menu_log_note.xml',
         'views/views_pos_session.xml',
         'views/ir_sequence_view.xml',
@@ -73,6 +74,7 @@
         # 'reports/report_layout_templates.xml',
         # 'reports/sales_report_pdf.xml',
         # 'reports/portal_templates.xml',
+        # 'reports/ir_cron_data.xml',
     ],
     'assets': {
         'point_of_sale._assets_pos': [
@@ -4,6 +4,8 @@ from . import api_PATCH_for_Odoo
 from . import api_utils
 from . import master_configuration
 from . import odoo_client
+from . import async_client
+from . import multicall
 from . import data_integrator
 from . import data_transaksi
 from . import data_transaksiMCtoSS
@@ -6,7 +6,7 @@ from odoo.http import request
 import pytz
 import re
 import decimal
-from .api_utils import check_authorization, paginate_records, serialize_response, serialize_error_response
+from .api_utils import check_authorization, paginate_records, serialize_response, serialize_error_response, stream_ndjson_response, pickings_by_origin, pickings_by_product, authenticate_service_user
 import base64
 
 import logging
@@ -333,11 +333,7 @@ class MasterCouponPATCH(http.Controller):
                     'updated': []
                 }
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {
                     'status': "Error", 
@@ -1370,6 +1366,11 @@ class MasterCustomerAPI(http.Controller):
                 is_integrated_bool = str(is_integrated).lower() == 'true'
                 domain += [('is_integrated', '=', is_integrated_bool)]
 
+            # format=ndjson: seluruh hasil di-stream per baris, since = watermark next_since dari pull sebelumnya
+            if params.get('format') == 'ndjson':
+                jakarta_tz = pytz.timezone('Asia/Jakarta')
+                return stream_ndjson_response('res.partner', domain, lambda customer: self.serialize_customer(customer, jakarta_tz), params.get('since'))
+
             # ✅ Fetch data with pagination - ALWAYS use domain
             customers_data, total_records = paginate_records('res.partner', domain, pageSize, page)
 
@@ -1377,41 +1378,7 @@ class MasterCustomerAPI(http.Controller):
             jakarta_tz = pytz.timezone('Asia/Jakarta')
             
             for customer in customers_data:
-                create_date_utc = customer.create_date
-                create_date_jakarta = pytz.utc.localize(create_date_utc).astimezone(jakarta_tz)
-                
-                customer_data = {
-                    'id': customer.id,
-                    'create_date': str(create_date_jakarta),
-                    'name': customer.name,
-                    'street': customer.street if customer.street else "",
-                    'phone': customer.phone if customer.phone else "",
-                    'mobile': customer.mobile if customer.mobile else "",
-                    'email': customer.email if customer.email else "",
-                    'website': customer.website if customer.website else "",
-                    'title': customer.title.name if customer.title else "",
-                    'is_integrated': customer.is_integrated,
-                    'customer_rank': customer.customer_rank,
-                    'supplier_rank': customer.supplier_rank,
-                    'property_product_pricelist_id': customer.property_product_pricelist.id if customer.property_product_pricelist else None,
-                    'property_product_pricelist': customer.property_product_pricelist.name if customer.property_product_pricelist else "",
-                    'property_account_receivable_id': customer.property_account_receivable_id.id if customer.property_account_receivable_id else None,
-                    'property_account_receivable': customer.property_account_receivable_id.name if customer.property_account_receivable_id else "",
-                    'property_account_payable_id': customer.property_account_payable_id.id if customer.property_account_payable_id else None,
-                    'property_account_payable': customer.property_account_payable_id.name if customer.property_account_payable_id else "",
-                    'property_stock_customer_id': customer.property_stock_customer.id if customer.property_stock_customer else None,
-                    'property_stock_customer': customer.property_stock_customer.name if customer.property_stock_customer else "",
-                    'property_stock_supplier_id': customer.property_stock_supplier.id if customer.property_stock_supplier else None,
-                    'property_stock_supplier': customer.property_stock_supplier.name if customer.property_stock_supplier else "",
-                    'company_id': customer.company_id.id if customer.company_id else None,
-                    'company_name': customer.company_id.name if customer.company_id else "",
-                }
-                
-                # ✅ Hanya tambahkan customer_code jika ada isinya
-                if customer.customer_code:
-                    customer_data['customer_code'] = customer.customer_code
-                
-                data_master_customer.append(customer_data)
+                data_master_customer.append(self.serialize_customer(customer, jakarta_tz))
 
             total_pages = (total_records + pageSize - 1) // pageSize
 
@@ -1427,6 +1394,42 @@ class MasterCustomerAPI(http.Controller):
         except Exception as e:
             return serialize_error_response(str(e))
         
+    def serialize_customer(self, customer, jakarta_tz):
+        create_date_utc = customer.create_date
+        create_date_jakarta = pytz.utc.localize(create_date_utc).astimezone(jakarta_tz)
+
+        customer_data = {
+            'id': customer.id,
+            'create_date': str(create_date_jakarta),
+            'name': customer.name,
+            'street': customer.street if customer.street else "",
+            'phone': customer.phone if customer.phone else "",
+            'mobile': customer.mobile if customer.mobile else "",
+            'email': customer.email if customer.email else "",
+            'website': customer.website if customer.website else "",
+            'title': customer.title.name if customer.title else "",
+            'is_integrated': customer.is_integrated,
+            'customer_rank': customer.customer_rank,
+            'supplier_rank': customer.supplier_rank,
+            'property_product_pricelist_id': customer.property_product_pricelist.id if customer.property_product_pricelist else None,
+            'property_product_pricelist': customer.property_product_pricelist.name if customer.property_product_pricelist else "",
+            'property_account_receivable_id': customer.property_account_receivable_id.id if customer.property_account_receivable_id else None,
+            'property_account_receivable': customer.property_account_receivable_id.name if customer.property_account_receivable_id else "",
+            'property_account_payable_id': customer.property_account_payable_id.id if customer.property_account_payable_id else None,
+            'property_account_payable': customer.property_account_payable_id.name if customer.property_account_payable_id else "",
+            'property_stock_customer_id': customer.property_stock_customer.id if customer.property_stock_customer else None,
+            'property_stock_customer': customer.property_stock_customer.name if customer.property_stock_customer else "",
+            'property_stock_supplier_id': customer.property_stock_supplier.id if customer.property_stock_supplier else None,
+            'property_stock_supplier': customer.property_stock_supplier.name if customer.property_stock_supplier else "",
+            'company_id': customer.company_id.id if customer.company_id else None,
+            'company_name': customer.company_id.name if customer.company_id else "",
+        }
+
+        # ✅ Hanya tambahkan customer_code jika ada isinya
+        if customer.customer_code:
+            customer_data['customer_code'] = customer.customer_code
+        return customer_data
+
 class MasterLocationAPI(http.Controller):
     @http.route(['/api/master_location/'], type='http', auth='public', methods=['GET'], csrf=False)
     def master_location_get(self, createdDateFrom=None, createdDateTo=None, pageSize=200, page=1, location=None, company_id=None, **params):
@@ -1627,6 +1630,11 @@ class MasterProductItemAPI(http.Controller):
                 is_integrated_bool = str(is_integrated).lower() == 'true'
                 domain.append(('is_integrated', '=', is_integrated_bool))
 
+            # format=ndjson: katalog di-stream per batch tanpa menyusun array penuh di memori
+            if params.get('format') == 'ndjson':
+                jakarta_tz = pytz.timezone('Asia/Jakarta')
+                return stream_ndjson_response('product.template', domain, lambda product: self.serialize_product(product, jakarta_tz), params.get('since'))
+
             # Calculate offset for pagination
             offset = (page - 1) * pageSize
             
@@ -1659,39 +1667,7 @@ class MasterProductItemAPI(http.Controller):
             # Build response data
             data_master_product = []
             for product in product_data:
-                # Convert timezone
-                create_date_jakarta = pytz.utc.localize(product.create_date).astimezone(jakarta_tz)
-                
-                # Use list comprehension (faster than loops)
-                product_dict = {
-                    'id': product.id,
-                    'product_name': product.name,
-                    'product_code': product.default_code,
-                    'detailed_type': product.detailed_type,
-                    'invoice_policy': product.invoice_policy,
-                    'uom_id': product.uom_id.id,
-                    'uom': product.uom_id.name,
-                    'uom_po_id': product.uom_po_id.id,
-                    'uom_po': product.uom_po_id.name,
-                    'to_weight': product.to_weight,
-                    'list_price': product.list_price,
-                    'standard_price': product.standard_price,
-                    'categ_id': product.categ_id.id,
-                    'categ': product.categ_id.complete_name,
-                    'pos_categ_ids': [{'id': pc.id, 'name': pc.name} for pc in product.pos_categ_ids],
-                    'taxes_id': [{'id': t.id, 'name': t.name} for t in product.taxes_id],
-                    'supplier_taxes_id': [{'id': st.id, 'name': st.name} for st in product.supplier_taxes_id],
-                    'create_date': str(create_date_jakarta),
-                    'is_integrated': product.is_integrated,
-                    'vit_sub_div': product.vit_sub_div,
-                    'vit_item_kel': product.vit_item_kel,
-                    'vit_item_type': product.vit_item_type,
-                    'vit_item_brand': product.brand,
-                    'brand': product.brand,
-                    'company_id': product.company_id.id,
-                    'company_name': product.company_id.name
-                }
-                data_master_product.append(product_dict)
+                data_master_product.append(self.serialize_product(product, jakarta_tz))
 
             total_pages = (total_records + pageSize - 1) // pageSize
 
@@ -1707,6 +1683,41 @@ class MasterProductItemAPI(http.Controller):
         except Exception as e:
             return serialize_error_response(str(e))
         
+    def serialize_product(self, product, jakarta_tz):
+        # Convert timezone
+        create_date_jakarta = pytz.utc.localize(product.create_date).astimezone(jakarta_tz)
+
+        # Use list comprehension (faster than loops)
+        product_dict = {
+            'id': product.id,
+            'product_name': product.name,
+            'product_code': product.default_code,
+            'detailed_type': product.detailed_type,
+            'invoice_policy': product.invoice_policy,
+            'uom_id': product.uom_id.id,
+            'uom': product.uom_id.name,
+            'uom_po_id': product.uom_po_id.id,
+            'uom_po': product.uom_po_id.name,
+            'to_weight': product.to_weight,
+            'list_price': product.list_price,
+            'standard_price': product.standard_price,
+            'categ_id': product.categ_id.id,
+            'categ': product.categ_id.complete_name,
+            'pos_categ_ids': [{'id': pc.id, 'name': pc.name} for pc in product.pos_categ_ids],
+            'taxes_id': [{'id': t.id, 'name': t.name} for t in product.taxes_id],
+            'supplier_taxes_id': [{'id': st.id, 'name': st.name} for st in product.supplier_taxes_id],
+            'create_date': str(create_date_jakarta),
+            'is_integrated': product.is_integrated,
+            'vit_sub_div': product.vit_sub_div,
+            'vit_item_kel': product.vit_item_kel,
+            'vit_item_type': product.vit_item_type,
+            'vit_item_brand': product.brand,
+            'brand': product.brand,
+            'company_id': product.company_id.id,
+            'company_name': product.company_id.name
+        }
+        return product_dict
+
 class MasterStockTypeAPI(http.Controller):
     @http.route(['/api/master_type/'], type='http', auth='public', methods=['GET'], csrf=False)
     def master_type_get(self, createdDateFrom=None, createdDateTo=None, pageSize=200, page=1, q=None, **params):
@@ -2545,6 +2556,10 @@ class InvoiceOrder(http.Controller):
                 is_integrated_bool = str(is_integrated).lower() == 'true'
                 domain += [('is_integrated', '=', is_integrated_bool)]
 
+            # Invoice yang memiliki produk DP dikecualikan di domain agar total_records dan paging tetap benar
+            if 'gm_is_dp' in request.env['product.product']._fields:
+                domain += [('invoice_line_ids', 'not any', [('product_id.gm_is_dp', '=', True)])]
+
             # Fetch data
             if domain or q:
                 invoice_accounting, total_records = paginate_records('account.move', domain, pageSize, page)
@@ -2555,25 +2570,16 @@ class InvoiceOrder(http.Controller):
             data_invoice_accounting = []
             jakarta_tz = pytz.timezone('Asia/Jakarta')
 
+            # pos.order dan picking di-resolve sekali untuk seluruh halaman
+            order_pos = request.env['pos.order'].sudo().search([('state', '=', 'invoiced')], limit=1)
+            order_pos_picking = pickings_by_origin([order_pos.name]).get(order_pos.name) if order_pos else None
+
             for order in invoice_accounting:
                 try:
-                    # Check apakah invoice ini memiliki produk dengan gm_is_dp = True
-                    has_dp_product = False
-                    for line in order.invoice_line_ids:
-                        if line.product_id and hasattr(line.product_id, 'gm_is_dp') and line.product_id.gm_is_dp:
-                            has_dp_product = True
-                            break
-                    
-                    # Skip invoice yang memiliki produk DP
-                    if has_dp_product:
-                        _logger.info(f"Skipping invoice {order.name} - contains DP product")
-                        continue
-
-                    order_pos = request.env['pos.order'].sudo().search([('state', '=', 'invoiced')], limit=1)
                     location_id = location = location_dest_id = location_dest = None
 
                     if order_pos:
-                        pickings = request.env['stock.picking'].sudo().search([('origin', '=', order_pos.name)], limit=1)
+                        pickings = order_pos_picking
                         if pickings:
                             location_id = pickings.location_id.id
                             location = pickings.location_id.complete_name
@@ -2610,8 +2616,6 @@ class InvoiceOrder(http.Controller):
                     _logger.warning(f"Error processing invoice {order.id}: {str(line_error)}")
                     continue
 
-            # Hitung ulang total_records karena ada filter DP
-            total_records = len(data_invoice_accounting)
             total_pages = (total_records + pageSize - 1) // pageSize
 
             return serialize_response(data_invoice_accounting, total_records, total_pages)
@@ -2666,6 +2670,12 @@ class InvoiceOrder(http.Controller):
             # Cari tax PPNK sekali saja
             tax_ppnk = request.env['account.tax'].sudo().search([('name', 'ilike', 'PPNK')], limit=1)
 
+            # Picking untuk semua line dicari sekali, lalu dipetakan per product
+            first_picking, pickings_per_product = pickings_by_product([
+                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
+                ('origin', '=', invoicing.ref)
+            ])
+
             data_invoice_lines = []
             line_number = 0
             
@@ -2717,11 +2727,7 @@ class InvoiceOrder(http.Controller):
                     try:
                         if not is_service:
                             # Untuk produk storable/consumable, cari picking seperti biasa
-                            pickings = request.env['stock.picking'].sudo().search([
-                                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
-                                ('origin', '=', invoicing.ref),
-                                ('move_ids_without_package.product_id', '=', line.product_id.id)
-                            ], limit=1)
+                            pickings = pickings_per_product.get(line.product_id.id)
 
                             if pickings:
                                 location_id = pickings.location_id.id
@@ -2742,10 +2748,7 @@ class InvoiceOrder(http.Controller):
                             _logger.info(f"Line {line.id} is SERVICE type, processing location")
                             
                             # Cari picking dulu untuk dapat location_id
-                            pickings = request.env['stock.picking'].sudo().search([
-                                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
-                                ('origin', '=', invoicing.ref)
-                            ], limit=1)
+                            pickings = first_picking
                             
                             if pickings:
                                 location_id = pickings.location_id.id
@@ -3083,18 +3086,26 @@ class CrediNoteAPI(http.Controller):
             location_id = None
             location = None
 
+            # Fallback pos.order by ref dan picking per pos.order di-resolve sekali untuk seluruh halaman
+            order_pos_refs = [order.ref for order in invoice_accounting if order.ref and not order.pos_order_ids.filtered(lambda p: p.state == 'invoiced')]
+            order_pos_by_ref = {}
+            if order_pos_refs:
+                for pos_order in request.env['pos.order'].sudo().search([('name', 'in', order_pos_refs), ('state', '=', 'invoiced')]):
+                    order_pos_by_ref.setdefault(pos_order.name, pos_order)
+            pickings_by_order_pos = pickings_by_origin(invoice_accounting.pos_order_ids.mapped('name') + list(order_pos_by_ref))
+
             for order in invoice_accounting:
                 # Cari pos.order dari relasi langsung
                 order_pos = order.pos_order_ids.filtered(lambda p: p.state == 'invoiced')
                 if not order_pos and order.ref:
                     # Fallback: cari berdasarkan name yang match dengan ref
-                    order_pos = request.env['pos.order'].sudo().search([('name', '=', order.ref), ('state', '=', 'invoiced')], limit=1)
+                    order_pos = order_pos_by_ref.get(order.ref)
                 
                 if not order_pos:  # Skip if no related pos.order is found
                     continue
 
                 for record in order_pos:
-                    pickings = request.env['stock.picking'].sudo().search([('origin', '=', record.name)], limit=1)
+                    pickings = pickings_by_order_pos.get(record.name)
                     if pickings:
                         location_id = pickings.location_dest_id.id
                         location = pickings.location_dest_id.complete_name
@@ -3168,6 +3179,12 @@ class CrediNoteAPI(http.Controller):
             # Cari tax PPNK sekali saja
             tax_ppnk = request.env['account.tax'].sudo().search([('name', 'ilike', 'PPNK')], limit=1)
 
+            # Picking untuk semua line dicari sekali, lalu dipetakan per product
+            first_picking, pickings_per_product = pickings_by_product([
+                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
+                ('origin', '=', invoicing.ref)
+            ])
+
             data_invoice_lines = []
             line_number = 0
             
@@ -3210,11 +3227,7 @@ class CrediNoteAPI(http.Controller):
                     try:
                         if not is_service:
                             # Untuk produk storable/consumable, cari picking seperti biasa
-                            pickings = request.env['stock.picking'].sudo().search([
-                                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
-                                ('origin', '=', invoicing.ref),
-                                ('move_ids_without_package.product_id', '=', line.product_id.id)
-                            ], limit=1)
+                            pickings = pickings_per_product.get(line.product_id.id)
 
                             if pickings:
                                 location_id = pickings.location_id.id
@@ -3235,10 +3248,7 @@ class CrediNoteAPI(http.Controller):
                             _logger.info(f"Line {line.id} is SERVICE type, processing location")
                             
                             # Cari picking dulu untuk dapat location_id
-                            pickings = request.env['stock.picking'].sudo().search([
-                                ('pos_order_id', '=', invoicing.pos_order_ids[0].id if invoicing.pos_order_ids else False),
-                                ('origin', '=', invoicing.ref)
-                            ], limit=1)
+                            pickings = first_picking
                             
                             if pickings:
                                 location_id = pickings.location_id.id
@@ -3390,8 +3400,10 @@ class PurchaseOrder(http.Controller):
             location = None
             location_dest_id = None
             location_dest = None
+            # Picking pertama per purchase order, satu search untuk seluruh halaman
+            pickings_by_order = pickings_by_origin(purchase_order.mapped('name'))
             for order in purchase_order:
-                pickings = request.env['stock.picking'].sudo().search([('origin', '=', order.name)], limit=1)
+                pickings = pickings_by_order.get(order.name, request.env['stock.picking'])
                 location_id = pickings.location_id.id
                 location = pickings.location_id.complete_name
                 location_dest_id = pickings.location_dest_id.id
@@ -3453,9 +3465,12 @@ class PurchaseOrder(http.Controller):
             create_date_jakarta = pytz.utc.localize(create_date_utc).astimezone(jakarta_tz)
             create_date = str(create_date_jakarta)
 
+            # Picking untuk semua line dicari sekali, lalu dipetakan per product
+            pickings_per_product = pickings_by_product([('origin', '=', purchase_order.name)])[1]
+
             data_po_lines = []
             for line_number, line in enumerate(purchase_lines, start=1):
-                pickings = request.env['stock.picking'].sudo().search([('origin', '=', purchase_order.name), ('move_ids_without_package.product_id', '=', line.product_id.id)], limit=1)
+                pickings = pickings_per_product.get(line.product_id.id)
                 location_id = pickings.location_id.id if pickings else None
                 location = pickings.location_id.complete_name if pickings else None
                 location_dest_id = pickings.location_dest_id.id if pickings else None
@@ -3,7 +3,7 @@ from odoo.http import request
 import json
 from odoo.exceptions import AccessError
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from .api_utils import check_authorization, paginate_records, serialize_response, serialize_error_response
+from .api_utils import check_authorization, paginate_records, serialize_response, serialize_error_response, authenticate_service_user
 import logging
 _logger = logging.getLogger(__name__)
 
@@ -135,11 +135,7 @@ class MasterEmployeePATCH(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -238,11 +234,7 @@ class MasterItemPATCH(http.Controller):
             if not config:
                 return {'code': 500, 'status': 'Failed', 'message': 'Configuration not found.'}
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'code': 401, 'status': 'Failed', 'message': 'Authentication failed.'}
 
@@ -413,7 +405,7 @@ class MasterPricelistPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -512,7 +504,7 @@ class MasterCategoryPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -581,7 +573,7 @@ class MasterPoSCategoryPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -644,7 +636,7 @@ class GoodsIssuePATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -717,7 +709,7 @@ class GoodsReceiptPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -790,7 +782,7 @@ class GRPOPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -876,7 +868,7 @@ def update_stock_picking(return_id, gm_type_transfer, operation_name):
         password = config.vit_config_password_api
 
         # Manual authentication
-        uid = request.session.authenticate(request.session.db, username, password)
+        uid = authenticate_service_user(username, password)
         if not uid:
             return {
                 'status': "Failed",
@@ -959,7 +951,7 @@ class AccountMovePATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -1042,7 +1034,7 @@ class PaymentPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -1117,7 +1109,7 @@ class PurchaseOrderPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {
                     'status': "Failed",
@@ -1204,7 +1196,7 @@ class ManufactureOrderPATCH(http.Controller):
             password = config.vit_config_password_api
 
             # Manual authentication
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -1259,7 +1251,7 @@ class UnbuildOrderPATCH(http.Controller):
             username = config.vit_config_username
             password = config.vit_config_password_api
 
-            uid = request.session.authenticate(request.session.db, username, password)
+            uid = authenticate_service_user(username, password)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
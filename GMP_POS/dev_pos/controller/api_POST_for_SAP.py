@@ -7,6 +7,7 @@ import json
 import logging
 import base64
 from odoo.exceptions import AccessError
+from .api_utils import authenticate_service_user
 
 _logger = logging.getLogger(__name__)
 
@@ -34,11 +35,7 @@ class POSTMasterTax(http.Controller):
                     'message': "Configuration not found."
                 })
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return request.make_json_response({
                     'status': "Failed",
@@ -174,7 +171,7 @@ class POSTEmployee(http.Controller):
                     'message': "Configuration not found."
                 })
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return request.make_json_response({
                     'status': "Failed", 
@@ -336,7 +333,7 @@ class POSTMasterBoM(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -552,6 +549,9 @@ class POSTMasterBoM(http.Controller):
             }
 
 class POSTMasterItem(http.Controller):
+    # Jumlah item yang di-resolve, di-create/write dan di-commit bersama
+    BATCH_SIZE = 500
+
     @http.route('/api/master_item', type='json', auth='none', methods=['POST'], csrf=False)
     def post_master_item(self, **kw):
         try:
@@ -566,11 +566,7 @@ class POSTMasterItem(http.Controller):
                     'message': 'Configuration not found.'
                 }
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {
                     'code': 401,
@@ -604,179 +600,11 @@ class POSTMasterItem(http.Controller):
             updated = []
             failed = []
 
-            # Process each item
-            for data_item in items:
-                try:
-                    product_code = data_item.get('product_code')
-                    if not product_code:
-                        failed.append({
-                            'data': data_item,
-                            'company_id': None,
-                            'company_name': None,
-                            'message': "Missing product_code",
-                            'id': None
-                        })
-                        continue
-
-                    # Loop through all companies
-                    for company in companies:
-                        try:
-                            # Start a new savepoint for each company iteration
-                            savepoint_name = f'company_{company.id}_product_{product_code}'
-                            env.cr.execute(f'SAVEPOINT {savepoint_name}')
-                            
-                            # Cek apakah product sudah ada
-                            existing_product = env['product.template'].sudo().search([
-                                ('default_code', '=', product_code),
-                                ('company_id', '=', company.id)
-                            ], limit=1)
-                            
-                            # Cek kategori
-                            category_name = data_item.get('category_name')
-                            category_id = False
-                            if category_name:
-                                category = env['product.category'].sudo().search([
-                                    ('complete_name', '=', category_name),
-                                ], limit=1)
-                                category_id = category.id if category else False
-
-                            # UOM - Support string name
-                            uom_id = data_item.get('uom_id', 1)
-                            if isinstance(uom_id, str):
-                                uom = env['uom.uom'].sudo().search([
-                                    ('name', '=', uom_id)
-                                ], limit=1)
-                                if not uom:
-                                    raise ValueError(f"UOM '{uom_id}' not found")
-                                uom_id = uom.id
-                            
-                            uom_po_id = data_item.get('uom_po_id', 1)
-                            if isinstance(uom_po_id, str):
-                                uom_po = env['uom.uom'].sudo().search([
-                                    ('name', '=', uom_po_id)
-                                ], limit=1)
-                                if not uom_po:
-                                    raise ValueError(f"UOM PO '{uom_po_id}' not found")
-                                uom_po_id = uom_po.id
-
-                            # POS Category
-                            pos_categ_command = []
-                            pos_categ_data = data_item.get('pos_categ_ids', data_item.get('pos_categ_id', []))
-                            if not isinstance(pos_categ_data, list):
-                                pos_categ_data = [pos_categ_data]
-                            
-                            for categ_item in pos_categ_data:
-                                if isinstance(categ_item, str):
-                                    # Search by name if string
-                                    pos_category = env['pos.category'].sudo().search([
-                                        ('name', '=', categ_item),
-                                    ], limit=1)
-                                    if pos_category:
-                                        pos_categ_command.append((4, pos_category.id))
-                                elif isinstance(categ_item, int):
-                                    # Use ID directly if integer
-                                    pos_category = env['pos.category'].sudo().search([
-                                        ('id', '=', categ_item),
-                                    ], limit=1)
-                                    if pos_category:
-                                        pos_categ_command.append((4, categ_item))
-
-                            # Pajak
-                            tax_command = []
-                            tax_names = data_item.get('taxes_names', data_item.get('taxes_name', []))
-                            if not isinstance(tax_names, list):
-                                tax_names = [tax_names]
-                            for tax_name in tax_names:
-                                tax = env['account.tax'].sudo().search([
-                                    ('name', '=', tax_name),
-                                    '|',
-                                    ('company_id', '=', company.id),
-                                    ('company_id', '=', False)
-                                ], limit=1)
-                                if tax:
-                                    tax_command.append((4, tax.id))
-
-                            # Data produk
-                            cost = data_item.get('standard_price', data_item.get('cost', 0.0))
-                            product_data = {
-                                'name': data_item.get('product_name'),
-                                'active': data_item.get('active', True),
-                                'default_code': product_code,
-                                'detailed_type': data_item.get('product_type', 'product'),
-                                'invoice_policy': data_item.get('invoice_policy', 'order'),
-                                'create_date': data_item.get('create_date'),
-                                'list_price': data_item.get('sales_price', 0.0),
-                                'standard_price': cost,
-                                'uom_id': uom_id,
-                                'uom_po_id': uom_po_id,
-                                'pos_categ_ids': [(6, 0, [x[1] for x in pos_categ_command])] if pos_categ_command else False,
-                                'categ_id': category_id,
-                                'taxes_id': [(6, 0, [x[1] for x in tax_command])] if tax_command else False,
-                                'available_in_pos': data_item.get('available_in_pos', True),
-                                'image_1920': data_item.get('image_1920'),
-                                'barcode': data_item.get('barcode'),
-                                'vit_sub_div': data_item.get('vit_sub_div'),
-                                'vit_item_kel': data_item.get('vit_item_kel'),
-                                'vit_item_type': data_item.get('vit_item_type'),
-                                'brand': data_item.get('vit_item_brand'),
-                                'company_id': company.id,
-                            }
-
-                            if existing_product:
-                                # Update existing product
-                                existing_product.write(product_data)
-                                updated.append({
-                                    'id': existing_product.id,
-                                    'product_code': existing_product.default_code,
-                                    'name': existing_product.name,
-                                    'company_id': company.id,
-                                    'company_name': company.name,
-                                    'list_price': existing_product.list_price,
-                                    'action': 'updated'
-                                })
-                            else:
-                                # Create new product
-                                product_data['create_uid'] = uid
-                                product = env['product.template'].sudo().create(product_data)
-                                created.append({
-                                    'id': product.id,
-                                    'product_code': product.default_code,
-                                    'name': product.name,
-                                    'company_id': company.id,
-                                    'company_name': company.name,
-                                    'list_price': product.list_price,
-                                    'action': 'created'
-                                })
-                            
-                            # Release savepoint if successful
-                            env.cr.execute(f'RELEASE SAVEPOINT {savepoint_name}')
-
-                        except Exception as e:
-                            # Rollback to savepoint on error
-                            try:
-                                env.cr.execute(f'ROLLBACK TO SAVEPOINT {savepoint_name}')
-                            except:
-                                pass
-                            
-                            failed.append({
-                                'data': data_item,
-                                'company_id': company.id,
-                                'company_name': company.name,
-                                'message': f"Error: {str(e)}",
-                                'id': None
-                            })
-
-                except Exception as e:
-                    failed.append({
-                        'data': data_item,
-                        'company_id': None,
-                        'company_name': None,
-                        'message': f"Error: {str(e)}",
-                        'id': None
-                    })
-
-            # Commit transaction
-            env.cr.commit()
+            # Item diproses per batch: referensi di-resolve dengan beberapa query per batch,
+            # lalu create/write multi-record dan commit per batch agar transaksi tidak tertahan lama
+            for i in range(0, len(items), self.BATCH_SIZE):
+                self.import_master_item_batch(env, uid, companies, items[i:i + self.BATCH_SIZE], created, updated, failed)
+                env.cr.commit()
 
             # Return response
             return {
@@ -800,6 +628,236 @@ class POSTMasterItem(http.Controller):
                 'message': f"Failed to process items: {str(e)}"
             }
 
+    def import_master_item_batch(self, env, uid, companies, items, created, updated, failed):
+        # product_code yang sama dalam satu batch diproses bergiliran: setiap putaran hanya kemunculan
+        # pertama, duplikatnya (jadi update) di putaran berikutnya sampai tidak ada yang tertunda
+        while items:
+            valid_items = []
+            deferred_items = []
+            product_codes = set()
+            for data_item in items:
+                product_code = data_item.get('product_code') if isinstance(data_item, dict) else None
+                if not product_code:
+                    failed.append({
+                        'data': data_item,
+                        'company_id': None,
+                        'company_name': None,
+                        'message': "Missing product_code",
+                        'id': None
+                    })
+                elif product_code in product_codes:
+                    # Diproses di putaran berikutnya, setelah kemunculan pertama dibuat/diupdate
+                    deferred_items.append(data_item)
+                else:
+                    product_codes.add(product_code)
+                    valid_items.append(data_item)
+
+            if valid_items:
+                refs = self.resolve_master_item_refs(env, companies, valid_items)
+                create_rows = []
+                write_rows = []
+                for data_item in valid_items:
+                    for company in companies:
+                        try:
+                            product_data = self.prepare_master_item_vals(data_item, company, refs)
+                        except Exception as e:
+                            failed.append(self.master_item_failed(data_item, company, e))
+                            continue
+
+                        existing_product = refs['products'].get((data_item['product_code'], company.id))
+                        if existing_product:
+                            write_rows.append((data_item, company, existing_product, product_data))
+                        else:
+                            product_data['create_uid'] = uid
+                            create_rows.append((data_item, company, product_data))
+
+                self.apply_master_item_writes(env, write_rows, updated, failed)
+                self.apply_master_item_creates(env, create_rows, created, failed)
+
+            items = deferred_items
+
+    # Resolve semua product, kategori, UoM, POS category dan pajak yang direferensikan batch dengan satu query per model
+    def resolve_master_item_refs(self, env, companies, items):
+        category_names = set()
+        uom_names = set()
+        pos_categ_names = set()
+        pos_categ_ids = set()
+        tax_names = set()
+        for data_item in items:
+            if data_item.get('category_name'):
+                category_names.add(data_item['category_name'])
+            for uom_field in ('uom_id', 'uom_po_id'):
+                if isinstance(data_item.get(uom_field), str):
+                    uom_names.add(data_item[uom_field])
+            for categ_item in self.as_list(data_item.get('pos_categ_ids', data_item.get('pos_categ_id', []))):
+                if isinstance(categ_item, str):
+                    pos_categ_names.add(categ_item)
+                elif isinstance(categ_item, int):
+                    pos_categ_ids.add(categ_item)
+            tax_names.update(self.as_list(data_item.get('taxes_names', data_item.get('taxes_name', []))))
+
+        refs = {'products': {}, 'categories': {}, 'uoms': {}, 'pos_categ_names': {}, 'pos_categ_ids': set(), 'taxes': {}}
+
+        products = env['product.template'].sudo().search([
+            ('default_code', 'in', [data_item['product_code'] for data_item in items]),
+            ('company_id', 'in', companies.ids)
+        ])
+        for product in products:
+            refs['products'].setdefault((product.default_code, product.company_id.id), product)
+
+        if category_names:
+            for category in env['product.category'].sudo().search([('complete_name', 'in', list(category_names))]):
+                refs['categories'].setdefault(category.complete_name, category.id)
+
+        if uom_names:
+            for uom in env['uom.uom'].sudo().search([('name', 'in', list(uom_names))]):
+                refs['uoms'].setdefault(uom.name, uom.id)
+
+        if pos_categ_names:
+            for pos_category in env['pos.category'].sudo().search([('name', 'in', list(pos_categ_names))]):
+                refs['pos_categ_names'].setdefault(pos_category.name, pos_category.id)
+        if pos_categ_ids:
+            refs['pos_categ_ids'] = set(env['pos.category'].sudo().search([('id', 'in', list(pos_categ_ids))]).ids)
+
+        if tax_names:
+            taxes = env['account.tax'].sudo().search([
+                ('name', 'in', list(tax_names)),
+                '|',
+                ('company_id', 'in', companies.ids),
+                ('company_id', '=', False)
+            ])
+            # Pajak milik company atau tanpa company, yang pertama sesuai urutan search dipakai
+            for tax in taxes:
+                for company in companies:
+                    if not tax.company_id or tax.company_id.id == company.id:
+                        refs['taxes'].setdefault((tax.name, company.id), tax.id)
+
+        return refs
+
+    def prepare_master_item_vals(self, data_item, company, refs):
+        category_name = data_item.get('category_name')
+        category_id = refs['categories'].get(category_name, False) if category_name else False
+
+        # UOM - Support string name
+        uom_id = data_item.get('uom_id', 1)
+        if isinstance(uom_id, str):
+            if uom_id not in refs['uoms']:
+                raise ValueError(f"UOM '{uom_id}' not found")
+            uom_id = refs['uoms'][uom_id]
+
+        uom_po_id = data_item.get('uom_po_id', 1)
+        if isinstance(uom_po_id, str):
+            if uom_po_id not in refs['uoms']:
+                raise ValueError(f"UOM PO '{uom_po_id}' not found")
+            uom_po_id = refs['uoms'][uom_po_id]
+
+        # POS Category, by name (string) atau ID (integer)
+        pos_categ_ids = []
+        for categ_item in self.as_list(data_item.get('pos_categ_ids', data_item.get('pos_categ_id', []))):
+            if isinstance(categ_item, str) and categ_item in refs['pos_categ_names']:
+                pos_categ_ids.append(refs['pos_categ_names'][categ_item])
+            elif isinstance(categ_item, int) and categ_item in refs['pos_categ_ids']:
+                pos_categ_ids.append(categ_item)
+
+        # Pajak
+        tax_ids = []
+        for tax_name in self.as_list(data_item.get('taxes_names', data_item.get('taxes_name', []))):
+            if (tax_name, company.id) in refs['taxes']:
+                tax_ids.append(refs['taxes'][(tax_name, company.id)])
+
+        cost = data_item.get('standard_price', data_item.get('cost', 0.0))
+        return {
+            'name': data_item.get('product_name'),
+            'active': data_item.get('active', True),
+            'default_code': data_item['product_code'],
+            'detailed_type': data_item.get('product_type', 'product'),
+            'invoice_policy': data_item.get('invoice_policy', 'order'),
+            'create_date': data_item.get('create_date'),
+            'list_price': data_item.get('sales_price', 0.0),
+            'standard_price': cost,
+            'uom_id': uom_id,
+            'uom_po_id': uom_po_id,
+            'pos_categ_ids': [(6, 0, pos_categ_ids)] if pos_categ_ids else False,
+            'categ_id': category_id,
+            'taxes_id': [(6, 0, tax_ids)] if tax_ids else False,
+            'available_in_pos': data_item.get('available_in_pos', True),
+            'image_1920': data_item.get('image_1920'),
+            'barcode': data_item.get('barcode'),
+            'vit_sub_div': data_item.get('vit_sub_div'),
+            'vit_item_kel': data_item.get('vit_item_kel'),
+            'vit_item_type': data_item.get('vit_item_type'),
+            'brand': data_item.get('vit_item_brand'),
+            'company_id': company.id,
+        }
+
+    # Create semua produk baru dalam satu call, jika gagal (satu row invalid membatalkan seluruh batch)
+    # create diulang per row dengan savepoint agar error tetap dilaporkan per item
+    def apply_master_item_creates(self, env, create_rows, created, failed):
+        if not create_rows:
+            return
+        try:
+            with env.cr.savepoint():
+                products = env['product.template'].sudo().create([product_data for data_item, company, product_data in create_rows])
+            results = [(data_item, company, product) for (data_item, company, product_data), product in zip(create_rows, products)]
+        except Exception:
+            results = []
+            for data_item, company, product_data in create_rows:
+                try:
+                    with env.cr.savepoint():
+                        results.append((data_item, company, env['product.template'].sudo().create(product_data)))
+                except Exception as e:
+                    failed.append(self.master_item_failed(data_item, company, e))
+
+        for data_item, company, product in results:
+            created.append(self.master_item_result(product, company, 'created'))
+
+    # Vals berbeda per produk (nama, kode, harga, gambar, company), jadi write tetap per produk
+    # dalam satu savepoint; jika gagal diulang per row seperti apply_master_item_creates
+    def apply_master_item_writes(self, env, write_rows, updated, failed):
+        if not write_rows:
+            return
+        try:
+            with env.cr.savepoint():
+                for data_item, company, product, product_data in write_rows:
+                    product.write(product_data)
+            results = [(data_item, company, product) for data_item, company, product, product_data in write_rows]
+        except Exception:
+            results = []
+            for data_item, company, product, product_data in write_rows:
+                try:
+                    with env.cr.savepoint():
+                        product.write(product_data)
+                    results.append((data_item, company, product))
+                except Exception as e:
+                    failed.append(self.master_item_failed(data_item, company, e))
+
+        for data_item, company, product in results:
+            updated.append(self.master_item_result(product, company, 'updated'))
+
+    def master_item_result(self, product, company, action):
+        return {
+            'id': product.id,
+            'product_code': product.default_code,
+            'name': product.name,
+            'company_id': company.id,
+            'company_name': company.name,
+            'list_price': product.list_price,
+            'action': action
+        }
+
+    def master_item_failed(self, data_item, company, error):
+        return {
+            'data': data_item,
+            'company_id': company.id,
+            'company_name': company.name,
+            'message': f"Error: {str(error)}",
+            'id': None
+        }
+
+    def as_list(self, value):
+        return value if isinstance(value, list) else [value]
+
+
 
 class POSTMasterPricelist(http.Controller):
     @http.route('/api/master_pricelist', type='json', auth='none', methods=['POST'], csrf=False)
@@ -810,7 +868,7 @@ class POSTMasterPricelist(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -1063,11 +1121,7 @@ class POSTMasterUoM(http.Controller):
                     'message': 'Configuration not found.'
                 }
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {
                     'status': 'Failed',
@@ -1238,7 +1292,7 @@ class POSTCustomerGroup(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -1415,11 +1469,7 @@ class POSTMasterCustomer(http.Controller):
                     'message': 'Configuration not found.'
                 }
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {
                     'status': 'Failed',
@@ -1682,11 +1732,7 @@ class MasterCustomerPATCH(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -1846,11 +1892,7 @@ class POSTMasterWarehouse(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -2107,11 +2149,7 @@ class POSTItemCategory(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
 
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
@@ -2193,7 +2231,7 @@ class POSTItemPoSCategory(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
             
@@ -2286,7 +2324,7 @@ class POSTGoodsReceipt(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -2492,7 +2530,7 @@ class POSTGoodsIssue(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
             
-            uid = request.session.authenticate(request.session.db, config.vit_config_username, config.vit_config_password_api)
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
@@ -2729,11 +2767,7 @@ class POSTPurchaseOrderFromSAP(http.Controller):
             if not config:
                 return {'status': "Failed", 'code': 500, 'message': "Configuration not found."}
 
-            uid = request.session.authenticate(
-                request.session.db,
-                config.vit_config_username,
-                config.vit_config_password_api
-            )
+            uid = authenticate_service_user(config.vit_config_username, config.vit_config_password_api)
             if not uid:
                 return {'status': "Failed", 'code': 401, 'message': "Authentication failed."}
 
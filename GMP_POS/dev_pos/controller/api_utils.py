@@ -1,6 +1,9 @@
 # api_utils.py
 import json
-from odoo import http, _
+import hmac
+import time
+import hashlib
+from odoo import http, api, fields, _
 import werkzeug.exceptions
 
 def check_authorization():
@@ -8,29 +11,151 @@ def check_authorization():
     if not request_auth_header:
         raise werkzeug.exceptions.Unauthorized(_('Authorization header not found.'))
     
-    # Retrieve all tokens for Odoo, SAP, and Netsuite
-    token_records = http.request.env['token.generate'].sudo().search([
-        ('vit_client_name', 'in', ['Odoo', 'SAP', 'Netsuite'])
-    ])
+    # Token Odoo, SAP, dan Netsuite dibaca dari cache token.generate (sha256 token -> (token, client)),
+    # lalu dibandingkan dengan compare_digest agar waktu perbandingan tidak bergantung isi token
+    token_clients = http.request.env['token.generate'].sudo()._get_token_clients()
+    token = token_clients.get(hashlib.sha256(request_auth_header.encode()).hexdigest())
     
-    # Check if the request header matches any of the stored tokens
-    valid_token = False
-    for token in token_records:
-        if token.vit_encrypt == request_auth_header:
-            valid_token = True
-            break
-    
-    if not valid_token:
+    if not token or not hmac.compare_digest(token[0], request_auth_header):
         raise werkzeug.exceptions.Unauthorized(_('Invalid authorization header.'))
 
-def paginate_records(model, domain, pageSize, page):
+# Autentikasi user API dari kredensial setting.config. uid hasil autentikasi di-cache per proses selama
+# SERVICE_AUTH_TTL detik sehingga verifikasi password hanya sesekali, request berikutnya cukup memasang uid ke request.env
+SERVICE_AUTH_TTL = 300
+_service_uids = {}
+
+def authenticate_service_user(username, password):
+    request = http.request
+    key = (request.session.db, username, hashlib.sha256((password or '').encode()).hexdigest())
+    cached = _service_uids.get(key)
+    if cached and cached[1] > time.monotonic():
+        request.update_env(user=cached[0])
+        return cached[0]
+
+    uid = request.session.authenticate(request.session.db, username, password)
+    if uid:
+        _service_uids[key] = (uid, time.monotonic() + SERVICE_AUTH_TTL)
+    return uid
+
+# Pagination: default memakai page/offset seperti sebelumnya. Jika request membawa parameter 'cursor'
+# dipakai keyset pagination (tanpa offset) dengan urutan 'id asc' atau 'write_date asc, id asc' (cursorField=write_date).
+# Halaman pertama: cursor=0, halaman berikutnya: cursor = next_cursor dari response sebelumnya.
+# search_count hanya dijalankan di halaman pertama, halaman cursor berikutnya mengembalikan total_records 0
+def paginate_records(model, domain, pageSize, page, cursor=None, cursor_field=None):
     pageSize = int(pageSize)
-    page = max(1, int(page))
-    offset = pageSize * (page - 1)
-    total_records = http.request.env[model].sudo().search_count(domain)
-    records = http.request.env[model].sudo().search(domain, limit=pageSize, offset=offset)
+    Model = http.request.env[model].sudo()
+
+    params = http.request.params
+    cursor = params.get('cursor') if cursor is None else cursor
+    if cursor is None or cursor == '':
+        page = max(1, int(page))
+        offset = pageSize * (page - 1)
+        records = Model.search(domain, limit=pageSize, offset=offset)
+        return records, Model.search_count(domain)
+
+    cursor_field = cursor_field or params.get('cursorField') or 'id'
+    if cursor_field not in ('id', 'write_date'):
+        raise bad_request(_("cursorField must be 'id' or 'write_date'."))
+
+    cursor = str(cursor)
+    total_records = Model.search_count(domain) if cursor == '0' else 0
+    if cursor_field == 'id':
+        if not cursor.isdigit():
+            raise bad_request(_("cursor must be a non-negative integer when cursorField is 'id'."))
+        records = Model.search(domain + [('id', '>', int(cursor))], order='id asc', limit=pageSize)
+        next_cursor = str(records[-1].id) if len(records) == pageSize else None
+    else:
+        keyset_domain = write_date_cursor_domain(cursor) if cursor != '0' else []
+        records = Model.search(domain + keyset_domain, order='write_date asc, id asc', limit=pageSize)
+        next_cursor = f"{records[-1].write_date}|{records[-1].id}" if len(records) == pageSize else None
+
+    # Dibaca serialize_response untuk mengisi next_cursor di response
+    http.request.api_next_cursor = next_cursor
     return records, total_records
 
+# Parameter pagination yang tidak valid: HTTPException dengan body yang sama seperti serialize_error_response (400)
+def bad_request(error_description):
+    return werkzeug.exceptions.BadRequest(error_description, response=serialize_error_response(error_description))
+
+# Cursor write_date: '<write_date>|<id>' (id sebagai tie-breaker untuk write_date yang sama),
+# atau '<write_date>' saja untuk semua record yang berubah sejak tanggal tersebut
+def write_date_cursor_domain(cursor):
+    cursor_date, separator, cursor_id = cursor.partition('|')
+    try:
+        fields.Datetime.to_datetime(cursor_date[:19])
+    except ValueError:
+        raise bad_request(_("Invalid write_date cursor: %s", cursor))
+    if not separator:
+        return [('write_date', '>=', cursor_date)]
+    if not cursor_id.isdigit():
+        raise bad_request(_("Invalid write_date cursor: %s", cursor))
+    return ['|', ('write_date', '>', cursor_date), '&', ('write_date', '=', cursor_date), ('id', '>', int(cursor_id))]
+
+# Response NDJSON (satu record per baris) untuk export besar. Record dibaca per STREAM_BATCH_SIZE dengan keyset
+# (write_date, id) mulai dari watermark since, cache ORM dibersihkan per batch agar memori worker tetap datar.
+# Baris terakhir berisi total_records dan next_since untuk pull berikutnya
+STREAM_BATCH_SIZE = 500
+
+def stream_ndjson_response(model, domain, serialize_record, since=None):
+    # Generator dijalankan setelah controller selesai (cursor request sudah ditutup), jadi memakai cursor sendiri
+    registry = http.request.env.registry
+    uid = http.request.env.uid
+    context = dict(http.request.env.context)
+    domain = list(domain)
+    if since:
+        # Divalidasi sebelum response mulai dikirim, error di dalam generator tidak bisa jadi response 400
+        write_date_cursor_domain(since)
+
+    def generate():
+        cursor = since or None
+        total_records = 0
+        with registry.cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            Model = env[model].sudo()
+            while True:
+                keyset_domain = write_date_cursor_domain(cursor) if cursor else []
+                records = Model.search(domain + keyset_domain, order='write_date asc, id asc', limit=STREAM_BATCH_SIZE)
+                for record in records:
+                    yield (json.dumps(serialize_record(record)) + '\n').encode('utf-8')
+                total_records += len(records)
+                if records:
+                    cursor = f"{records[-1].write_date}|{records[-1].id}"
+                if len(records) < STREAM_BATCH_SIZE:
+                    break
+                env.invalidate_all()
+        yield (json.dumps({'status': 200, 'message': 'success', 'total_records': total_records, 'next_since': cursor}) + '\n').encode('utf-8')
+
+    return werkzeug.wrappers.Response(
+        generate(),
+        status=200,
+        content_type='application/x-ndjson; charset=utf-8',
+        direct_passthrough=True
+    )
+
+# Helper serializer dokumen: relasi yang dulu di-search per record/per line di-resolve
+# sekali per halaman/dokumen. Akses field biasa (order.partner_id.name dst) sudah di-batch oleh prefetch ORM
+
+# Picking pertama (urutan default stock.picking) per origin, pengganti search origin limit=1 per record
+def pickings_by_origin(origins, domain=None):
+    origins = list({origin for origin in origins if origin})
+    result = {}
+    if not origins:
+        return result
+    pickings = http.request.env['stock.picking'].sudo().search([('origin', 'in', origins)] + (domain or []))
+    for picking in pickings:
+        result.setdefault(picking.origin, picking)
+    return result
+
+# Picking pertama per product dari satu search, pengganti search ('move_ids_without_package.product_id', '=', ...) limit=1 per line.
+# Return (picking pertama tanpa filter product, {product_id: picking})
+def pickings_by_product(domain):
+    pickings = http.request.env['stock.picking'].sudo().search(domain)
+    result = {}
+    for picking in pickings:
+        for product in picking.move_ids_without_package.product_id:
+            result.setdefault(product.id, picking)
+    return pickings[:1], result
+
 def serialize_response(data, total_records, total_pages):
     response_data = {
         'status': 200,
@@ -39,6 +164,8 @@ def serialize_response(data, total_records, total_pages):
         'total_records': total_records,
         'total_pages': total_pages,
     }
+    if hasattr(http.request, 'api_next_cursor'):
+        response_data['next_cursor'] = http.request.api_next_cursor
     return werkzeug.wrappers.Response(
         status=200,
         content_type='application/json; charset=utf-8',
@@ -1,17 +1,97 @@
 import time
+import hashlib
 from datetime import datetime, timedelta
 import re
 import xmlrpc.client
 import json
+import threading
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .odoo_client import SyncJobQueue
+from .async_client import execute_kw_concurrent
+
+
+class RelationData(list):
+    # List hasil search_read relasi + index hash per field, dibangun sekali per transfer_data lalu dipakai ulang
+    def __init__(self, records=None):
+        super().__init__(records or [])
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get_index(self, field):
+        index = self.indexes.get(field)
+        if index is None:
+            with self.lock:
+                index = self.indexes.get(field)
+                if index is None:
+                    index = {}
+                    for item in self:
+                        try:
+                            index.setdefault(item.get(field), item)  # sama dengan next(): ambil yang pertama
+                        except TypeError:
+                            continue  # value many2one berupa list, tidak dipakai sebagai key lookup
+                    self.indexes[field] = index
+        return index
+
+    def lookup(self, field, value):
+        try:
+            return self.get_index(field).get(value)
+        except TypeError:
+            return None
+
 
 class DataIntegrator:
-    def __init__(self, source_client, target_client):
+    # Jumlah record per batch saat sync incremental, batch diurutkan per id di dalam window write_date
+    WATERMARK_BATCH_SIZE = 2000
+    # write_date dari RPC terpotong ke detik dan transaksi yang masih berjalan bisa commit dengan write_date lebih lama,
+    # jadi window dimulai sekian menit sebelum watermark. Record yang terbaca dua kali dilewati oleh hash / cek target
+    WATERMARK_OVERLAP = timedelta(minutes=10)
+    # Model dengan line (pricelist item, repartition line, PO line, produk per tag) tidak memakai hash,
+    # perubahan di line tidak mengubah field header
+    HASH_EXCLUDED_MODELS = ('product.pricelist', 'account.tax', 'purchase.order', 'product.tag')
+    HASH_IGNORED_FIELDS = ('write_date', '__last_update')
+    # Sync gambar: jumlah record yang dibaca dari MC per batch dan batas ukuran base64 per request write ke store
+    IMAGE_BATCH_SIZE = 50
+    IMAGE_BATCH_BYTES = 8 * 1024 * 1024
+
+    # use_watermark=True: data diambil berdasarkan watermark (write_date, id) terakhir, bukan range tanggal
+    def __init__(self, source_client, target_client, use_watermark=False):
         self.source_client = source_client
         self.target_client = target_client
+        self.use_watermark = use_watermark
         self.set_log_mc = SetLogMC(self.source_client)
         self.set_log_ss = SetLogSS(self.target_client)
+        # Record master yang gagal dikirim ke store dicatat di sync.job MC
+        self.job_queue = SyncJobQueue(self.source_client, self.target_client.server_name, 'mc_to_ss')
+        # Arah sebaliknya (customer, employee, loyalty card dari store) juga antri di MC, key = id di store
+        self.job_queue_ss = SyncJobQueue(self.source_client, self.target_client.server_name, 'ss_to_mc')
+
+    # Kirim log.note yang masih di buffer ke MC dan SS, dipanggil di akhir setiap stage
+    def flush_logs(self):
+        self.source_client.log_buffer.flush()
+        self.target_client.log_buffer.flush()
+
+    # Record master di MC yang index_store-nya sudah berisi semua store terhubung ditandai is_integrated
+    # (index_store dikosongkan). Dipanggil sekali setelah semua store selesai, bukan per store.
+    # Return {model: jumlah record yang difinalisasi}, model yang gagal dicatat di errors {model: error}
+    @staticmethod
+    def finalize_integrated(mc_client, models, errors=None):
+        finalized = {}
+        if not models:
+            return finalized
+        len_master = mc_client.execute_kw('setting.config', 'search_count', [[['vit_config_server', '!=', 'mc'], ['vit_linked_server', '=', True]]])
+        for model in models:
+            try:
+                index_store_data = mc_client.execute_kw(model, 'search_read', [[['is_integrated', '=', False], ['index_store', '!=', False]]], {'fields': ['index_store']})
+                integrated_ids = [data['id'] for data in index_store_data if len(data['index_store']) >= len_master]
+                if integrated_ids:
+                    mc_client.execute_kw(model, 'write', [integrated_ids, {'is_integrated': True, 'index_store': [(5, 0, 0)]}])
+                finalized[model] = len(integrated_ids)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors[model] = e
+        return finalized
 
     def get_field_uniq_from_model(self, model):
         try:
@@ -31,6 +111,19 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when getting param existing data: {e}", None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when getting param existing data: {e}", None)
 
+    # Lookup O(1) ke data relasi lewat index RelationData, list biasa tetap didukung dengan scan linear
+    def get_relation_record(self, datas, field, value):
+        if isinstance(datas, RelationData):
+            return datas.lookup(field, value)
+        return next((item for item in datas if item[field] == value), None)
+
+    def get_relation_value(self, datas, field, value, result_field='id'):
+        item = self.get_relation_record(datas, field, value)
+        return item[result_field] if item else None
+
+    def get_relation_by_ids(self, datas, ids):
+        return [item for item in (self.get_relation_record(datas, 'id', id) for id in ids or []) if item]
+
     # Master Console --> Store Server
     def get_existing_data(self, model, field_uniq, fields, existing_datalist):
         try:
@@ -100,13 +193,82 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - account.tax", f"Master Tax from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when get company id: {e}", None)
             self.set_log_ss.create_log_note_failed(f"Exception - account.tax", "Master Tax", f"Error occurred when get company id: {e}", None)
 
-    def get_data_list(self, model, fields, field_uniq, date_from, date_to):
+    # Filter write_date: range tanggal manual, atau window [since, high_date] yang dibaca per batch dengan keyset id
+    def get_date_domain(self, date_from, date_to, watermark=None):
+        if watermark is None:
+            return [['write_date', '>=', date_from], ['write_date', '<=', date_to]]
+        date_domain = [['write_date', '<=', watermark['high_date']], ['id', '>', watermark['last_id']]]
+        if watermark.get('since'):
+            date_domain.append(['write_date', '>=', watermark['since']])
+        return date_domain
+
+    def get_search_kwargs(self, fields, watermark=None):
+        if watermark is None:
+            return {'fields': fields}
+        return {'fields': fields, 'order': 'id asc', 'limit': self.WATERMARK_BATCH_SIZE}
+
+    # Watermark disimpan di Master Console (model sync.watermark) per model, store, dan arah sync
+    def get_watermark(self, model, direction):
+        watermark = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
+                                                self.source_client.password, 'sync.watermark', 'get_watermark', [model, self.target_client.server_name, direction])
+        return {'write_date': watermark.get('write_date') or False, 'last_id': watermark.get('last_id') or 0}
+
+    def set_watermark(self, model, direction, watermark):
+        self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
+                                    self.source_client.password, 'sync.watermark', 'set_watermark', [model, self.target_client.server_name, direction, watermark['write_date'], watermark['last_id']])
+
+    # write_date terbaru saat run dimulai, jadi batas atas agar record yang ditulis balik (is_integrated, index_store) tidak terbaca ulang di run yang sama
+    def get_high_date(self, client, model):
+        data = client.call_odoo('object', 'execute_kw', client.db, client.uid, client.password, model, 'search_read', [[]],
+                                {'fields': ['write_date'], 'order': 'write_date desc', 'limit': 1})
+        return data[0]['write_date'] if data else False
+
+    # Sync incremental: semua record dengan write_date di window [watermark - overlap, high_date] dibaca per batch
+    # berurutan id (selalu maju, tidak bergantung pada presisi write_date). Watermark baru (high_date) hanya disimpan
+    # jika seluruh window selesai, batch yang gagal membuat window yang sama dibaca ulang di run berikutnya
+    def transfer_data_incremental(self, model, fields, modul, field_uniq, direction, get_data_list, transfer_data_list):
+        data_client = self.source_client if direction == 'mc_to_ss' else self.target_client
+        watermark = self.get_watermark(model, direction)
+        high_date = self.get_high_date(data_client, model)
+        if not high_date:
+            return
+
+        since = False
+        if watermark['write_date']:
+            since = (datetime.strptime(watermark['write_date'], '%Y-%m-%d %H:%M:%S') - self.WATERMARK_OVERLAP).strftime('%Y-%m-%d %H:%M:%S')
+        window = {'since': since, 'high_date': high_date, 'last_id': 0}
+        complete = True
+        while True:
+            data_list = get_data_list(model, fields, field_uniq, False, False, window)
+            if data_list is None:
+                # Gagal membaca batch (sudah dicatat di log note), watermark tidak dimajukan
+                return
+            if not data_list:
+                break
+
+            last_id = data_list[-1]['id']
+            if last_id <= window['last_id']:
+                print(f"Keyset {model} tidak maju di id {last_id}, sync incremental dihentikan")
+                return
+
+            if not transfer_data_list(model, fields, modul, field_uniq, data_list):
+                complete = False
+            window['last_id'] = last_id
+            if len(data_list) < self.WATERMARK_BATCH_SIZE:
+                break
+
+        if complete:
+            self.set_watermark(model, direction, {'write_date': high_date, 'last_id': 0})
+
+    def get_data_list(self, model, fields, field_uniq, date_from, date_to, watermark=None):
         try:
+            date_domain = self.get_date_domain(date_from, date_to, watermark)
+            search_kwargs = self.get_search_kwargs(fields, watermark)
             if model == 'account.tax':
                 company_id = self.get_company_id(field_uniq)
                 data_list = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', False], ['company_id', '=', company_id], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})
+                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', False], ['company_id', '=', company_id], *date_domain]],
+                                                    search_kwargs)
             elif model == 'ir.sequence':
                 data_list = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
                                                     self.source_client.password, model, 'search_read', 
@@ -114,8 +276,8 @@ class DataIntegrator:
                                                         '|',  # OR untuk kondisi warehouse_name
                                                         ['warehouse_name', '=', self.target_client.server_name], ['warehouse_name', '=', False],
                                                         '&',  # AND untuk kondisi lainnya
-                                                        [field_uniq, '!=', False], ['is_integrated', '=', False], ['is_from_operation_types', '=', True], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})
+                                                        [field_uniq, '!=', False], ['is_integrated', '=', False], ['is_from_operation_types', '=', True], *date_domain]],
+                                                    search_kwargs)
             elif model == 'stock.picking.type':
                 data_list = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
                                                     self.source_client.password, model, 'search_read', 
@@ -123,11 +285,12 @@ class DataIntegrator:
                                                         '|',  # OR untuk kondisi warehouse_name
                                                         ['warehouse_id.name', '=', self.target_client.server_name], ['warehouse_id', '=', False],
                                                         '&',  # AND untuk kondisi lainnya
-                                                        [field_uniq, '!=', False], ['is_integrated', '=', False], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})
+                                                        [field_uniq, '!=', False], ['is_integrated', '=', False], *date_domain]],
+                                                    search_kwargs)
             elif model == 'product.template':
                 ids = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                    self.source_client.password, model, 'search', [[[field_uniq, '!=', False], ['is_integrated', '=', False], ['vit_is_discount', '=', False], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]]) 
+                                                    self.source_client.password, model, 'search', [[[field_uniq, '!=', False], ['is_integrated', '=', False], ['vit_is_discount', '=', False], *date_domain]],
+                                                    {key: value for key, value in search_kwargs.items() if key != 'fields'})
                 data_list = []
                 batch_size=2000
                 for i in range(0, len(ids), batch_size):
@@ -137,18 +300,17 @@ class DataIntegrator:
                                                     'read', [batch_ids], {'fields': fields})
                     data_list.extend(batch_data)
             elif model == 'purchase.order':
-                data_master_conf = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                        self.source_client.password, 'setting.config', 'search_read', [[]]) # ['vit_config_server', '!=', 'mc'], ['vit_linked_server', '=', 'True']
+                data_master_conf = self.source_client.search_read_cached('setting.config', []) # ['vit_config_server', '!=', 'mc'], ['vit_linked_server', '=', 'True']
             
                 ss_data = [item for item in data_master_conf if item['vit_config_server'] != 'mc' and item['vit_linked_server']]
                 index_field_store_name = next((item['vit_config_server_name'] for item in ss_data if item['vit_config_server_name'] == self.target_client.server_name), None)
                 data_list = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['state', '=', 'purchase'], ['is_integrated', '=', False], ['picking_type_id.warehouse_id.name', '=', index_field_store_name], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})  # , 'limit': 1 , 'limit': 100 debug False [field_uniq, '!=', False], 
+                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['state', '=', 'purchase'], ['is_integrated', '=', False], ['picking_type_id.warehouse_id.name', '=', index_field_store_name], *date_domain]],
+                                                    search_kwargs)  # , 'limit': 1 , 'limit': 100 debug False [field_uniq, '!=', False], 
             else:
                 data_list = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', False], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})  # , 'limit': 1 , 'limit': 100 debug False
+                                                    self.source_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', False], *date_domain]],
+                                                    search_kwargs)  # , 'limit': 1 , 'limit': 100 debug False
             return data_list
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when get data list: {e}", None)
@@ -156,8 +318,7 @@ class DataIntegrator:
 
     def get_master_conf(self):
         try:
-            data_master_conf = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                                        self.source_client.password, 'setting.config', 'search_read', [[]]) # ['vit_config_server', '!=', 'mc'], ['vit_linked_server', '=', 'True']
+            data_master_conf = self.source_client.search_read_cached('setting.config', []) # ['vit_config_server', '!=', 'mc'], ['vit_linked_server', '=', 'True']
             
             if data_master_conf:
                 ss_data = [item for item in data_master_conf if item['vit_config_server'] != 'mc' and item['vit_linked_server']]
@@ -176,9 +337,7 @@ class DataIntegrator:
     
     def get_type_data_source(self, model, fields):
         try:
-            type_info = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                     self.source_client.uid, self.source_client.password,
-                                                     model, 'fields_get', [], {'attributes': ['type', 'relation']})
+            type_info = self.source_client.fields_get_cached(model, ['type', 'relation'])
             relations_only = {key: value['relation'] for key, value in type_info.items() if key in fields and 'relation' in value}
             # relations_only = {key: value['relation'] for key, value in type_info.items() if key in fields and 'relation' in value and key != 'item_ids'}
             # types_only = {key: value['type'] for key, value in type_info.items() if key in relations_only}
@@ -188,25 +347,29 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
     
+    # (domain, fields) search_read relasi di source
+    def get_relation_source_query(self, model):
+        if model == 'product.pricelist.item':
+            filter = ['|', ['is_integrated', '=', False], ['is_updated', '=', True]]
+            fields = ['product_tmpl_id', 'min_quantity', 'fixed_price', 'date_start', 'date_end', 'compute_price', 'percent_price', 'base', 'price_discount', 'price_surcharge', 'price_round', 'price_min_margin', 'price_max_margin', 'applied_on', 'categ_id', 'product_id'] # , 'is_integrated', 'is_updated'
+        elif model == 'account.tax.repartition.line':
+            filter = []
+            fields = ['tax_id','factor_percent','repartition_type', 'account_id','tag_ids', 'document_type', 'use_in_tax_closing']
+        elif model == 'res.partner':
+            filter = []
+            fields = ['customer_code', 'name']
+        elif model == 'purchase.order.line':
+            filter = []
+            fields = ['product_id', 'name', 'product_qty', 'qty_received', 'qty_invoiced', 'product_uom', 'price_unit', 'taxes_id']
+        else:
+            filter = []
+            field_uniq_relation_source_all = self.get_field_uniq_from_model(model)
+            fields = [field_uniq_relation_source_all]
+        return filter, fields
+
     def get_relation_source_all(self, model):
         try:
-            if model == 'product.pricelist.item':
-                filter = ['|', ['is_integrated', '=', False], ['is_updated', '=', True]]
-                fields = ['product_tmpl_id', 'min_quantity', 'fixed_price', 'date_start', 'date_end', 'compute_price', 'percent_price', 'base', 'price_discount', 'price_surcharge', 'price_round', 'price_min_margin', 'price_max_margin', 'applied_on', 'categ_id', 'product_id'] # , 'is_integrated', 'is_updated'
-            elif model == 'account.tax.repartition.line':
-                filter = []
-                fields = ['tax_id','factor_percent','repartition_type', 'account_id','tag_ids', 'document_type', 'use_in_tax_closing']
-            elif model == 'res.partner':
-                filter = []
-                fields = ['customer_code', 'name']
-            elif model == 'purchase.order.line':
-                filter = []
-                fields = ['product_id', 'name', 'product_qty', 'qty_received', 'qty_invoiced', 'product_uom', 'price_unit', 'taxes_id']
-            else:
-                filter = []
-                field_uniq_relation_source_all = self.get_field_uniq_from_model(model)
-                fields = [field_uniq_relation_source_all]
-
+            filter, fields = self.get_relation_source_query(model)
             relation_data_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
                                                      self.source_client.uid, self.source_client.password,
                                                      model, 'search_read', [filter], {'fields': fields})
@@ -215,18 +378,21 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
     
+    def get_relation_target_fields(self, model):
+        if model == 'product.pricelist.item':
+            fields = ['product_tmpl_id', 'min_quantity', 'fixed_price', 'date_start', 'date_end', 'compute_price', 'percent_price', 'base', 'price_discount', 'price_surcharge', 'price_round', 'price_min_margin', 'price_max_margin', 'applied_on', 'categ_id', 'product_id', 'id_mc']
+        elif model == 'account.tax.repartition.line':
+            fields = ['tax_id','factor_percent','repartition_type', 'account_id','tag_ids', 'document_type', 'use_in_tax_closing']
+        elif model == 'purchase.order.line':
+            fields = ['product_id', 'name', 'product_qty', 'qty_received', 'qty_invoiced', 'product_uom', 'price_unit', 'taxes_id']
+        else:
+            field_uniq_relation_source_all = self.get_field_uniq_from_model(model)
+            fields = [field_uniq_relation_source_all]
+        return fields
+
     def get_relation_target_all(self, model):
         try:
-            if model == 'product.pricelist.item':
-                fields = ['product_tmpl_id', 'min_quantity', 'fixed_price', 'date_start', 'date_end', 'compute_price', 'percent_price', 'base', 'price_discount', 'price_surcharge', 'price_round', 'price_min_margin', 'price_max_margin', 'applied_on', 'categ_id', 'product_id', 'id_mc']
-            elif model == 'account.tax.repartition.line':
-                fields = ['tax_id','factor_percent','repartition_type', 'account_id','tag_ids', 'document_type', 'use_in_tax_closing']
-            elif model == 'purchase.order.line':
-                fields = ['product_id', 'name', 'product_qty', 'qty_received', 'qty_invoiced', 'product_uom', 'price_unit', 'taxes_id']
-            else:
-                field_uniq_relation_source_all = self.get_field_uniq_from_model(model)
-                fields = [field_uniq_relation_source_all]
-
+            fields = self.get_relation_target_fields(model)
             relation_data_target = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
                                                      self.target_client.uid, self.target_client.password,
                                                      model, 'search_read', [[]], {'fields': fields})
@@ -235,6 +401,28 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
     
+    # Relasi source dan target semua model diambil bersamaan lewat async client (tanpa menunggu satu per satu).
+    # Return (dict_relation_source, dict_relation_target) berisi RelationData per model
+    def get_relations_all(self, relation_models):
+        relation_models = list(dict.fromkeys(relation_models))
+        calls = []
+        for relation_model in relation_models:
+            filter, fields = self.get_relation_source_query(relation_model)
+            calls.append((self.source_client, relation_model, 'search_read', [filter], {'fields': fields}))
+            calls.append((self.target_client, relation_model, 'search_read', [[]], {'fields': self.get_relation_target_fields(relation_model)}))
+        results = execute_kw_concurrent(calls)
+
+        dict_relation_source = {}
+        dict_relation_target = {}
+        for index, relation_model in enumerate(relation_models):
+            for result, dict_relation in ((results[index * 2], dict_relation_source), (results[index * 2 + 1], dict_relation_target)):
+                if isinstance(result, Exception):
+                    self.set_log_mc.create_log_note_failed(f"Exception - {relation_model}", f"{relation_model} from {self.source_client.server_name} to {self.target_client.server_name}", result, None)
+                    self.set_log_ss.create_log_note_failed(f"Exception - {relation_model}", relation_model, result, None)
+                    result = None
+                dict_relation[relation_model] = RelationData(result)
+        return dict_relation_source, dict_relation_target
+
     def update_id_mc_operation_types(self, model, record, record_target):
         try:
             id_mc = record.get('id')
@@ -328,30 +516,172 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when update operation types: {e}", None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when update operation types: {e}", None)
 
+    # Sync field gambar sebagai stage terpisah dari transfer_data. Perubahan dideteksi dari checksum ir.attachment di MC
+    # dibanding checksum yang terakhir berhasil dikirim ke store ini (sync.record.hash, model "<model>.<field>"),
+    # jadi gambar yang tidak berubah tidak pernah dibaca. variant: field resolusi lebih kecil (mis. image_1024)
+    # yang dikirim ke field gambar di store, store membuat ukuran lainnya dari variant tersebut
+    def transfer_images(self, model, field, modul, variant=None):
+        hash_model = f"{model}.{field}"
+        try:
+            attachments = self.source_client.execute_kw('ir.attachment', 'search_read',
+                                                        [[['res_model', '=', model], ['res_field', '=', field], ['res_id', '!=', False]]],
+                                                        {'fields': ['res_id', 'checksum']})
+            source_checksums = {str(attachment['res_id']): attachment['checksum'] for attachment in attachments}
+            stored_checksums = self.source_client.execute_kw('sync.record.hash', 'get_hashes', [hash_model, self.target_client.server_name])
+            # Gambar baru/berubah, dan gambar yang sudah dihapus di MC (dikirim sebagai False)
+            res_ids = [int(res_id) for res_id, checksum in source_checksums.items() if stored_checksums.get(res_id) != checksum]
+            res_ids += [int(res_id) for res_id, checksum in stored_checksums.items() if checksum and res_id not in source_checksums]
+            if not res_ids:
+                return
+            print(f"{modul}: sync {len(res_ids)} gambar {model} ke {self.target_client.server_name}")
+
+            field_uniq = self.get_field_uniq_from_model(model)
+            for i in range(0, len(res_ids), self.IMAGE_BATCH_SIZE):
+                batch_ids = res_ids[i:i + self.IMAGE_BATCH_SIZE]
+                source_records = self.source_client.execute_kw(model, 'read', [batch_ids], {'fields': [field_uniq]})
+                codes = [record[field_uniq] for record in source_records if record[field_uniq]]
+                target_records = self.target_client.execute_kw(model, 'search_read', [[[field_uniq, 'in', codes]]],
+                                                               {'fields': [field_uniq], 'context': {'active_test': False}}) if codes else []
+                target_ids = {record[field_uniq]: record['id'] for record in target_records}
+
+                # Gambar hanya dibaca untuk record yang sudah ada di store, record yang belum ada
+                # dikirim di run berikutnya setelah master-nya dibuat
+                present_records = [record for record in source_records if target_ids.get(record[field_uniq])]
+                images = {}
+                if present_records:
+                    image_records = self.source_client.execute_kw(model, 'read', [[record['id'] for record in present_records]], {'fields': [variant or field]})
+                    images = {record['id']: record.get(variant or field) or False for record in image_records}
+
+                calls = []
+                keys = []
+                payload_size = 0
+                for record in present_records:
+                    target_id = target_ids[record[field_uniq]]
+                    image = images.get(record['id'], False)
+                    calls.append((model, 'write', [[target_id], {field: image}]))
+                    keys.append(str(record['id']))
+                    payload_size += len(image or '')
+                    if payload_size >= self.IMAGE_BATCH_BYTES:
+                        self.write_images(model, hash_model, calls, keys, source_checksums)
+                        calls, keys, payload_size = [], [], 0
+                self.write_images(model, hash_model, calls, keys, source_checksums)
+
+                # Record yang sudah dihapus di MC tidak perlu dicek lagi
+                deleted_keys = {str(res_id) for res_id in batch_ids} - {str(record['id']) for record in source_records}
+                self.set_record_hashes(hash_model, {key: '' for key in deleted_keys}, deleted_keys)
+
+        except Exception as e:
+            self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} {field} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when transfer image: {e}", None)
+            self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when transfer image: {e}", None)
+        finally:
+            self.flush_logs()
+
+    # Satu multicall per batch gambar, checksum disimpan hanya untuk write yang berhasil
+    def write_images(self, model, hash_model, calls, keys, source_checksums):
+        if not calls:
+            return
+        results = self.target_client.execute_kw_batch(calls)
+        synced_keys = []
+        for key, result in zip(keys, results):
+            if 'error' in result:
+                self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} image from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when writing image {key}: {result['error']}", None)
+                self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when writing image {key}: {result['error']}", None)
+            else:
+                synced_keys.append(key)
+        self.set_record_hashes(hash_model, {key: source_checksums.get(key, '') for key in synced_keys}, synced_keys)
+
     def transfer_data(self, model, fields, modul, date_from, date_to):
-        try:  
+        try:
             field_uniq = self.get_field_uniq_from_model(model)
-            data_list = self.get_data_list(model, fields, field_uniq, date_from, date_to)
+            if self.use_watermark:
+                self.transfer_data_incremental(model, fields, modul, field_uniq, 'mc_to_ss', self.get_data_list, self.transfer_data_list)
+            else:
+                data_list = self.get_data_list(model, fields, field_uniq, date_from, date_to)
+                self.transfer_data_list(model, fields, modul, field_uniq, data_list)
+
+            # Record yang gagal di run sebelumnya dan sudah jatuh tempo backoff-nya
+            due_data_list = self.job_queue.include_due(self.source_client, model, [], fields)
+            if due_data_list:
+                self.transfer_data_list(model, fields, modul, field_uniq, due_data_list)
+
+        except Exception as e:
+            self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when transfer data: {e}", None)
+            self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when transfer data: {e}", None)
+        finally:
+            self.flush_logs()
+
+    def get_record_hash(self, record, fields):
+        content = {field: record.get(field) for field in fields if field not in self.HASH_IGNORED_FIELDS}
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    # Buang record yang isinya sama dengan saat terakhir berhasil di-sync ke store ini (sync.record.hash di MC),
+    # sehingga data target hanya dibaca dan dibandingkan untuk record yang benar-benar berubah.
+    # Return (data_list yang berubah, {id: hash} semua record)
+    def filter_unchanged_records(self, model, fields, data_list):
+        if model in self.HASH_EXCLUDED_MODELS:
+            return data_list, {}
+        record_hashes = {str(record['id']): self.get_record_hash(record, fields) for record in data_list}
+        try:
+            stored_hashes = self.source_client.execute_kw('sync.record.hash', 'get_hashes', [model, self.target_client.server_name, list(record_hashes)])
+        except Exception as e:
+            print(f"Gagal membaca sync.record.hash {model}: {e}")
+            return data_list, record_hashes
+
+        changed_data_list = [record for record in data_list if stored_hashes.get(str(record['id'])) != record_hashes[str(record['id'])]]
+        if len(changed_data_list) < len(data_list):
+            print(f"{model}: {len(data_list) - len(changed_data_list)} record tidak berubah sejak sync terakhir ke {self.target_client.server_name}")
+        return changed_data_list, record_hashes
+
+    # Record yang dilewati hash sudah ada di store ini, tapi tetap harus tercatat di index_store supaya
+    # is_integrated bisa difinalisasi. Hanya record yang index_store-nya belum berisi store ini yang ditulis,
+    # agar write_date tidak berubah setiap run
+    def update_indexstore_unchanged(self, model, ids):
+        if not ids:
+            return
+        len_master, last_master_url, index_store_field = self.get_master_conf()
+        index_store_data = self.source_client.execute_kw(model, 'search_read', [[['id', 'in', ids]]], {'fields': ['index_store']})
+        missing_ids = [data['id'] for data in index_store_data if index_store_field not in data.get('index_store', [])]
+        if missing_ids:
+            self.update_indexstore_source(model, missing_ids, index_store_field)
+
+    def set_record_hashes(self, model, record_hashes, synced_keys):
+        hashes = {key: record_hashes[key] for key in synced_keys if key in record_hashes}
+        if not hashes:
+            return
+        try:
+            self.source_client.execute_kw('sync.record.hash', 'set_hashes', [model, self.target_client.server_name, hashes])
+        except Exception as e:
+            print(f"Gagal menyimpan sync.record.hash {model}: {e}")
+
+    # Return True jika setiap record berhasil atau sudah tercatat di sync job untuk retry,
+    # False jika ada record yang tidak terproses (watermark tidak dimajukan)
+    def transfer_data_list(self, model, fields, modul, field_uniq, data_list):
+        try:
+            if data_list:
+                # Sama seperti SyncJobQueue.run: record yang masih backoff atau dead letter tidak diproses
+                waiting_keys = self.job_queue.get_waiting_keys(model, [str(data['id']) for data in data_list])
+                if waiting_keys:
+                    print(f"Lewati {len(waiting_keys)} record {model} yang menunggu retry sync job")
+                    data_list = [data for data in data_list if str(data['id']) not in waiting_keys]
+            if data_list:
+                checked_ids = [data['id'] for data in data_list]
+                data_list, record_hashes = self.filter_unchanged_records(model, fields, data_list)
+                changed_ids = {data['id'] for data in data_list}
+                self.update_indexstore_unchanged(model, [record_id for record_id in checked_ids if record_id not in changed_ids])
             if data_list:
                 existing_datalist = {data[field_uniq] for data in data_list}
                 len_master, last_master_url, index_store_field = self.get_master_conf()
                 existing_data_target = self.get_existing_data(model, field_uniq, fields, existing_datalist) # 1 calling odoo
                 existing_data = {data[field_uniq] for data in existing_data_target}
+                existing_data_target = RelationData(existing_data_target)
                 type_fields, relation_fields = self.get_type_data_source(model, fields) # 2 calling odoo
 
-                dict_relation_source = {}
-                dict_relation_target = {}
                 dict_relation_source_line = {}
                 dict_relation_target_line = {}
                 type_fields_line = None
                 relation_fields_line = None
 
-                for relation in relation_fields:
-                    relation_model = relation_fields[relation]
-                    many_source = self.get_relation_source_all(relation_model) # 4 1 x relation_fields calling odoo # pilih mau field apa aja?
-                    dict_relation_source[relation_model] = many_source
-                    many_target = self.get_relation_target_all(relation_model) # 5 1 x relation_fields calling odoo # pilih mau field apa aja?
-                    dict_relation_target[relation_model] = many_target
+                dict_relation_source, dict_relation_target = self.get_relations_all(relation_fields.values())
 
                 if model == 'product.tag':
                     model_line = 'product.template'
@@ -372,23 +702,24 @@ class DataIntegrator:
                         fields_line = ['product_id', 'name', 'product_qty', 'qty_received', 'qty_invoiced', 'product_uom', 'price_unit', 'taxes_id']
                         type_fields_line, relation_fields_line = self.get_type_data_source(model_line, fields_line)
                         
-                    for relation_line in relation_fields_line:
-                        relation_model_line = relation_fields_line[relation_line]
-                        many_source_line = self.get_relation_source_all(relation_model_line) # 4 1 x relation_fields calling odoo # pilih mau field apa aja?
-                        dict_relation_source_line[relation_model_line] = many_source_line
-                        many_target_line = self.get_relation_target_all(relation_model_line) # 5 1 x relation_fields calling odoo # pilih mau field apa aja?
-                        dict_relation_target_line[relation_model_line] = many_target_line
+                    dict_relation_source_line, dict_relation_target_line = self.get_relations_all(relation_fields_line.values())
 
                 filtered_data_for_create = [item for item in data_list if item[field_uniq] not in existing_data]
                 filtered_data_for_update = [item for item in data_list if item[field_uniq] in existing_data]
-                self.process_data_async_create(model, fields, field_uniq, filtered_data_for_create, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field)    
-                self.process_data_async_update(model, fields, field_uniq, filtered_data_for_update, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field)
+                synced_keys, created_complete = self.process_data_async_create(model, fields, field_uniq, filtered_data_for_create, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field)    
+                updated_keys, updated_complete = self.process_data_async_update(model, fields, field_uniq, filtered_data_for_update, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field)
+                self.set_record_hashes(model, record_hashes, synced_keys + updated_keys)
+                return created_complete and updated_complete
+            return True
 
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred when transfer data: {e}", None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred when transfer data: {e}", None)
+            return False
 
     def process_data_async_create(self, model, fields, field_uniq, partial_data, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field):
+        done_keys = []
+        failed = {}
         try:
             data_for_create = []
             log_data_created = []
@@ -396,18 +727,21 @@ class DataIntegrator:
             id_line_for_update_isintegrated = []
             # Dapatkan data yang sudah ada di target
             with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = []
+                futures = {}
                 # Kirim setiap record dalam partial_data untuk diproses secara asinkron
                 for record in partial_data:
                     future = executor.submit(self.transfer_record_data_create, model, fields, field_uniq, record, existing_data, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
-                    futures.append(future)
+                    futures[future] = str(record['id'])
                 # Tunggu semua proses selesai
                 for future in concurrent.futures.as_completed(futures):
                     try:
                         valid_record = future.result()
                         if valid_record:
                             data_for_create.append(valid_record)
+                        else:
+                            failed[futures[future]] = "Record tidak valid, lihat log note"
                     except Exception as e:
+                        failed[futures[future]] = str(e)
                         self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred while processing record data: {e}", None)
                         self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred while processing record data: {e}", None)
 
@@ -419,8 +753,14 @@ class DataIntegrator:
                     batch_data = data_for_create[i:i+batch_size]  # ambil 2000 record per loop
 
                     start_time = time.time()
-                    create = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                    self.target_client.password, model, 'create', [batch_data])
+                    try:
+                        create = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
+                                        self.target_client.password, model, 'create', [batch_data])
+                    except Exception as e:
+                        # Satu batch gagal dibuat, semua record di batch masuk antrian retry
+                        failed.update({str(data['id']): str(e) for data in batch_data})
+                        raise
+                    done_keys.extend(str(data['id']) for data in batch_data)
                     end_time = time.time()
                     duration = end_time - start_time
 
@@ -451,14 +791,8 @@ class DataIntegrator:
                             self.update_indexstore_source(model, id_mc_for_update_isintegrated, index_store_field)
                             if model == 'product.pricelist':
                                 self.update_indexstore_source('product.pricelist.item', id_line_for_update_isintegrated, index_store_field)
+                            # is_integrated difinalisasi SettingConfig.run_stores setelah semua store selesai
                             
-                            if self.target_client.server_name == last_master_url:
-                                index_store_data = self.get_index_store_data(model, id_mc_for_update_isintegrated, len_master)
-                                self.update_isintegrated_source(model, index_store_data)
-                                if model == 'product.pricelist':
-                                    index_store_data = self.get_index_store_data('product.pricelist.item', id_line_for_update_isintegrated, len_master)
-                                    self.update_isintegrated_source('product.pricelist.item', index_store_data)
-                                
                             self.set_log_mc.create_log_note_success(log_data_created)
                             self.set_log_ss.create_log_note_success(log_data_created)
             # #     # self.set_log_mc.delete_data_log_failed(record['name'])
@@ -466,8 +800,15 @@ class DataIntegrator:
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+        finally:
+            reported = self.job_queue.report(model, done_keys, failed)
+        return done_keys, reported and len(done_keys) + len(failed) == len(partial_data)
 
     def process_data_async_update(self, model, fields, field_uniq, partial_data, modul, existing_data, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line, len_master, index_store_field):
+        done_keys = []
+        failed = {}
+        # Record yang sudah sama dengan target setelah proses ini, hash-nya disimpan
+        synced_keys = []
         try:
             data_for_update = []
             log_data_updated = []
@@ -475,11 +816,11 @@ class DataIntegrator:
             ids_for_update_index_store = []
             # Dapatkan data yang sudah ada di target
             with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = []
+                futures = {}
                 # Kirim setiap record dalam partial_data untuk diproses secara asinkron
                 for record in partial_data:
                     future = executor.submit(self.transfer_record_data_update, model, fields, field_uniq, record, existing_data, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
-                    futures.append(future)
+                    futures[future] = str(record['id'])
                 # Tunggu semua proses selesai
                 for future in concurrent.futures.as_completed(futures):
                     try:
@@ -488,18 +829,18 @@ class DataIntegrator:
                             data_for_update.append(valid_record)
                         if id_for_update_index_store:
                             ids_for_update_index_store.append(id_for_update_index_store)
+                        if valid_record or id_for_update_index_store:
+                            synced_keys.append(futures[future])
+                        # (None, None) = tidak ada perubahan, tetap dianggap berhasil
+                        done_keys.append(futures[future])
 
                     except Exception as e:
-                        self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred while processing record data: {e}", None)
-                        self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred while processing record data: {e}", None)
+                        # transfer_record_data_update raise jika validasi/write gagal, log note sudah dicatat di sana
+                        failed[futures[future]] = str(e)
 
             if ids_for_update_index_store:
                 self.update_indexstore_source(model, ids_for_update_index_store, index_store_field)
 
-                if self.target_client.server_name == last_master_url:
-                    index_store_data = self.get_index_store_data(model, ids_for_update_index_store, len_master)
-                    self.update_isintegrated_source(model, index_store_data)
-
             if data_for_update:
                 for data_update in data_for_update:
                     id_mc = data_update[0]['id']
@@ -511,10 +852,6 @@ class DataIntegrator:
                 print(log_data_updated)
 
                 self.update_indexstore_source(model, id_mc_for_update_isintegrated, index_store_field)
-                
-                if self.target_client.server_name == last_master_url:
-                    index_store_data = self.get_index_store_data(model, id_mc_for_update_isintegrated, len_master)
-                    self.update_isintegrated_source(model, index_store_data)
 
             # if self.target_client.url == last_master_url + "jsonrpc":
                 # self.update_isintegrated_source(model, id_mc_for_update_isintegrated)
@@ -525,24 +862,27 @@ class DataIntegrator:
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+        finally:
+            reported = self.job_queue.report(model, done_keys, failed)
+        return synced_keys, reported and len(done_keys) + len(failed) == len(partial_data)
 
 
     def transfer_record_data_create(self, model, fields, field_uniq, record, existing_data, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target, last_master_url, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line):
         try:
             id_mc = record['id']
             if model == 'product.pricelist':
-                filtered_pricelist = [item for item in dict_relation_source.get('product.pricelist.item', []) if item['id'] in record.get('item_ids', [])]
+                filtered_pricelist = self.get_relation_by_ids(dict_relation_source.get('product.pricelist.item', []), record.get('item_ids', []))
                 record['item_ids'] = self.transfer_pricelist_lines(filtered_pricelist, 'product.pricelist.item', [record], dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
             elif model == 'account.tax':
-                filtered_taxes_invoice = [item for item in dict_relation_source.get('account.tax.repartition.line', []) if item['id'] in record.get('invoice_repartition_line_ids', [])]
+                filtered_taxes_invoice = self.get_relation_by_ids(dict_relation_source.get('account.tax.repartition.line', []), record.get('invoice_repartition_line_ids', []))
                 record['invoice_repartition_line_ids'] = self.transfer_tax_lines_invoice(filtered_taxes_invoice, 'account.tax.repartition.line', record, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
-                filtered_taxes_refund = [item for item in dict_relation_source.get('account.tax.repartition.line', []) if item['id'] in record.get('refund_repartition_line_ids', [])]
+                filtered_taxes_refund = self.get_relation_by_ids(dict_relation_source.get('account.tax.repartition.line', []), record.get('refund_repartition_line_ids', []))
                 record['refund_repartition_line_ids'] = self.transfer_tax_lines_refund(filtered_taxes_refund, 'account.tax.repartition.line', record, dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)    
             if model == 'purchase.order':
-                filtered_purchase = [item for item in dict_relation_source.get('purchase.order.line', []) if item['id'] in record.get('order_line', [])]
+                filtered_purchase = self.get_relation_by_ids(dict_relation_source.get('purchase.order.line', []), record.get('order_line', []))
                 record['order_line'] = self.transfer_pricelist_lines(filtered_purchase, 'purchase.order.line', [record], dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
             elif model == 'product.tag':
-                filtered_product_tag = [item for item in dict_relation_source.get('product.template', []) if item['id'] in record.get('product_template_ids', [])]
+                filtered_product_tag = self.get_relation_by_ids(dict_relation_source.get('product.template', []), record.get('product_template_ids', []))
             valid_record = self.validate_record_data(record, model, [record], type_fields, relation_fields, dict_relation_source, dict_relation_target)
             if valid_record:
                 if model != 'purchase.order':
@@ -559,14 +899,15 @@ class DataIntegrator:
             data_for_update = None
             id_for_update_index_store = None
             code = record.get(field_uniq)
-            target_record = next((item for item in existing_data_target if item[field_uniq] == code), None)
+            target_record = self.get_relation_record(existing_data_target, field_uniq, code)
             # record = self.validate_record_data_update_before(record, model, [record], type_fields, relation_fields, dict_relation_source, dict_relation_target)
             # target_record = self.validate_record_data_update_before(target_record, model, [target_record], type_fields, relation_fields, dict_relation_source, dict_relation_target)
 
             if model == 'product.pricelist':
-                filtered_pricelist = [item_line for item_line in dict_relation_source.get('product.pricelist.item', []) if item_line['id'] in record.get('item_ids', [])]
+                filtered_pricelist = self.get_relation_by_ids(dict_relation_source.get('product.pricelist.item', []), record.get('item_ids', []))
+                filtered_pricelist_ids = {item_line.get('id') for item_line in filtered_pricelist}
                 filtered_pricelist_target = [item_line_target for item_line_target in dict_relation_target.get('product.pricelist.item', []) 
-                             if any(int(item_line_target.get('id_mc', 0)) == item_line.get('id') for item_line in filtered_pricelist)]
+                             if int(item_line_target.get('id_mc', 0)) in filtered_pricelist_ids]
 
                 record['item_ids'] = self.transfer_pricelist_lines_update(filtered_pricelist, 'product.pricelist.item', [record], dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
                 target_record['item_ids'] = self.transfer_pricelist_lines_update_target(filtered_pricelist_target, 'product.pricelist.item', [target_record], dict_relation_source_line, dict_relation_target_line, type_fields_line, relation_fields_line)
@@ -586,8 +927,7 @@ class DataIntegrator:
                     for id in target_record['item_ids']:
                         id_line_target = id['id']
                         id_line_mc = id['id_mc']
-                        updated_filtered_pricelist = [item_line for item_line in dict_relation_source.get('product.pricelist.item', []) if item_line['id'] == int(id_line_mc)]
-                        updated_filtered_pricelist = updated_filtered_pricelist[0] if updated_filtered_pricelist else {}
+                        updated_filtered_pricelist = self.get_relation_record(dict_relation_source.get('product.pricelist.item', []), 'id', int(id_line_mc)) or {}
                         
                         # Submit each update task to the executor
                         futures.append(executor.submit(update_pricelist_item, self.target_client, id_line_target, updated_filtered_pricelist))
@@ -671,13 +1011,13 @@ class DataIntegrator:
                         field_value_source = record.get(field)
                         for data_source in field_value_source:
                             name_source = dict_relation_source[relation_model]
-                            value_source = next((item['name'] for item in name_source if item['id'] == data_source), None)
+                            value_source = self.get_relation_value(name_source, 'id', data_source, 'name')
                             field_data_source.append(value_source)
                         
                         field_value_target = target_record.get(field)
                         for data_target in field_value_target:
                             name_target = dict_relation_target[relation_model]
-                            value_target = next((item['name'] for item in name_target if item['id'] == data_target), None)
+                            value_target = self.get_relation_value(name_target, 'id', data_target, 'name')
                             field_data_target.append(value_target)
                         
                         if field_data_source == field_data_target:
@@ -694,9 +1034,10 @@ class DataIntegrator:
 
                 if updated_fields: 
                     valid_record = self.validate_record_data_update(updated_fields, model, [record], type_fields, relation_fields, dict_relation_source, dict_relation_target)
-                    if valid_record:
-                        record_id = target_record.get('id')
-                        data_for_update = self.update_data(model, record_id, valid_record, modul, record, last_master_url, target_record)
+                    if not valid_record:
+                        raise Exception("Record tidak valid, lihat log note")
+                    record_id = target_record.get('id')
+                    data_for_update = self.update_data(model, record_id, valid_record, modul, record, last_master_url, target_record)
                 else:
                     id_for_update_index_store = record.get('id')
                     
@@ -704,6 +1045,8 @@ class DataIntegrator:
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.source_client.server_name} to {self.target_client.server_name}", f"Error occurred while processing record: {e}", None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, f"Error occurred while processing record: {e}", None)
+            # Diteruskan ke process_data_async_update supaya record masuk sync job sebagai gagal
+            raise
         
      
     # to get string value for many2one, many2many data type
@@ -742,12 +1085,12 @@ class DataIntegrator:
                     name_datas_source = dict_relation_source.get(relation_model, [])
                     if model == 'product.tag':
                         field_data = [
-                        next((item['default_code'] for item in name_datas_source if item['id'] == data), None)
+                        self.get_relation_value(name_datas_source, 'id', data, 'default_code')
                         for data in field_value
                         ]
                     else:
                         field_data = [
-                            next((item['name'] for item in name_datas_source if item['id'] == data), None)
+                            self.get_relation_value(name_datas_source, 'id', data, 'name')
                             for data in field_value
                         ]
                 elif field_metadata == 'one2many':
@@ -783,11 +1126,11 @@ class DataIntegrator:
                     else:
                         datas_target = dict_relation_target[relation_model]
                         if isinstance(field_data, str):
-                            datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                            datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                         elif isinstance(field_data, list):
                             datas_target_result = []
                             for value in field_data:
-                                datas_target_notyet_result = next((item['id'] for item in datas_target if item[field_uniq] == value), None)
+                                datas_target_notyet_result = self.get_relation_value(datas_target, field_uniq, value)
                                 if datas_target_notyet_result is not None:
                                     datas_target_result.append(datas_target_notyet_result)
                                 else:
@@ -860,7 +1203,7 @@ class DataIntegrator:
                     elif field_metadata == 'many2many' and isinstance(field_value, list):
                         name_datas_source = dict_relation_source.get(relation_model, [])
                         field_data = [
-                            next((item['name'] for item in name_datas_source if item['id'] == data), None)
+                            self.get_relation_value(name_datas_source, 'id', data, 'name')
                             for data in field_value
                         ]
                         record[field_name] = field_data
@@ -975,12 +1318,12 @@ class DataIntegrator:
                         name_datas_source = dict_relation_source.get(relation_model, [])
                         if model == 'product.tag':
                             field_data = [
-                            next((item['default_code'] for item in name_datas_source if item['id'] == data), None)
+                            self.get_relation_value(name_datas_source, 'id', data, 'default_code')
                             for data in field_value
                             ]
                         else:
                             field_data = [
-                                next((item['name'] for item in name_datas_source if item['id'] == data), None)
+                                self.get_relation_value(name_datas_source, 'id', data, 'name')
                                 for data in field_value
                             ]
                     elif field_metadata == 'one2many':
@@ -1012,11 +1355,11 @@ class DataIntegrator:
                         else:
                             datas_target = dict_relation_target[relation_model]
                             if isinstance(field_data, str):
-                                datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                                datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                             elif isinstance(field_data, list):
                                 datas_target_result = []
                                 for value in field_data:
-                                    datas_target_notyet_result = next((item['id'] for item in datas_target if item[field_uniq] == value), None)
+                                    datas_target_notyet_result = self.get_relation_value(datas_target, field_uniq, value)
                                     if datas_target_notyet_result is not None:
                                         datas_target_result.append(datas_target_notyet_result)
                                     else:
@@ -1100,7 +1443,7 @@ class DataIntegrator:
                         field_data_list = []
                         for field_data in field_value:
                             name_datas_source = dict_relation_source_line[relation_model]
-                            name_datas_source_result = next((item['name'] for item in name_datas_source if item['id'] == field_data), None)
+                            name_datas_source_result = self.get_relation_value(name_datas_source, 'id', field_data, 'name')
                             field_data_list.append(name_datas_source_result)
                         field_data = field_data_list
                         # record[field_name] = field_data
@@ -1128,11 +1471,11 @@ class DataIntegrator:
                         else:
                             datas_target = dict_relation_target_line[relation_model]
                             if isinstance(field_data, str):
-                                datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                                datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                             elif isinstance(field_data, list):
                                 datas_target_result = []
                                 for value in field_data:
-                                    datas_target_notyet_result = next((item['id'] for item in datas_target if item[field_uniq] == value), None)
+                                    datas_target_notyet_result = self.get_relation_value(datas_target, field_uniq, value)
                                     if datas_target_notyet_result is not None:
                                         datas_target_result.append(datas_target_notyet_result)
                                     else:
@@ -1189,7 +1532,7 @@ class DataIntegrator:
                         field_data_list = []
                         for field_data in field_value:
                             name_datas_source = dict_relation_source_line[relation_model]
-                            name_datas_source_result = next((item['name'] for item in name_datas_source if item['id'] == field_data), None)
+                            name_datas_source_result = self.get_relation_value(name_datas_source, 'id', field_data, 'name')
                             field_data_list.append(name_datas_source_result)
                         field_data = field_data_list
                     elif (field_metadata == 'one2many') and isinstance(field_value, list):
@@ -1216,11 +1559,11 @@ class DataIntegrator:
                         else:
                             datas_target = dict_relation_target_line[relation_model]
                             if isinstance(field_data, str):
-                                datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                                datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                             elif isinstance(field_data, list):
                                 datas_target_result = []
                                 for value in field_data:
-                                    datas_target_notyet_result = next((item['id'] for item in datas_target if item[field_uniq] == value), None)
+                                    datas_target_notyet_result = self.get_relation_value(datas_target, field_uniq, value)
                                     if datas_target_notyet_result is not None:
                                         datas_target_result.append(datas_target_notyet_result)
                                     else:
@@ -1522,13 +1865,15 @@ class DataIntegrator:
             end_time = time.time()
             duration = end_time - start_time
 
-            if update:
-                return record, [record_id], updated_fields, start_time, end_time, duration
+            if not update:
+                raise Exception(f"Write {model} id {record_id} di {self.target_client.server_name} tidak berhasil")
+            return record, [record_id], updated_fields, start_time, end_time, duration
             
         except Exception as e:
             write_date = record['write_date']
             self.set_log_mc.create_log_note_failed(record, modul, e, write_date)
             self.set_log_ss.create_log_note_failed(record, modul, e, write_date)
+            raise
 
     
     def update_indexstore_source(self, model, id, index_store_field):
@@ -1593,29 +1938,34 @@ class DataIntegrator:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
 
-    def get_data_list_ss(self, model, fields, field_uniq, date_from, date_to):
+    def get_data_list_ss(self, model, fields, field_uniq, date_from, date_to, watermark=None):
         try:
+            date_domain = self.get_date_domain(date_from, date_to, watermark)
+            search_kwargs = self.get_search_kwargs(fields, watermark)
             # hanya model res.partner.title, res.partner, hr.employee
             if model == 'res.partner':
                 data_list = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', True], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields}) # , 'limit': 1  
+                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', True], *date_domain]],
+                                                    search_kwargs) # , 'limit': 1  
             elif model == 'hr.employee':
                 data_list = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', True], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields}) # , 'limit': 1 
+                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['is_integrated', '=', True], *date_domain]],
+                                                    search_kwargs) # , 'limit': 1 
             elif model == 'loyalty.card':
                 currency = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
                                                     self.target_client.password, 'loyalty.program', 'search_read', [[]], {'fields': ['currency_id'], 'limit': 1})
                 currency_id = currency[0]['currency_id'][0]
                 data_list = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                                    self.target_client.password, model, 'search_read', [[['currency_id','=', currency_id], ['is_integrated', '=', True], [field_uniq, '!=', False], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields}) # ['code','=', '044d-ab69-4a4a']
+                                                    self.target_client.password, model, 'search_read', [[['currency_id','=', currency_id], ['is_integrated', '=', True], [field_uniq, '!=', False], *date_domain]],
+                                                    search_kwargs) # ['code','=', '044d-ab69-4a4a']
             elif model == 'res.partner.title':
                 data_list = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], ['write_date', '>=', date_from], ['write_date', '<=', date_to]]],
-                                                    {'fields': fields})
+                                                    self.target_client.password, model, 'search_read', [[[field_uniq, '!=', False], *date_domain]],
+                                                    search_kwargs)
 
+            if watermark is None:
+                # Sync per range tanggal: record store yang jatuh tempo di sync job ikut diproses
+                data_list = self.job_queue_ss.include_due(self.target_client, model, data_list, fields)
             return data_list
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
@@ -1624,8 +1974,24 @@ class DataIntegrator:
     def transfer_data_mc(self, model, fields, modul, date_from, date_to):
         try:
             field_uniq = self.get_field_uniq_from_model(model)
-            data_list = self.get_data_list_ss(model, fields, field_uniq, date_from, date_to) # 1 calling odoo
-            
+            if self.use_watermark:
+                self.transfer_data_incremental(model, fields, modul, field_uniq, 'ss_to_mc', self.get_data_list_ss, self.transfer_data_list_mc)
+                # Batch watermark dibaca per keyset, job yang jatuh tempo diambil sekali setelahnya
+                due_data_list = self.job_queue_ss.include_due(self.target_client, model, [], fields)
+                if due_data_list:
+                    self.transfer_data_list_mc(model, fields, modul, field_uniq, due_data_list)
+            else:
+                data_list = self.get_data_list_ss(model, fields, field_uniq, date_from, date_to) # 1 calling odoo
+                self.transfer_data_list_mc(model, fields, modul, field_uniq, data_list)
+
+        except Exception as e:
+            self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
+            self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+        finally:
+            self.flush_logs()
+
+    def transfer_data_list_mc(self, model, fields, modul, field_uniq, data_list):
+        try:
             # id_create = 6
             # id_ss = [6]
             # self.update_idmc_source_ss(model, id_create, id_ss)
@@ -1637,9 +2003,15 @@ class DataIntegrator:
             #     self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
             #                                     self.source_client.password, model, 'write', [id, {'customer_code': f"Cust_test{id}"}]) # {'is_integrated': False }, 'categ_id' : 7, 'available_in_pos' : False
 
+            if data_list:
+                waiting_keys = self.job_queue_ss.get_waiting_keys(model, [str(data['id']) for data in data_list])
+                if waiting_keys:
+                    print(f"Lewati {len(waiting_keys)} record {model} yang menunggu retry sync job")
+                    data_list = [data for data in data_list if str(data['id']) not in waiting_keys]
             if data_list:
                 existing_data_target_mc = self.get_existing_data_mc(model, field_uniq, fields)  # 2 calling odoo
                 existing_data_mc = {data[field_uniq] for data in existing_data_target_mc}
+                existing_data_target_mc = RelationData(existing_data_target_mc)
                 type_fields, relation_fields = self.get_type_data_source(model, fields) # 3 calling odoo
 
                 dict_relation_source = {}
@@ -1647,46 +2019,61 @@ class DataIntegrator:
                 for relation in relation_fields:
                     relation_model = relation_fields[relation]
                     many_source = self.get_relation_source_all(relation_model) # 4 (1 x relation_fields) calling odoo # pilih mau field apa aja?
-                    dict_relation_source[relation_model] = many_source
+                    dict_relation_source[relation_model] = RelationData(many_source)
                     # many_target = self.get_relation_target_all(relation_model) # 5 (1 x relation_fields) calling odoo # pilih mau field apa aja?
                     # dict_relation_target[relation_model] = many_target
                 
                 filtered_data_for_create = [item for item in data_list if item[field_uniq] not in existing_data_mc]
                 filtered_data_for_update = [item for item in data_list if item[field_uniq] in existing_data_mc]
                 
-                self.process_data_async_create_mc(model, filtered_data_for_create, modul, type_fields, relation_fields, dict_relation_source, dict_relation_target)    
-                self.process_data_async_update_mc(model, field_uniq, filtered_data_for_update, modul, type_fields, relation_fields, existing_data_target_mc, dict_relation_source, dict_relation_target)
-            
+                created_complete = self.process_data_async_create_mc(model, filtered_data_for_create, modul, type_fields, relation_fields, dict_relation_source, dict_relation_target)    
+                updated_complete = self.process_data_async_update_mc(model, field_uniq, filtered_data_for_update, modul, type_fields, relation_fields, existing_data_target_mc, dict_relation_source, dict_relation_target)
+                # Ada record store yang tidak sampai ke MC: watermark ss_to_mc tidak dimajukan
+                return created_complete and updated_complete
+            return True
+
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+            return False
 
+    # Return True jika semua record di partial_data berhasil dibuat di MC
     def process_data_async_create_mc(self, model, partial_data, modul, type_fields, relation_fields, dict_relation_source, dict_relation_target):
+        done_keys = []
+        failed = {}
         try:
             data_for_create = []
             log_data_created = []
             id_ss_for_update_isintegrated = []
             # Dapatkan data yang sudah ada di target
             with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = []
+                futures = {}
                 # Kirim setiap record dalam partial_data untuk diproses secara asinkron
                 for record in partial_data:
                     future = executor.submit(self.transfer_record_data_create_mc, model, record, type_fields, relation_fields, dict_relation_source, dict_relation_target)
-                    futures.append(future)
+                    futures[future] = str(record['id'])
                 # Tunggu semua proses selesai
                 for future in concurrent.futures.as_completed(futures):
                     try:
                         valid_record = future.result()
                         if valid_record:
                             data_for_create.append(valid_record)
+                        else:
+                            failed[futures[future]] = "Record tidak valid, lihat log note"
                     except Exception as e:
+                        failed[futures[future]] = str(e)
                         self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
                         self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
 
             if data_for_create:
                 start_time = time.time()
-                create = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                            self.source_client.password, model, 'create', [data_for_create])
+                try:
+                    create = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
+                                                self.source_client.password, model, 'create', [data_for_create])
+                except Exception as e:
+                    failed.update({str(data['id']): str(e) for data in data_for_create})
+                    raise
+                done_keys.extend(str(data['id']) for data in data_for_create)
                 end_time = time.time()
                 duration = end_time - start_time
                 print(create)
@@ -1712,29 +2099,37 @@ class DataIntegrator:
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+        finally:
+            reported = self.job_queue_ss.report(model, done_keys, failed)
+        return reported and not failed and len(done_keys) == len(partial_data)
 
+    # Return True jika semua record di partial_data sudah sama dengan MC (diupdate atau memang tidak berubah)
     def process_data_async_update_mc(self, model, field_uniq, partial_data, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target):
+        done_keys = []
+        failed = {}
         try:
             data_for_update = []
             log_data_updated = []
             id_ss_for_update_isintegrated = []
             # Dapatkan data yang sudah ada di target
             with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = []
+                futures = {}
                 # Kirim setiap record dalam partial_data untuk diproses secara asinkron
                 for record in partial_data:
                     future = executor.submit(self.transfer_record_data_update_mc, model, field_uniq, record, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target)
-                    futures.append(future)
+                    futures[future] = str(record['id'])
                 # Tunggu semua proses selesai
                 for future in concurrent.futures.as_completed(futures):
                     try:
                         valid_record = future.result()
                         if valid_record:
                             data_for_update.append(valid_record)
+                        # None = tidak ada perubahan, kegagalan selalu berupa exception
+                        done_keys.append(futures[future])
 
                     except Exception as e:
-                        self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
-                        self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+                        # transfer_record_data_update_mc raise jika validasi/write gagal, log note sudah dicatat di sana
+                        failed[futures[future]] = str(e)
 
             if data_for_update:
                 for data_update in data_for_update:
@@ -1753,6 +2148,9 @@ class DataIntegrator:
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+        finally:
+            reported = self.job_queue_ss.report(model, done_keys, failed)
+        return reported and not failed and len(done_keys) == len(partial_data)
 
     def transfer_record_data_create_mc(self, model, record, type_fields, relation_fields, dict_relation_source, dict_relation_target):
         try:
@@ -1767,7 +2165,7 @@ class DataIntegrator:
     def transfer_record_data_update_mc(self, model, field_uniq, record, modul, type_fields, relation_fields, existing_data_target, dict_relation_source, dict_relation_target):
         try:
             code = record.get(field_uniq)
-            target_record = next((item for item in existing_data_target if item[field_uniq] == code), None)
+            target_record = self.get_relation_record(existing_data_target, field_uniq, code)
             updated_fields = {field: record[field] for field in record if record.get(field) != target_record.get(field) and field not in ('id', 'create_date', 'write_date')}
 
             if updated_fields: 
@@ -1783,14 +2181,16 @@ class DataIntegrator:
 
                 if updated_fields: 
                     valid_record = self.validate_record_data_update_mc(updated_fields, model, type_fields, relation_fields, dict_relation_source, dict_relation_target)
-                    if valid_record:
-                        record_id = target_record.get('id')
-                        data_for_update = self.update_data_mc(model, record_id, valid_record, modul, record)
+                    if not valid_record:
+                        raise Exception("Record tidak valid, lihat log note")
+                    record_id = target_record.get('id')
+                    data_for_update = self.update_data_mc(model, record_id, valid_record, modul, record)
         
-                        return data_for_update
+                    return data_for_update
         except Exception as e:
             self.set_log_mc.create_log_note_failed(f"Exception - {model}", f"{model} from {self.target_client.server_name} to {self.source_client.server_name}", e, None)
             self.set_log_ss.create_log_note_failed(f"Exception - {model}", model, e, None)
+            raise
     
     # to get string value for many2one data type
     def validate_record_data_mc(self, record, model, type_fields, relation_fields, dict_relation_source, dict_relation_target):
@@ -1812,7 +2212,7 @@ class DataIntegrator:
                         
                         datas_target = dict_relation_source[relation_model]
                         if isinstance(field_data, str):
-                            datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                            datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                         
                         if datas_target_result:
                             record[field_name] = datas_target_result if datas_target_result else False # datas[0]['id'] if datas[0] else False
@@ -1846,7 +2246,7 @@ class DataIntegrator:
                             
                             datas_target = dict_relation_source[relation_model]
                             if isinstance(field_data, str):
-                                datas_target_result = next((item['id'] for item in datas_target if item[field_uniq] == field_data), None)
+                                datas_target_result = self.get_relation_value(datas_target, field_uniq, field_data)
                             
                             if datas_target_result:
                                 record[field_name] = datas_target_result if datas_target_result else False # datas[0]['id'] if datas[0] else False 
@@ -1867,13 +2267,15 @@ class DataIntegrator:
             end_time = time.time()
             duration = end_time - start_time
 
-            if update:
-                return record, [record_id], updated_fields, start_time, end_time, duration
+            if not update:
+                raise Exception(f"Write {model} id {record_id} di {self.source_client.server_name} tidak berhasil")
+            return record, [record_id], updated_fields, start_time, end_time, duration
             
         except Exception as e:
             write_date = record['write_date']
             self.set_log_mc.create_log_note_failed(record, modul, e, write_date)
             self.set_log_ss.create_log_note_failed(record, modul, e, write_date)
+            raise
 
     def update_isintegrated_source_ss(self, model, id):
         try:
@@ -1992,31 +2394,24 @@ class SetLogMC:
         except Exception as e:
             print(f"An error occurred while deleting data: {e}")
     
+    # Purge dijalankan di server (log.note.purge_expired_logs) dengan retensi per status sync
     def delete_data_log_expired(self):
         try:
-            expired_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d %H:%M:%S')
-            list_log_expired = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                        self.source_client.uid, self.source_client.password,
-                                                        'log.note', 'search_read', [[['vit_sync_date', '<=', expired_date]]])
-
-            for record in list_log_expired:
-                self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                            self.source_client.password, 'log.note', 'unlink', [[record['id']]])
+            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
+                                        self.source_client.password, 'log.note', 'purge_expired_logs', [])
         except Exception as e:
             print(f"An error occurred while deleting data: {e}")
 
     def create_log_note_success(self, log_record):
         try:
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
     def create_log_note_update_success(self, log_record):
         try:
             # log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date, source, target)
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
             # print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -2024,11 +2419,8 @@ class SetLogMC:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                            self.source_client.password, 'log.note', 'create', [log_record])
-                # print(f"Data log note yang masuk: {log_record}")
+            self.source_client.log_buffer.add_failed(log_record)
+            # print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
@@ -2135,31 +2527,24 @@ class SetLogSS:
         except Exception as e:
             print(f"An error occurred while deleting data: {e}")
 
+    # Purge dijalankan di server (log.note.purge_expired_logs) dengan retensi per status sync
     def delete_data_log_expired(self):
         try:
-            expired_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d %H:%M:%S')
-            list_log_expired = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
-                                                        self.target_client.uid, self.target_client.password,
-                                                        'log.note', 'search_read', [[['vit_sync_date', '<=', expired_date]]])
-
-            for record in list_log_expired:
-                self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                            self.target_client.password, 'log.note', 'unlink', [[record['id']]])
+            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
+                                        self.target_client.password, 'log.note', 'purge_expired_logs', [])
         except Exception as e:
             print(f"An error occurred while deleting data: {e}")
 
     def create_log_note_success(self, log_record):
         try:
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
     def create_log_note_update_success(self, log_record):
         try:
             # log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date)
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
             # print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -2167,11 +2552,8 @@ class SetLogSS:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                            self.target_client.password, 'log.note', 'create', [log_record])
-                # print(f"Data log note yang masuk: {log_record}")
+            self.target_client.log_buffer.add_failed(log_record)
+            # print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
@@ -1,17 +1,25 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 import xmlrpc.client
-from .odoo_client import OdooClient
+from .odoo_client import OdooClient, invalidate_metadata, get_concurrency_metrics
 from .data_transaksi import DataTransaksi
 from .data_integrator import DataIntegrator
 from .data_transaksiMCtoSS import DataTransaksiMCtoSS
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
 
 class SettingConfig(models.Model):
     _name = "setting.config"
     _rec_name = "vit_config_server_name"
     _description = "Master Configuration"
 
+    # Jumlah store yang disinkronkan bersamaan, tiap store tetap memakai thread pool integrator masing-masing
+    STORE_MAX_WORKERS = 4
+
     SERVER_SELECTION = [
         ('mc', 'Master Console'),
         ('ss', 'Store Server'),
@@ -70,13 +78,65 @@ class SettingConfig(models.Model):
             # raise ValidationError(_(f"{url}, {db_name}, {username}, {password}, {server_type}, {server_name}, {linked_server}"))
 
             if linked_server == True:
-                ss_clients.append(OdooClient(url, db_name, username, password, server_name))
+                # Store yang tidak bisa dihubungi dilewati, store lain tetap disinkronkan
+                try:
+                    ss_clients.append(OdooClient(url, db_name, username, password, server_name))
+                except Exception as e:
+                    _logger.error(f"Failed to connect to store {server_name}: {e}")
 
         if mc_client is None or not ss_clients:
             raise ValueError("Both Master Console and Store Server configurations are required.")
 
         return mc_client, ss_clients
     
+    # Menjalankan sync_store untuk setiap store secara paralel (maksimal STORE_MAX_WORKERS),
+    # store yang lambat atau error tidak menghalangi store lain. Return durasi (detik) per store.
+    # finalize_models: model master (index_store) yang is_integrated-nya difinalisasi setelah semua store selesai
+    def run_stores(self, mc_client, ss_clients, sync_store, action_name, finalize_models=()):
+        durations = {}
+        if not ss_clients:
+            return durations
+
+        with ThreadPoolExecutor(max_workers=min(self.STORE_MAX_WORKERS, len(ss_clients))) as executor:
+            futures = {executor.submit(self.run_store, ss_client, sync_store, action_name): ss_client for ss_client in ss_clients}
+            for future in as_completed(futures):
+                ss_client = futures[future]
+                status, duration = future.result()
+                durations[ss_client.server_name] = duration
+                _logger.info(f"{action_name} - {ss_client.server_name}: {status} in {duration:.2f}s")
+        self.finalize_integrated(mc_client, finalize_models, action_name)
+        mc_client.log_buffer.flush()
+        # Limit AIMD per server setelah stage selesai, untuk memantau store yang sering diturunkan
+        _logger.info(f"{action_name} - concurrency: {get_concurrency_metrics()}")
+        return durations
+
+    # Store berjalan bersamaan sehingga tidak ada "store terakhir": record yang index_store-nya
+    # sudah berisi semua store terhubung ditandai is_integrated (index_store dikosongkan) di sini, sekali per stage
+    def finalize_integrated(self, mc_client, models, action_name):
+        errors = {}
+        try:
+            finalized = DataIntegrator.finalize_integrated(mc_client, models, errors)
+        except Exception as e:
+            _logger.error(f"{action_name} - finalize is_integrated failed: {e}")
+            return
+        for model, count in finalized.items():
+            _logger.info(f"{action_name} - {model}: {count} record integrated di semua store")
+        for model, e in errors.items():
+            _logger.error(f"{action_name} - finalize is_integrated {model} failed: {e}")
+
+    def run_store(self, ss_client, sync_store, action_name):
+        start_time = time.time()
+        try:
+            sync_store(ss_client)
+            status = 'success'
+        except Exception as e:
+            _logger.error(f"{action_name} - {ss_client.server_name} failed: {e}")
+            status = 'failed'
+        finally:
+            ss_client.log_buffer.flush()
+        return status, time.time() - start_time
+
+    # Range default 3 hari untuk transaksi; master data tanpa range manual memakai watermark sync.watermark
     def get_date(self, datefrom, dateto):
         if datefrom and dateto:
             date_from = datefrom
@@ -105,9 +165,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_warehouse_master('stock.warehouse', ['name', 'lot_stock_id', 'location_transit'], 'Insert Warehouse', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_list_warehouse')
 
     def convert_datetime_to_string(self, date_from, date_to):
         # Konversi datetime ke string
@@ -136,9 +197,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.update_location_id_mc('stock.location', ['id', 'complete_name'], 'Update ID MC', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'update_location_idmc')
 
     def create_master_employee(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -158,9 +220,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client) # belum ditambahkan is_store dan is_cashier
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto)) # belum ditambahkan is_store dan is_cashier
             integrator_master.transfer_data('hr.employee', ['name', 'mobile_phone', 'work_phone', 'work_email', 'is_sales', 'is_cashier', 'create_date', 'write_date'], 'Sales Employee', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_employee', ['hr.employee'])
             
     def create_master_item_utility(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -180,13 +243,14 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('account.tax', ['name', 'description', 'amount_type', 'active', 'type_tax_use', 'tax_scope', 'amount', 'invoice_label', 'price_include', 'include_base_amount', 'invoice_repartition_line_ids', 'refund_repartition_line_ids', 'create_date', 'write_date'], 'Master Tax', date_from, date_to)
             integrator_master.transfer_data('product.category', ['complete_name', 'name', 'parent_id', 'property_valuation', 'create_date', 'write_date'], 'Master Item Group', date_from, date_to)
             integrator_master.transfer_data('pos.category', ['name', 'parent_id', 'sequence', 'create_date', 'write_date'], 'Master POS Category', date_from, date_to)
             integrator_master.transfer_data('uom.category', ['name', 'is_pos_groupable', 'create_date', 'write_date'], 'Master UoM Group', date_from, date_to)
             integrator_master.transfer_data('uom.uom', ['category_id', 'uom_type', 'name', 'factor', 'rounding', 'active', 'create_date', 'write_date'], 'Master UoM', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_item_utility', ['account.tax', 'product.category', 'pos.category', 'uom.category', 'uom.uom'])
 
     def create_master_items(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -206,10 +270,13 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             # raise ValidationError(_(f"{mc_client}, {ss_client}, {ss_clients}, {mc}, {ss}, {datefrom}, {dateto}, {date_from}, {date_to}")) # buat check debug ya
-            integrator_master.transfer_data('product.template', ['name', 'sale_ok', 'purchase_ok', 'detailed_type', 'invoice_policy', 'uom_id', 'uom_po_id', 'list_price', 'standard_price', 'categ_id', 'default_code', 'pos_categ_ids', 'available_in_pos', 'taxes_id', 'active', 'create_date', 'write_date', 'image_1920', 'barcode', 'vit_sub_div', 'vit_item_kel', 'vit_item_type', 'brand'], 'Master Item', date_from, date_to) # , 'multi_barcode_ids' 
+            integrator_master.transfer_data('product.template', ['name', 'sale_ok', 'purchase_ok', 'detailed_type', 'invoice_policy', 'uom_id', 'uom_po_id', 'list_price', 'standard_price', 'categ_id', 'default_code', 'pos_categ_ids', 'available_in_pos', 'taxes_id', 'active', 'create_date', 'write_date', 'barcode', 'vit_sub_div', 'vit_item_kel', 'vit_item_type', 'brand'], 'Master Item', date_from, date_to) # , 'multi_barcode_ids' 
+            # Gambar dikirim terpisah, hanya yang checksum-nya berubah, dalam resolusi 1024
+            integrator_master.transfer_images('product.template', 'image_1920', 'Master Item Image', variant='image_1024')
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_items', ['product.template'])
 
     def create_master_tags(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -229,9 +296,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('product.tag', ['name', 'color', 'product_template_ids', 'create_date', 'write_date'], 'Master Tags', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_tags')
 
     def create_master_barcode(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -251,9 +319,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('multiple.barcode', ['barcode', 'product_tmpl_id', 'create_date', 'write_date'], 'Master Multiple Barcode', date_from, date_to) # , 'multi_barcode_ids'
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_barcode', ['multiple.barcode'])
 
     def create_location(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -273,9 +342,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.update_location_id_mc('stock.location', ['id', 'complete_name'], 'Update ID MC', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_location')
     
     def create_payment_method_pos_config_journal_invoicing(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -295,12 +365,13 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.account_account_from_mc('account.account', ['id', 'name', 'code', 'account_type', 'reconcile'], 'Transaksi COA', datefrom, dateto)
             integrator_transaksiMCtoSS.journal_account_from_mc('account.journal', ['id', 'name', 'type', 'refund_sequence', 'is_store', 'code', 'account_control_ids', 'invoice_reference_type', 'invoice_reference_model' ], 'Transaksi Journal', datefrom, dateto)
             integrator_transaksiMCtoSS.pos_config_from_mc('pos.config', ['id', 'name', 'module_pos_hr', 'is_store', 'is_posbox', 'other_devices'], 'Transaksi PoS Config', datefrom, dateto)
             integrator_transaksiMCtoSS.payment_method_from_mc('pos.payment.method', ['id', 'name', 'is_online_payment', 'is_store', 'split_transactions', 'journal_id', 'config_ids'], 'Transaksi PoS Payment Method', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_payment_method_pos_config_journal_invoicing')
 
     def create_master_pricelist(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -320,9 +391,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('product.pricelist', ['name', 'currency_id', 'item_ids', 'create_date', 'write_date'], 'Master Pricelist', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_pricelist', ['product.pricelist', 'product.pricelist.item'])
 
     def create_master_operation_type(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -342,11 +414,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.update_operation_types('stock.picking.type', ['name', 'code', 'sequence_id', 'sequence_code', 'warehouse_id', 'reservation_method', 'return_picking_type_id', 'default_location_return_id', 'create_backorder', 'use_create_lots', 'use_existing_lots', 'default_location_src_id', 'default_location_dest_id', 'create_date', 'write_date'], 'Update Master Operation', date_from, date_to)
             integrator_master.transfer_data('ir.sequence', ['name', 'implementation', 'code', 'active', 'prefix', 'suffix', 'use_date_range', 'padding', 'number_increment', 'create_date', 'write_date'], 'Master Sequence', date_from, date_to)
             integrator_master.transfer_data('stock.picking.type', ['name', 'code', 'sequence_id', 'sequence_code', 'warehouse_id', 'reservation_method', 'return_picking_type_id', 'default_location_return_id', 'create_backorder', 'use_create_lots', 'use_existing_lots', 'default_location_src_id', 'default_location_dest_id', 'create_date', 'write_date'], 'Master Operation', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_operation_type', ['ir.sequence', 'stock.picking.type'])
 
     def create_master_discount(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -366,11 +439,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS.transfer_discount_loyalty('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'index_store', 'reward_ids', 'rule_ids', 'schedule_ids', 'member_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
             # integrator_transaksiMCtoSS.update_discount_loyalty('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'index_store', 'reward_ids', 'rule_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_discount')
 
     def update_master_discount(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -390,9 +464,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.update_discount_loyalty('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'active', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'index_store', 'reward_ids', 'rule_ids', 'schedule_ids', 'member_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'update_master_discount')
     
     def create_manufacture_unbuild(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -412,10 +487,11 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_manufacture_order('mrp.production', ['id', 'name', 'state', 'is_integrated', 'create_date', 'location_src_id', 'location_dest_id', 'picking_type_id', 'product_id', 'product_qty', 'bom_id', 'user_id', 'date_start', 'date_finished', 'move_raw_ids'], 'Transaksi Manufacture Order Inventory', datefrom, dateto)
             integrator_transaksi.transfer_unbuild_order('mrp.unbuild', ['id', 'name', 'state', 'is_integrated', 'create_date', 'location_id', 'location_dest_id', 'product_id', 'product_qty', 'bom_id', 'mo_id', 'unbuild_line_ids'], 'Transaksi Unbuild Order Inventory', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_manufacture_unbuild')
 
 
     def create_master_bom(self, mc, ss, datefrom, dateto):
@@ -436,9 +512,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.transfer_bom_master('mrp.bom', ['id', 'product_tmpl_id', 'product_id', 'code', 'type', 'product_qty', 'consumption', 'produce_delay', 'days_to_prepare_mo', 'create_date', 'is_integrated', 'bom_line_ids'], 'Master BOM', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_bom')
             
     def create_voucher_loyalty(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -458,11 +535,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS.transfer_loyalty_point_mc_to_ss('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'index_store', 'reward_ids', 'rule_ids'], 'Transfer Loyalty Point', datefrom, dateto)
             # integrator_transaksi.update_loyalty_point_ss_to_mc('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'reward_ids', 'rule_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_voucher_loyalty')
 
     def update_voucher_loyalty_store_to_mc(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -482,11 +560,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.update_loyalty_point_ss_to_mc('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'reward_ids', 'rule_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
             integrator_transaksi.create_loyalty_point_ss_to_mc('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'reward_ids', 'rule_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'update_voucher_loyalty_store_to_mc')
 
     def update_voucher_loyalty_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -506,10 +585,11 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS.update_loyalty_point_mc_to_ss('loyalty.program', ['id', 'name', 'program_type', 'currency_id', 'pricelist_ids', 'portal_point_name', 'portal_visible', 'trigger', 'applies_on', 'date_from', 'date_to', 'limit_usage', 'pos_ok', 'pos_config_ids', 'sale_ok', 'vit_trxid', 'reward_ids', 'rule_ids'], 'Transfer Discount/Loyalty', datefrom, dateto)
+        self.run_stores(mc_client, ss_clients, sync_store, 'update_voucher_loyalty_mc_to_store')
 
     def create_master_customers_from_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -529,10 +609,11 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('res.partner.title', ['name', 'shortcut', 'create_date', 'write_date'], 'Master Customer Title', date_from, date_to)
             integrator_master.transfer_data('res.partner', ['name', 'street', 'street2', 'phone', 'mobile', 'email', 'website','title','customer_rank', 'supplier_rank', 'customer_code', 'vit_customer_group', 'property_product_pricelist', 'create_date', 'write_date'], 'Master Customer', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_customers_from_mc_to_store', ['res.partner.title', 'res.partner'])
 
     def create_master_customers_from_ss_to_mc(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -552,12 +633,13 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             # raise ValidationError(_(f"{mc_client}, {ss_client}, {ss_clients}, {mc}, {ss}, {datefrom}, {dateto}, {date_from}, {date_to}")) buat check debug ya
             integrator_master.transfer_data_mc('res.partner.title', ['name', 'shortcut', 'create_date', 'write_date'], 'Master Customer Title', date_from, date_to)
             integrator_master.transfer_data_mc('res.partner', ['name', 'street', 'street2', 'phone', 'mobile', 'email', 'website','title','customer_rank', 'supplier_rank', 'customer_code', 'vit_customer_group', 'property_product_pricelist', 'create_date', 'write_date'], 'Master Customer', date_from, date_to)
             integrator_master.transfer_data_mc('loyalty.card', ['code', 'points_display', 'expiration_date', 'partner_id', 'points', 'program_id'], 'Master Loyalty', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_customers_from_ss_to_mc')
 
     def create_master_employee_from_ss_to_mc(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -577,9 +659,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
-            integrator_master = DataIntegrator(mc_client, ss_client)
+        def sync_store(ss_client):
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data_mc('hr.employee', ['name', 'mobile_phone', 'work_phone', 'work_email', 'is_cashier', 'is_pic', 'create_date', 'write_date'], 'Sales Employee', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_master_employee_from_ss_to_mc')
 
     def create_purchase_order_from_mc_to_ss(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -599,18 +682,21 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             # integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             # integrator_transaksiMCtoSS.purchase_order_from_mc('purchase.order', ['name', 'partner_id', 'partner_ref', 'currency_id', 'date_approve', 'date_planned', 'picking_type_id', 'vit_trxid'], 'Transaksi Purchase Order', date_from, date_to)
-            integrator_master = DataIntegrator(mc_client, ss_client)
+            integrator_master = DataIntegrator(mc_client, ss_client, use_watermark=not (datefrom and dateto))
             integrator_master.transfer_data('purchase.order', ['partner_id', 'partner_ref', 'currency_id', 'date_approve', 'date_planned', 'picking_type_id', 'vit_trxid', 'order_line', 'create_date', 'write_date'], 'Transaksi Purchase Order', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_purchase_order_from_mc_to_ss')
 
     def delete_log_note(self):
         mc_client, ss_clients = self.get_config(False)
-        for ss_client in ss_clients:
+        # Log di MC cukup di-purge sekali langsung di database ini, bukan sekali per store
+        self.env['log.note'].sudo().purge_expired_logs(commit_chunks=True)
+        def sync_store(ss_client):
             integrator_master = DataIntegrator(mc_client, ss_client)
-            integrator_master.set_log_mc.delete_data_log_expired()
             integrator_master.set_log_ss.delete_data_log_expired()
+        self.run_stores(mc_client, ss_clients, sync_store, 'delete_log_note')
 
     def transfer_pos_order_invoice(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -630,9 +716,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_pos_order_invoice_ss_to_mc('pos.order', ['id', 'name', 'vit_pos_store', 'date_order', 'session_id', 'user_id', 'partner_id', 'pos_reference', 'vit_trxid', 'tracking_number', 'pricelist_id', 'employee_id', 'margin', 'amount_tax', 'amount_total', 'amount_paid', 'amount_return', 'state', 'lines', 'payment_ids'], 'Transaksi PoS Order Invoice', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_pos_order_invoice')
 
     def transfer_pos_order_invoice_rescue(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -652,9 +739,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_pos_order_invoice_session_closed('pos.order', ['id', 'name', 'vit_pos_store', 'date_order', 'session_id', 'user_id', 'partner_id', 'pos_reference', 'vit_trxid', 'tracking_number', 'pricelist_id', 'employee_id', 'margin', 'amount_tax', 'amount_total', 'amount_paid', 'amount_return', 'state', 'lines', 'payment_ids'], 'Transaksi PoS Order Invoice', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_pos_order_invoice_rescue')
 
     def create_end_of_shift(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -674,9 +762,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_end_shift_from_store('end.shift', ['doc_num', 'vit_notes', 'cashier_id', 'session_id', 'start_date', 'end_date', 'is_integrated', 'line_ids', 'modal'], 'Transfer End Shift')
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_end_of_shift')
 
     def create_update_session_pos(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -696,11 +785,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_pos_order_invoice_ss_to_mc_session_closed_before_inv('pos.order', ['id', 'name', 'date_order', 'session_id', 'user_id', 'partner_id', 'pos_reference', 'vit_trxid', 'tracking_number', 'pricelist_id', 'employee_id', 'margin', 'amount_tax', 'amount_total', 'amount_paid', 'amount_return', 'state', 'lines', 'payment_ids'], 'Transaksi PoS Order Invoice', date_from, date_to)
             integrator_transaksi.update_session_status('pos.session', ['name', 'state', 'start_at', 'stop_at', 'config_id', 'cash_register_balance_start', 'cash_register_balance_end_real'], 'Update Session PoS Order', date_from, date_to)
             integrator_transaksi.transfer_pos_order_session('pos.session', ['name', 'config_id', 'user_id', 'start_at', 'stop_at', 'state'], 'Master Session PoS Order Invoice', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_update_session_pos')
 
     def create_pos_order_utility(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -720,11 +810,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_pos_order_invoice_ss_to_mc('pos.order', ['id', 'name', 'date_order', 'session_id', 'user_id', 'partner_id', 'pos_reference', 'vit_trxid', 'tracking_number', 'pricelist_id', 'employee_id', 'margin', 'amount_tax', 'amount_total', 'amount_paid', 'amount_return', 'state', 'lines', 'payment_ids'], 'Transaksi PoS Order Invoice', date_from, date_to)
             integrator_transaksi.update_session_status('pos.ses?sion', ['name', 'id','state', 'is_store', 'start_at', 'stop_at', 'cash_register_balance_start', 'cash_register_balance_end_real'], "Session Updated", date_from, date_to)
             integrator_transaksi.transfer_pos_order_session('pos.session', ['name', 'config_id', 'is_store', 'user_id', 'start_at', 'stop_at', 'state'], 'Master Session PoS Order Invoice', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'create_pos_order_utility')
 
     def validate_GRPO(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -744,9 +835,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.validate_GRPO('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'move_ids_without_package'], 'Validate GRPO Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'validate_GRPO')
 
     def validate_goods_receipts_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -766,9 +858,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.validate_goods_receipts_store('stock.picking', ['id'], 'Validate GRPO Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'validate_goods_receipts_store')
 
     def validate_goods_issue_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -788,9 +881,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.validate_goods_issue_store('stock.picking', ['id'], 'Validate GRPO Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'validate_goods_issue_store')
 
     def transfer_goods_receipt(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -810,9 +904,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_goods_receipt('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'move_ids_without_package'],'Transaksi Goods Receipt', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_goods_receipt')
 
     def transfer_goods_issue(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -832,9 +927,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_goods_issue('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'move_ids_without_package'], 'Transaksi PoS Order Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_goods_issue')
 
     def transfer_internal_transfers(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -854,9 +950,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_internal_transfers_ss_to_mc('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'target_location', 'move_ids_without_package'], 'Transaksi TS Out', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_internal_transfers')
 
     def transfer_receipts_ss_to_mc(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -876,9 +973,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_receipts_ss('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'move_ids_without_package'],'Transaksi Receipt', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_receipts_ss_to_mc')
 
     def transfer_inventory_adjustment(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -898,9 +996,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_stock_adjustment('stock.move.line', ['reference', 'quantity', 'product_id', 'location_id', 'location_dest_id', 'company_id', 'state'], 'Transaksi Adjustment Stock', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_inventory_adjustment')
 
     def transfer_inventory_counting(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -920,9 +1019,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksi.transfer_inventory_stock('inventory.stock', ['id', 'doc_num', 'vit_notes', 'warehouse_id', 'location_id', 'company_id', 'create_date', 'from_date', 'to_date', 'inventory_date', 'state'], 'Transaksi Inventory Counting', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_inventory_counting')
 
     def transfer_ts_out(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -942,12 +1042,13 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksi.transfer_TSOUT_NEW('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'target_location', 'move_ids_without_package'], 'Transaksi TS Out', date_from, date_to)
             # integrator_transaksiMCtoSS.ts_in_from_mc('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'target_location', 'move_ids_without_package'], 'Transaksi TS In', date_from, date_to)
             # integrator_transaksi.validate_tsin_tsout('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'vit_trxid', 'move_ids_without_package'], 'Transaksi PoS Order Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_ts_out')
     
     def transfer_ts_in(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -967,11 +1068,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.ts_in_from_mc('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'vit_trxid', 'target_location', 'move_ids_without_package'], 'Transaksi TS In', date_from, date_to)
             # integrator_transaksi.validate_tsin_tsout('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'vit_trxid', 'move_ids_without_package'], 'Transaksi PoS Order Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_ts_in')
     
     def validate_transfer_ts_in(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -991,11 +1093,12 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksi = DataTransaksi(ss_client, mc_client)
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             # integrator_transaksiMCtoSS.ts_in_from_mc('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'vit_trxid', 'target_location', 'move_ids_without_package'], 'Transaksi TS In', date_from, date_to)
             integrator_transaksi.validate_tsin_tsout('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'vit_trxid', 'move_ids_without_package'], 'Transaksi PoS Order Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'validate_transfer_ts_in')
 
     def transfer_goods_receipt_from_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -1015,9 +1118,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.transfer_goods_receipt('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'vit_trxid', 'move_ids_without_package'], 'Transaksi Goods Receipts', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_goods_receipt_from_mc_to_store')
 
     def validate_invoice(self, mc, ss, datefrom, dateto):
             if mc and ss:
@@ -1037,9 +1141,10 @@ class SettingConfig(models.Model):
 
             date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-            for ss_client in ss_clients:
+            def sync_store(ss_client):
                 integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
                 integrator_transaksiMCtoSS.validate_invoice('pos.order', ['id'], 'Validate PoS Order Invoice', date_from, date_to)
+            self.run_stores(mc_client, ss_clients, sync_store, 'validate_invoice')
 
     def validate_ts_out_mc(self, mc, ss, datefrom, dateto):
             if mc and ss:
@@ -1059,9 +1164,10 @@ class SettingConfig(models.Model):
 
             date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-            for ss_client in ss_clients:
+            def sync_store(ss_client):
                 integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
                 integrator_transaksiMCtoSS.validate_tsout_mc('stock.picking', ['id'], 'Validate TS Out MC', date_from, date_to)
+            self.run_stores(mc_client, ss_clients, sync_store, 'validate_ts_out_mc')
 
     def validate_goods_receipts_mc(self, mc, ss, datefrom, dateto):
             if mc and ss:
@@ -1081,9 +1187,10 @@ class SettingConfig(models.Model):
 
             date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-            for ss_client in ss_clients:
+            def sync_store(ss_client):
                 integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
                 integrator_transaksiMCtoSS.validate_goods_receipts_mc('stock.picking', ['id'], 'Validate Goods Receipts MC', date_from, date_to)
+            self.run_stores(mc_client, ss_clients, sync_store, 'validate_goods_receipts_mc')
 
     def validate_goods_issue_mc(self, mc, ss, datefrom, dateto):
             if mc and ss:
@@ -1103,9 +1210,10 @@ class SettingConfig(models.Model):
 
             date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-            for ss_client in ss_clients:
+            def sync_store(ss_client):
                 integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
                 integrator_transaksiMCtoSS.validate_goods_issue_mc('stock.picking', ['id'], 'Validate Goods Receipts MC', date_from, date_to)
+            self.run_stores(mc_client, ss_clients, sync_store, 'validate_goods_issue_mc')
 
     def transfer_receipt_from_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -1125,9 +1233,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.transfer_receipts('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'vit_trxid', 'move_ids_without_package'], 'Transaksi Goods Receipts', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_receipt_from_mc_to_store')
 
     def transfer_goods_issue_from_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -1147,9 +1256,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.transfer_goods_issue('stock.picking', ['name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'vit_trxid', 'move_ids_without_package'], 'Transaksi Goods Issue', date_from, date_to)        
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_goods_issue_from_mc_to_store')
 
     def transfer_config_timbangan(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -1169,9 +1279,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.config_timbangan('barcode.config', ['id', 'prefix_timbangan', 'digit_awal', 'digit_akhir', 'panjang_barcode'], 'Transaksi Goods Issue', date_from, date_to)        
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_config_timbangan')
 
     def transfer_internal_transfers_from_mc_to_store(self, mc, ss, datefrom, dateto):
         if mc and ss:
@@ -1191,9 +1302,10 @@ class SettingConfig(models.Model):
 
         date_from, date_to = self.convert_datetime_to_string(date_from, date_to)
 
-        for ss_client in ss_clients:
+        def sync_store(ss_client):
             integrator_transaksiMCtoSS = DataTransaksiMCtoSS(mc_client, ss_client)
             integrator_transaksiMCtoSS.transfer_internal_transfers_mc_to_ss('stock.picking', ['id','name', 'partner_id', 'location_id', 'picking_type_id', 'location_dest_id', 'scheduled_date', 'date_done', 'origin', 'target_location', 'move_ids_without_package'], 'Transaksi PoS Order Inventory', date_from, date_to)
+        self.run_stores(mc_client, ss_clients, sync_store, 'transfer_internal_transfers_from_mc_to_store')
     
     def create(self, vals):
         if vals:
@@ -1225,7 +1337,10 @@ class SettingConfig(models.Model):
             if existing_record:
                 raise UserError(_("Server Name already exists"))
 
-        return super(SettingConfig, self).create(vals)
+        res = super(SettingConfig, self).create(vals)
+        # setting.config ikut di-cache oleh integrator (metadata_cache), hapus cache setiap ada perubahan
+        invalidate_metadata('setting.config')
+        return res
 
     # def write(self, vals):
         # if 'vit_config_url' in vals:
@@ -1289,7 +1404,9 @@ class SettingConfig(models.Model):
                 if not url or not db or not username or not password:
                     vals['vit_linked_server'] = False
                     vals['vit_state'] = 'failed'
-                    return super(SettingConfig, self).write(vals)
+                    res = super(SettingConfig, self).write(vals)
+                    invalidate_metadata('setting.config')
+                    return res
 
                 # Tambahkan protokol otomatis kalau tidak ada
                 if url and not url.startswith(('http://', 'https://')):
@@ -1310,7 +1427,14 @@ class SettingConfig(models.Model):
                 # vals['vit_state'] = 'failed'
                 raise UserError(_(f"URL: {url}, DB: {db}, Username: {username}, Error: {e}"))
 
-        return super(SettingConfig, self).write(vals)
+        res = super(SettingConfig, self).write(vals)
+        invalidate_metadata('setting.config')
+        return res
+
+    def unlink(self):
+        res = super(SettingConfig, self).unlink()
+        invalidate_metadata('setting.config')
+        return res
 
     def action_test_connect_button(self):
         for record in self:
@@ -1,23 +1,500 @@
+import gzip
 import json
+import atexit
+import time
 import random
-import urllib.request
+import weakref
+import concurrent.futures
+import threading
+import http.client
+import urllib.parse
+from queue import LifoQueue, Empty, Full
+
+
+class ConnectionPool:
+    # Pool koneksi HTTP keep-alive untuk satu host, aman dipakai bersama oleh banyak thread
+    def __init__(self, scheme, host, port, maxsize=20, timeout=300):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool = LifoQueue(maxsize=maxsize)
+
+    def new_connection(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    # Mengambil koneksi idle dari pool, buat baru jika pool kosong
+    def get(self):
+        try:
+            return self.pool.get_nowait(), True
+        except Empty:
+            return self.new_connection(), False
+
+    # Mengembalikan koneksi ke pool, tutup jika pool sudah penuh
+    def put(self, conn):
+        try:
+            self.pool.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except Empty:
+                break
+
+
+# Satu pool per (scheme, host, port) dipakai bersama oleh semua OdooClient di proses ini
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_server_key(url):
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme or 'http'
+    port = parts.port or (443 if scheme == 'https' else 80)
+    return scheme, parts.hostname, port
+
+
+def get_connection_pool(url, maxsize=20, timeout=300):
+    key = get_server_key(url)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(*key, maxsize=maxsize, timeout=timeout)
+            _pools[key] = pool
+        return pool
+
+
+# Batas request RPC paralel ke semua server dari proses ini, dibagi oleh semua AdaptiveLimiter
+GLOBAL_MAX_IN_FLIGHT = 64
+_global_slots = threading.BoundedSemaphore(GLOBAL_MAX_IN_FLIGHT)
+
+# Dipanggil setiap kali slot dilepas di limiter mana pun (slot global ikut bebas),
+# dipakai async_client untuk membangunkan coroutine yang menunggu slot tanpa polling
+_release_listeners = []
+
+
+def add_release_listener(callback):
+    _release_listeners.append(callback)
+
+
+class AdaptiveLimiter:
+    # Batas request RPC paralel ke satu server, diatur AIMD dari latency dan error yang teramati:
+    # naik +1 setiap `limit` request sukses, turun setengah saat error koneksi/HTTP 5xx
+    # atau latency melonjak jauh di atas rata-rata method yang sama.
+    # Thread pool integrator boleh lebih besar, thread di atas limit menunggu slot di sini
+    MIN_LIMIT = 1
+    MAX_LIMIT = 20
+    INITIAL_LIMIT = 4
+    DECREASE_FACTOR = 0.5
+    # Request dianggap lambat jika > LATENCY_TOLERANCE x rata-rata method dan > SLOW_LATENCY_FLOOR detik
+    LATENCY_TOLERANCE = 3.0
+    SLOW_LATENCY_FLOOR = 1.0
+    LATENCY_ALPHA = 0.05
+    # Penurunan berikutnya ditahan sekian detik agar satu lonjakan tidak langsung menjatuhkan limit ke minimum
+    DECREASE_COOLDOWN = 1.0
+
+    def __init__(self, name):
+        self.name = name
+        self.limit = float(self.INITIAL_LIMIT)
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.latency = {}
+        self.last_decrease = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.slow_calls = 0
+        self.decreases = 0
+        self.max_in_flight = 0
+        self.wait_time = 0.0
+
+    def acquire(self):
+        start_time = time.monotonic()
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        _global_slots.acquire()
+        with self.condition:
+            self.wait_time += time.monotonic() - start_time
+
+    # Versi non-blocking untuk event loop async_client (tidak boleh menunggu Condition di thread loop),
+    # jika gagal coroutine menunggu sampai release berikutnya (add_release_listener).
+    # Slot yang didapat dihitung di limit dan metrics yang sama dengan request sinkron
+    def try_acquire(self, start_time):
+        with self.condition:
+            if self.in_flight >= int(self.limit) or not _global_slots.acquire(blocking=False):
+                return False
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.wait_time += time.monotonic() - start_time
+            return True
+
+    # key = (model, method) atau nama endpoint, latency dibandingkan dengan rata-rata key yang sama
+    def release(self, key, latency, error=False):
+        _global_slots.release()
+        with self.condition:
+            self.in_flight -= 1
+            self.calls += 1
+            average = self.latency.get(key)
+            slow = average is not None and latency > max(average * self.LATENCY_TOLERANCE, self.SLOW_LATENCY_FLOOR)
+            self.latency[key] = latency if average is None else average + self.LATENCY_ALPHA * (latency - average)
+
+            if error or slow:
+                if error:
+                    self.errors += 1
+                else:
+                    self.slow_calls += 1
+                now = time.monotonic()
+                if now - self.last_decrease >= self.DECREASE_COOLDOWN:
+                    self.limit = max(float(self.MIN_LIMIT), self.limit * self.DECREASE_FACTOR)
+                    self.last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(float(self.MAX_LIMIT), self.limit + 1.0 / self.limit)
+            self.condition.notify_all()
+        for callback in _release_listeners:
+            callback()
+
+    def metrics(self):
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'calls': self.calls,
+                'errors': self.errors,
+                'slow_calls': self.slow_calls,
+                'decreases': self.decreases,
+                'wait_time': round(self.wait_time, 2),
+            }
+
+
+# Satu limiter per server (scheme, host, port), dipakai bersama seperti connection pool
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url):
+    key = get_server_key(url)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveLimiter(f"{key[1]}:{key[2]}")
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_concurrency_metrics():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    servers = {limiter.name: limiter.metrics() for limiter in limiters}
+    return {
+        'global_limit': GLOBAL_MAX_IN_FLIGHT,
+        'global_in_flight': sum(metrics['in_flight'] for metrics in servers.values()),
+        'servers': servers,
+    }
+
+
+class LogNoteBuffer:
+    # Buffer log.note untuk satu server: entry dikumpulkan di memori lalu dikirim dengan batch create
+    # setiap flush_size entry, di akhir stage (flush()), atau saat proses selesai.
+    # Failed log di-dedupe lokal per (vit_trx_key, vit_sync_desc), lalu dicek ke server dengan satu search_read saat flush
+    def __init__(self, client, flush_size=200):
+        self.client = client
+        self.flush_size = flush_size
+        self.entries = []
+        self.failed_keys = set()
+        self.lock = threading.Lock()
+        _log_buffers.add(self)
+
+    def add(self, log_records):
+        if isinstance(log_records, dict):
+            log_records = [log_records]
+        with self.lock:
+            self.entries.extend(log_records)
+            is_full = len(self.entries) >= self.flush_size
+        if is_full:
+            self.flush()
+
+    def add_failed(self, log_record):
+        key = (log_record.get('vit_trx_key'), str(log_record.get('vit_sync_desc')))
+        with self.lock:
+            if key in self.failed_keys:
+                return
+            self.failed_keys.add(key)
+        self.add(log_record)
+
+    def flush(self):
+        with self.lock:
+            entries, self.entries = self.entries, []
+            self.failed_keys = set()
+        if not entries:
+            return
+
+        try:
+            failed_entries = [entry for entry in entries if entry.get('vit_sync_status') == 'Failed']
+            if failed_entries:
+                existing_logs = self.client.execute_kw('log.note', 'search_read',
+                                                       [[['vit_sync_status', '=', 'Failed'], ['vit_trx_key', 'in', list({entry.get('vit_trx_key') for entry in failed_entries})]]],
+                                                       {'fields': ['vit_trx_key', 'vit_sync_desc']})
+                existing_keys = {(log['vit_trx_key'], str(log['vit_sync_desc'])) for log in existing_logs}
+                entries = [entry for entry in entries
+                           if entry.get('vit_sync_status') != 'Failed' or (entry.get('vit_trx_key'), str(entry.get('vit_sync_desc'))) not in existing_keys]
+
+            while entries:
+                self.client.execute_kw('log.note', 'create', [entries[:self.flush_size]])
+                del entries[:self.flush_size]
+        except Exception as e:
+            # Entry yang belum terkirim dikembalikan ke buffer dan dicoba lagi di flush berikutnya
+            print(f"An error occurred while flushing log note: {e}")
+            with self.lock:
+                self.entries[:0] = entries
+
+
+# Semua buffer yang masih hidup di-flush saat proses selesai agar log tidak hilang
+_log_buffers = weakref.WeakSet()
+
+
+@atexit.register
+def flush_log_buffers():
+    for log_buffer in list(_log_buffers):
+        log_buffer.flush()
+
+
+class SyncJobQueue:
+    # Antrian sync.job di MC untuk satu store + direction. Record diproses paralel,
+    # key yang gagal dicatat di MC dengan backoff dan diambil lagi oleh run berikutnya sampai berhasil
+    # atau menjadi dead letter. Replay mengandalkan cek data di target sebelum create
+    # (field_uniq di DataIntegrator, vit_trxid + vit_id untuk invoice POS di DataTransaksi)
+    MAX_WORKERS = 20
+    DUE_LIMIT = 500
+
+    def __init__(self, mc_client, store, direction):
+        self.mc_client = mc_client
+        self.store = store
+        self.direction = direction
+
+    def get_due_keys(self, model):
+        try:
+            return self.mc_client.execute_kw('sync.job', 'get_due_keys', [model, self.store, self.direction], {'limit': self.DUE_LIMIT})
+        except Exception as e:
+            print(f"Gagal membaca sync job {model}: {e}")
+            return []
+
+    def get_waiting_keys(self, model, keys):
+        if not keys:
+            return set()
+        try:
+            return set(self.mc_client.execute_kw('sync.job', 'get_waiting_keys', [model, self.store, self.direction, keys]))
+        except Exception as e:
+            print(f"Gagal membaca sync job {model}: {e}")
+            return set()
+
+    # Tambahkan record dengan job yang sudah jatuh tempo (dibaca ulang dari client sumber) ke records
+    def include_due(self, client, model, records, fields, key='id'):
+        loaded_keys = {str(record.get(key)) for record in records}
+        due_keys = [due_key for due_key in self.get_due_keys(model) if due_key not in loaded_keys]
+        if not due_keys:
+            return records
+        due_values = [int(due_key) for due_key in due_keys] if key == 'id' else due_keys
+        due_records = client.execute_kw(model, 'search_read', [[[key, 'in', due_values]]], {'fields': fields})
+        print(f"Retry {len(due_records)} record {model} dari sync job")
+        return list(records) + due_records
+
+    # process(record) dianggap gagal jika raise exception
+    # Record yang masih dalam backoff atau dead letter dilewati sampai jatuh tempo / di-retry manual
+    def run(self, model, records, process, key='id', max_workers=None):
+        done_keys = []
+        failed = {}
+        waiting_keys = self.get_waiting_keys(model, [str(record.get(key)) for record in records])
+        if waiting_keys:
+            print(f"Lewati {len(waiting_keys)} record {model} yang menunggu retry sync job")
+            records = [record for record in records if str(record.get(key)) not in waiting_keys]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or self.MAX_WORKERS) as executor:
+            future_to_record = {executor.submit(process, record): record for record in records}
+            for future in concurrent.futures.as_completed(future_to_record):
+                record = future_to_record[future]
+                try:
+                    future.result()
+                    done_keys.append(str(record.get(key)))
+                except Exception as e:
+                    failed[str(record.get(key))] = str(e)
+        self.report(model, done_keys, failed)
+
+    # Return False jika hasil tidak bisa dicatat di MC (record gagal tidak akan di-retry)
+    def report(self, model, done_keys, failed):
+        if not done_keys and not failed:
+            return True
+        try:
+            self.mc_client.execute_kw('sync.job', 'report_results', [model, self.store, self.direction, done_keys, failed])
+            return True
+        except Exception as e:
+            print(f"Gagal mencatat sync job {model}: {e}")
+            return False
+
+
+class MetadataCache:
+    # Cache metadata (fields_get, setting.config, dll) per proses, dipakai bersama oleh semua integrator.
+    # Key: (server, model, versi modul, query). Versi modul = write_date terakhir ir.module.module di server,
+    # sehingga upgrade modul otomatis membuat key baru. Entry juga kedaluwarsa setelah ttl detik
+    VERSION_TTL = 300
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.entries = {}
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get_version(self, client):
+        server = (client.url, client.db)
+        now = time.monotonic()
+        with self.lock:
+            version = self.versions.get(server)
+        if version and version[1] > now:
+            return version[0]
+        try:
+            modules = client.execute_kw('ir.module.module', 'search_read', [[['state', '=', 'installed']]],
+                                        {'fields': ['write_date'], 'order': 'write_date desc', 'limit': 1})
+            value = modules[0]['write_date'] if modules else None
+        except Exception:
+            # User RPC tanpa akses ir.module.module tetap bisa memakai cache, hanya mengandalkan ttl
+            value = None
+        with self.lock:
+            self.versions[server] = (value, now + self.VERSION_TTL)
+        return value
+
+    # Hasil yang dikembalikan dipakai bersama antar thread, jangan diubah oleh pemanggil
+    def get(self, client, model, query, loader, ttl=None):
+        key = (client.url, client.db, model, self.get_version(client), query)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and entry[1] > now:
+            return entry[0]
+        value = loader()
+        with self.lock:
+            self.entries[key] = (value, now + (self.ttl if ttl is None else ttl))
+        return value
+
+    def invalidate(self, url=None, db=None, model=None):
+        with self.lock:
+            if url is None and db is None and model is None:
+                self.entries.clear()
+                self.versions.clear()
+                return
+            for key in list(self.entries):
+                if (url is None or key[0] == url) and (db is None or key[1] == db) and (model is None or key[2] == model):
+                    del self.entries[key]
+
+
+metadata_cache = MetadataCache()
+
+
+# Hapus cache metadata, misalnya setelah setting.config diubah atau modul di-upgrade
+def invalidate_metadata(model=None):
+    metadata_cache.invalidate(model=model)
+
+
+class RPCHTTPError(Exception):
+    def __init__(self, status, reason, url):
+        super().__init__(f"HTTP {status} {reason} from {url}")
+        self.status = status
 
 
 class OdooClient:
+    # Error koneksi yang menandakan koneksi keep-alive sudah ditutup oleh server
+    STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
 
     # Konstruktor
-    def __init__(self, url, db, username, password, server_name):
+    # gzip_request hanya diaktifkan jika server/proxy di depan Odoo bisa membaca body request gzip
+    def __init__(self, url, db, username, password, server_name, pool_size=20, timeout=300, gzip_request=False):
         self.url = url
         self.db = db
         self.username = username
         self.password = password
-        self.uid = self.authenticate()
         self.server_name = server_name
+        self.gzip_request = gzip_request
+        self.path = urllib.parse.urlsplit(url).path or '/jsonrpc'
+        self.multicall_path = self.path.rsplit('/jsonrpc', 1)[0] + '/jsonrpc/multicall'
+        self.multicall_supported = True
+        self.pool = get_connection_pool(url, maxsize=pool_size, timeout=timeout)
+        self.limiter = get_limiter(url)
+        self.log_buffer = LogNoteBuffer(self)
+        self.uid = self.authenticate()
 
     # Melakukan autentikasi ke instance Odoo dan mendapatkan UID
     def authenticate(self):
         return self.call_odoo('common', 'authenticate', self.db, self.username, self.password, {})
 
+    # Shortcut untuk execute_kw, db/uid/password diisi dari client
+    def execute_kw(self, model, method, args, kwargs=None):
+        params = [self.db, self.uid, self.password, model, method, args]
+        if kwargs is not None:
+            params.append(kwargs)
+        return self.call_odoo('object', 'execute_kw', *params)
+
+    # fields_get lewat metadata_cache, hanya memanggil server saat cache kosong/kedaluwarsa
+    def fields_get_cached(self, model, attributes):
+        return metadata_cache.get(self, model, ('fields_get', tuple(attributes)),
+                                  lambda: self.execute_kw(model, 'fields_get', [], {'attributes': list(attributes)}))
+
+    # search_read untuk data konfigurasi yang jarang berubah (mis. setting.config) lewat metadata_cache
+    def search_read_cached(self, model, domain, fields=None, ttl=60):
+        kwargs = {'fields': fields} if fields else {}
+        return metadata_cache.get(self, model, ('search_read', json.dumps(domain), tuple(fields or ())),
+                                  lambda: self.execute_kw(model, 'search_read', [domain], kwargs), ttl=ttl)
+
+    def invalidate_metadata(self, model=None):
+        metadata_cache.invalidate(url=self.url, db=self.db, model=model)
+
+    # Mengirim banyak execute_kw dalam satu round trip lewat endpoint /jsonrpc/multicall
+    # calls: list of (model, method, args) atau (model, method, args, kwargs)
+    # Hasil berurutan sesuai calls, per call berisi {'result': ...} atau {'error': ...}
+    def execute_kw_batch(self, calls, batch_size=500):
+        results = []
+        for i in range(0, len(calls), batch_size):
+            results.extend(self.multicall(calls[i:i + batch_size]))
+        return results
+
+    def multicall(self, calls):
+        if self.multicall_supported:
+            payload = {
+                'jsonrpc': '2.0',
+                'method': 'call',
+                'params': {
+                    'db': self.db,
+                    'uid': self.uid,
+                    'password': self.password,
+                    'calls': [list(call) for call in calls],
+                },
+                'id': random.randint(0, 1000000000),
+            }
+            try:
+                result = self.post_json(payload, self.multicall_path)
+            except RPCHTTPError as e:
+                if e.status != 404:
+                    raise
+                # Server belum punya endpoint multicall, pakai call satu per satu
+                self.multicall_supported = False
+            else:
+                if result.get('error'):
+                    raise Exception(result['error'])
+                return result['result']
+
+        results = []
+        for call in calls:
+            try:
+                results.append({'result': self.execute_kw(*call)})
+            except Exception as e:
+                results.append({'error': e.args[0] if e.args else str(e)})
+        return results
+
     # Memanggil layanan JSON-RPC Odoo
     def call_odoo(self, service, method, *args):
         payload = {
@@ -30,11 +507,79 @@ class OdooClient:
             },
             'id': random.randint(0, 1000000000),
         }
-        headers = {'Content-Type': 'application/json'}
+        result = self.post_json(payload)
+        if result.get('error'):
+            raise Exception(result['error'])
+        return result['result']
+
+    # Key statistik latency limiter: (model, method) untuk execute_kw, nama method/endpoint untuk lainnya
+    def get_rpc_key(self, payload, path):
+        params = payload['params']
+        if 'calls' in params:
+            return path
+        args = params.get('args') or ()
+        if params.get('method') == 'execute_kw' and len(args) >= 5:
+            return args[3], args[4]
+        return params.get('service'), params.get('method')
+
+    # Setiap request menunggu slot AdaptiveLimiter server tujuan
+    def post_json(self, payload, path=None):
+        key = self.get_rpc_key(payload, path)
+        self.limiter.acquire()
+        start_time = time.monotonic()
+        error = False
+        try:
+            return self.post_json_request(payload, path)
+        except RPCHTTPError as e:
+            error = e.status >= 500 or e.status == 429
+            raise
+        except (OSError, http.client.HTTPException):
+            error = True
+            raise
+        finally:
+            self.limiter.release(key, time.monotonic() - start_time, error)
+
+    # Mengirim payload JSON lewat koneksi dari pool dan mengembalikan response yang sudah di-decode
+    def post_json_request(self, payload, path=None):
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(self.url, data, headers)
-        with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read().decode('utf-8'))
-            if result.get('error'):
-                raise Exception(result['error'])
-            return result['result']
+        if self.gzip_request:
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+
+        conn, reused = self.pool.get()
+        try:
+            try:
+                body, resp = self.send(conn, path or self.path, data, headers)
+            except self.STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # Koneksi dari pool sudah diputus server, ulangi sekali dengan koneksi baru
+                conn = self.pool.new_connection()
+                body, resp = self.send(conn, path or self.path, data, headers)
+        except Exception:
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self.pool.put(conn)
+
+        if resp.status != 200:
+            raise RPCHTTPError(resp.status, resp.reason, self.url)
+        if resp.getheader('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return json.loads(body.decode('utf-8'))
+
+    def send(self, conn, path, data, headers):
+        conn.request('POST', path, body=data, headers=headers)
+        resp = conn.getresponse()
+        # Response harus dibaca habis sebelum koneksi bisa dipakai ulang
+        body = resp.read()
+        return body, resp
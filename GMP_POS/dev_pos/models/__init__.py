@@ -50,4 +50,7 @@ from . import res_config_settings
 from . import return_approval
 from . import loyalty_generate_wizard
 from . import pos_order_debug
-from . import fix_gift_card
\ No newline at end of file
+from . import fix_gift_card
+from . import sync_watermark
+from . import sync_job
+from . import sync_record_hash
@@ -3,10 +3,16 @@ from datetime import datetime, timedelta
 import pytz
 from odoo import models, fields, api, SUPERUSER_ID
 from odoo.exceptions import UserError
+from odoo.tools import sql
 
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
     is_integrated = fields.Boolean(string="Integrated", default=False, readonly=True, tracking=True)
     vit_trxid = fields.Char(string="Transaction ID", default=False, tracking=True)
-    is_payment = fields.Boolean(string="Payment", default=False, tracking=True)
\ No newline at end of file
+    is_payment = fields.Boolean(string="Payment", default=False, tracking=True)
+
+    def init(self):
+        super(AccountMove, self).init()
+        # Index untuk keyset pagination API SAP (cursorField=write_date)
+        sql.create_index(self._cr, 'account_move_write_date_id_index', self._table, ['write_date', 'id'])
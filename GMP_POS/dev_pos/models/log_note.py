@@ -1,4 +1,5 @@
 from odoo import models, fields, api, _
+from odoo.tools import sql
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -7,6 +8,14 @@ class LogNote(models.Model):
     _name = "log.note"
     _description = "Log Note"
 
+    # Retensi log (hari) per vit_sync_status, status lain memakai DEFAULT_RETENTION_DAYS
+    RETENTION_DAYS = {
+        'Success': 30,
+        'Failed': 60,
+    }
+    DEFAULT_RETENTION_DAYS = 30
+    PURGE_CHUNK_SIZE = 10000
+
     vit_doc_type = fields.Char(string='Document Type')
     vit_trx_key = fields.Char(string='Transaction Key')
     vit_trx_date = fields.Datetime(string='Transaction Date')
@@ -16,17 +25,52 @@ class LogNote(models.Model):
     vit_start_sync = fields.Datetime(string='Start Sync')
     vit_end_sync = fields.Datetime(string='End Sync')
     vit_duration = fields.Char(string='Duration')
-    
+
+    def init(self):
+        # Index untuk purge per status dan tanggal sync (create_date untuk log tanpa vit_sync_date)
+        sql.create_index(self._cr, 'log_note_sync_status_purge_date_index', self._table, ['vit_sync_status', 'COALESCE(vit_sync_date, create_date)'])
+
+    # Hapus log yang melewati masa retensi langsung di database, per chunk agar transaksi tetap kecil
+    # retention_days: override {status: hari}, dipakai juga lewat RPC oleh SetLogMC/SetLogSS.delete_data_log_expired
+    # commit_chunks: commit per chunk, hanya dari autovacuum/cron yang memiliki transaksinya sendiri
+    @api.model
+    def purge_expired_logs(self, retention_days=None, commit_chunks=False):
+        self.check_access_rights('unlink')
+        retention = dict(self.RETENTION_DAYS, **(retention_days or {}))
+        now = fields.Datetime.now()
+        total_deleted = 0
+
+        policies = [("vit_sync_status = %s", [status], days) for status, days in retention.items()]
+        policies.append(("(vit_sync_status IS NULL OR vit_sync_status NOT IN %s)", [tuple(retention)], self.DEFAULT_RETENTION_DAYS))
+
+        for condition, params, days in policies:
+            limit_date = fields.Datetime.subtract(now, days=days)
+            while True:
+                self.env.cr.execute(f"""
+                    DELETE FROM {self._table}
+                     WHERE id IN (
+                        SELECT id FROM {self._table}
+                         WHERE {condition}
+                           AND COALESCE(vit_sync_date, create_date) < %s
+                         LIMIT %s
+                     )
+                """, params + [limit_date, self.PURGE_CHUNK_SIZE])
+                deleted = self.env.cr.rowcount
+                total_deleted += deleted
+                if deleted < self.PURGE_CHUNK_SIZE:
+                    break
+                if commit_chunks:
+                    # Commit per chunk supaya lock dan WAL tidak menumpuk saat menghapus jutaan baris
+                    self.env.cr.commit()
+
+        self.invalidate_model()
+        _logger.info(f"Purged {total_deleted} expired log.note records.")
+        return total_deleted
+
     @api.autovacuum
     def _gc_old_log_notes(self):
         _logger.info("Running autovacuum for log.note...")
-
-        # Ambil tanggal 2 bulan lalu
         try:
-            limit_date = fields.Datetime.subtract(fields.Datetime.now(), months=2)
-            domain = [('create_date', '<', fields.Datetime.to_string(limit_date))]
-            records = self.sudo().search(domain)
-            _logger.info(f"Found {len(records)} old log.note records to delete.")
-            records.unlink()
+            self.sudo().purge_expired_logs(commit_chunks=True)
         except Exception as e:
             _logger.error(f"Error during autovacuum for log.note: {e}")
\ No newline at end of file
@@ -0,0 +1,121 @@
+import logging
+from datetime import timedelta
+from odoo import models, fields, api, _
+from .sync_watermark import SyncWatermark
+
+_logger = logging.getLogger(__name__)
+
+
+class SyncJob(models.Model):
+    _name = "sync.job"
+    _description = "Sync Job"
+    _rec_name = "vit_record_key"
+    _order = "vit_next_retry_at, id"
+
+    # Antrian record yang gagal di-sync, di-drain ulang oleh integrator di run berikutnya
+    STATE_SELECTION = [
+        ('failed', 'Failed'),
+        ('done', 'Done'),
+        ('dead', 'Dead Letter'),
+    ]
+    MAX_ATTEMPTS = 8
+    # Backoff eksponensial: 1 menit, 2 menit, 4 menit, ... maksimal 6 jam
+    BACKOFF_BASE = 60
+    BACKOFF_MAX = 6 * 60 * 60
+    # Job done dihapus autovacuum setelah sekian hari
+    DONE_RETENTION_DAYS = 7
+
+    vit_model = fields.Char(string='Model', required=True, index=True)
+    vit_store = fields.Char(string='Store Server', required=True, index=True)
+    vit_direction = fields.Selection(selection=SyncWatermark.DIRECTION_SELECTION, string='Direction', required=True)
+    vit_record_key = fields.Char(string='Record Key', required=True)
+    vit_state = fields.Selection(selection=STATE_SELECTION, string='State', default='failed', required=True, index=True)
+    vit_attempts = fields.Integer(string='Attempts')
+    vit_next_retry_at = fields.Datetime(string='Next Retry At', index=True)
+    vit_last_error = fields.Text(string='Last Error')
+    vit_done_date = fields.Datetime(string='Done Date')
+
+    _sql_constraints = [
+        ('vit_sync_job_unique', 'unique(vit_model, vit_store, vit_direction, vit_record_key)', 'Sync job per model, store, direction, dan record harus unik.'),
+    ]
+
+    def _backoff(self, attempts):
+        return timedelta(seconds=min(self.BACKOFF_BASE * 2 ** max(attempts - 1, 0), self.BACKOFF_MAX))
+
+    def _job_domain(self, model, store, direction):
+        return [('vit_model', '=', model), ('vit_store', '=', store), ('vit_direction', '=', direction)]
+
+    # Dipanggil lewat RPC oleh integrator: key record yang sudah waktunya di-retry
+    @api.model
+    def get_due_keys(self, model, store, direction, limit=500):
+        jobs = self.sudo().search(self._job_domain(model, store, direction) + [
+            ('vit_state', '=', 'failed'),
+            ('vit_next_retry_at', '<=', fields.Datetime.now()),
+        ], limit=limit)
+        return jobs.mapped('vit_record_key')
+
+    # Key yang masih menunggu backoff atau sudah dead letter, dilewati integrator
+    @api.model
+    def get_waiting_keys(self, model, store, direction, keys):
+        jobs = self.sudo().search(self._job_domain(model, store, direction) + [
+            ('vit_record_key', 'in', [str(key) for key in keys]),
+            '|', ('vit_state', '=', 'dead'),
+            '&', ('vit_state', '=', 'failed'), ('vit_next_retry_at', '>', fields.Datetime.now()),
+        ])
+        return jobs.mapped('vit_record_key')
+
+    # done_keys: [key, ...], failed: {key: error}
+    # Key yang gagal dicatat/diupdate dengan backoff, key yang berhasil menutup job lama jika ada
+    @api.model
+    def report_results(self, model, store, direction, done_keys, failed):
+        now = fields.Datetime.now()
+        keys = [str(key) for key in done_keys] + [str(key) for key in failed]
+        jobs = self.sudo().search(self._job_domain(model, store, direction) + [('vit_record_key', 'in', keys)])
+        job_dict = {job.vit_record_key: job for job in jobs}
+
+        done_jobs = self.sudo().browse([job_dict[str(key)].id for key in done_keys if str(key) in job_dict])
+        done_jobs.filtered(lambda job: job.vit_state != 'done').write({
+            'vit_state': 'done',
+            'vit_done_date': now,
+            'vit_next_retry_at': False,
+        })
+
+        create_vals = []
+        dead_count = 0
+        for key, error in failed.items():
+            key = str(key)
+            job = job_dict.get(key)
+            if job and job.vit_state == 'dead':
+                # Dead letter tidak dihidupkan lagi oleh run berikutnya, hanya lewat action_retry
+                job.write({'vit_last_error': error})
+                continue
+            attempts = (job.vit_attempts if job and job.vit_state == 'failed' else 0) + 1
+            vals = {
+                'vit_state': 'dead' if attempts >= self.MAX_ATTEMPTS else 'failed',
+                'vit_attempts': attempts,
+                'vit_next_retry_at': now + self._backoff(attempts),
+                'vit_last_error': error,
+                'vit_done_date': False,
+            }
+            if vals['vit_state'] == 'dead':
+                dead_count += 1
+            if job:
+                job.write(vals)
+            else:
+                create_vals.append(dict(vals, vit_model=model, vit_store=store, vit_direction=direction, vit_record_key=key))
+        if create_vals:
+            self.sudo().create(create_vals)
+
+        _logger.info("Sync job %s %s (%s): %s berhasil, %s gagal, %s dead letter",
+                     model, store, direction, len(done_keys), len(failed), dead_count)
+        return True
+
+    # Dead letter dikembalikan ke antrian setelah penyebabnya diperbaiki
+    def action_retry(self):
+        self.filtered(lambda job: job.vit_state != 'done').write({'vit_state': 'failed', 'vit_attempts': 0, 'vit_next_retry_at': fields.Datetime.now()})
+        return True
+
+    @api.autovacuum
+    def _gc_done_jobs(self):
+        limit_date = fields.Datetime.now() - timedelta(days=self.DONE_RETENTION_DAYS)
+        self.sudo().search([('vit_state', '=', 'done'), ('vit_done_date', '<', limit_date)]).unlink()
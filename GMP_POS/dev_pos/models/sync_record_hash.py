@@ -0,0 +1,44 @@
+from odoo import models, fields, api, _
+from psycopg2.extras import execute_values
+
+
+class SyncRecordHash(models.Model):
+    _name = "sync.record.hash"
+    _description = "Sync Record Hash"
+    _rec_name = "vit_model"
+
+    # Hash isi record MC (field yang di-sync) saat terakhir berhasil dikirim ke store.
+    # DataIntegrator melewati record yang hash-nya sama tanpa membaca dan membandingkan data di store
+    vit_model = fields.Char(string='Model', required=True)
+    vit_store = fields.Char(string='Store Server', required=True)
+    vit_res_id = fields.Integer(string='Record ID', required=True)
+    vit_hash = fields.Char(string='Hash')
+
+    _sql_constraints = [
+        ('vit_record_hash_unique', 'unique(vit_model, vit_store, vit_res_id)', 'Hash per model, store, dan record harus unik.'),
+    ]
+
+    # Dipanggil lewat RPC: res_ids -> {res_id (string): hash}, res_ids None = semua record model + store
+    @api.model
+    def get_hashes(self, model, store, res_ids=None):
+        query = "SELECT vit_res_id, vit_hash FROM sync_record_hash WHERE vit_model = %s AND vit_store = %s"
+        params = [model, store]
+        if res_ids is not None:
+            query += " AND vit_res_id = ANY(%s)"
+            params.append([int(res_id) for res_id in res_ids])
+        self.env.cr.execute(query, params)
+        return {str(res_id): record_hash for res_id, record_hash in self.env.cr.fetchall()}
+
+    # hashes: {res_id (string): hash}, upsert langsung dengan SQL karena bisa ribuan baris per stage
+    @api.model
+    def set_hashes(self, model, store, hashes):
+        if not hashes:
+            return True
+        values = [(model, store, int(res_id), record_hash, self.env.uid, self.env.uid) for res_id, record_hash in hashes.items()]
+        execute_values(self.env.cr._obj, """
+            INSERT INTO sync_record_hash (vit_model, vit_store, vit_res_id, vit_hash, create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (vit_model, vit_store, vit_res_id)
+            DO UPDATE SET vit_hash = EXCLUDED.vit_hash, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+        """, values, template="(%s, %s, %s, %s, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')", page_size=1000)
+        return True
@@ -0,0 +1,46 @@
+from odoo import models, fields, api, _
+
+
+class SyncWatermark(models.Model):
+    _name = "sync.watermark"
+    _description = "Sync Watermark"
+
+    DIRECTION_SELECTION = [
+        ('mc_to_ss', 'Master Console to Store Server'),
+        ('ss_to_mc', 'Store Server to Master Console'),
+    ]
+
+    vit_model = fields.Char(string='Model', required=True)
+    vit_store = fields.Char(string='Store Server', required=True)
+    vit_direction = fields.Selection(selection=DIRECTION_SELECTION, string='Direction', required=True)
+    vit_write_date = fields.Datetime(string='Last Write Date')
+    vit_last_id = fields.Integer(string='Last ID')
+    vit_sync_date = fields.Datetime(string='Sync Date')
+
+    _sql_constraints = [
+        ('vit_watermark_unique', 'unique(vit_model, vit_store, vit_direction)', 'Watermark per model, store, dan direction harus unik.'),
+    ]
+
+    # Dipanggil lewat RPC oleh DataIntegrator: write_date tertinggi dari window sync terakhir yang selesai.
+    # vit_last_id tidak lagi dipakai sebagai keyset lintas run (selalu 0)
+    @api.model
+    def get_watermark(self, model, store, direction):
+        watermark = self.sudo().search([('vit_model', '=', model), ('vit_store', '=', store), ('vit_direction', '=', direction)], limit=1)
+        return {
+            'write_date': fields.Datetime.to_string(watermark.vit_write_date) if watermark.vit_write_date else False,
+            'last_id': watermark.vit_last_id,
+        }
+
+    @api.model
+    def set_watermark(self, model, store, direction, write_date, last_id):
+        watermark = self.sudo().search([('vit_model', '=', model), ('vit_store', '=', store), ('vit_direction', '=', direction)], limit=1)
+        vals = {
+            'vit_write_date': write_date,
+            'vit_last_id': last_id,
+            'vit_sync_date': fields.Datetime.now(),
+        }
+        if watermark:
+            watermark.write(vals)
+        else:
+            self.sudo().create(dict(vals, vit_model=model, vit_store=store, vit_direction=direction))
+        return True
@@ -14,6 +14,33 @@ class TokenGenerate(models.Model):
     vit_encrypt = fields.Char(string='Encrypt', readonly=True)
     vit_decrypt = fields.Char(string='Decrypt', readonly=True)
 
+    # Client yang boleh memakai token untuk REST API (check_authorization)
+    API_CLIENTS = ['Odoo', 'SAP', 'Netsuite']
+
+    # sha256(token) -> (token, client), di-cache per worker. Cache registry dibersihkan setiap token.generate
+    # berubah sehingga invalidasi juga sampai ke worker lain
+    @api.model
+    @tools.ormcache()
+    def _get_token_clients(self):
+        tokens = self.sudo().search_read([('vit_client_name', 'in', self.API_CLIENTS), ('vit_encrypt', '!=', False)], ['vit_client_name', 'vit_encrypt'])
+        return {hashlib.sha256(token['vit_encrypt'].encode()).hexdigest(): (token['vit_encrypt'], token['vit_client_name']) for token in tokens}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(TokenGenerate, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super(TokenGenerate, self).write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(TokenGenerate, self).unlink()
+        self.env.registry.clear_cache()
+        return res
+
     def action_generate_key(self):
         """Generate MAC address as key."""
         try:
@@ -126,6 +126,7 @@
             'integrasi_pos/static/src/js/discount_amount_popup.js',
             'integrasi_pos/static/src/js/discount_button.js',
             'integrasi_pos/static/src/js/hold_transaction.js',
+            'integrasi_pos/static/src/js/barcode_index.js',
             'integrasi_pos/static/src/js/product_screen_override.js',
             'integrasi_pos/static/src/js/selection_popup_barcode.js',
             'integrasi_pos/static/src/js/product_list.js',
@@ -4,6 +4,8 @@ from . import data_transaksi
 from . import data_transaksiMCtoSS
 # from . import master_main
 from . import odoo_client
+from . import async_client
+from . import multicall
 from . import post_data_pos
 from . import config_settings
 from . import barcode_search
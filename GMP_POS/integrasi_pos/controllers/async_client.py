@@ -0,0 +1,249 @@
+import asyncio
+import gzip
+import json
+import random
+import ssl
+import threading
+import time
+from collections import deque
+from .odoo_client import RPCHTTPError, add_release_listener, get_server_key
+
+# Semua coroutine RPC berjalan di satu event loop bersama di thread daemon.
+# Kode integrator tetap sinkron, menunggu hasil lewat run_sync
+_loop = None
+_loop_lock = threading.Lock()
+
+# Request async memakai AdaptiveLimiter server tujuan (dan slot global) yang sama dengan OdooClient.
+# Selama limit penuh coroutine menunggu event ini, yang di-set (lalu diganti baru) setiap ada slot dilepas.
+# Hanya disentuh dari thread event loop
+_slot_released = None
+
+
+def get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='odoo-async-rpc', daemon=True).start()
+            add_release_listener(notify_slot_released)
+        return _loop
+
+
+def get_slot_released_event():
+    global _slot_released
+    if _slot_released is None:
+        _slot_released = asyncio.Event()
+    return _slot_released
+
+
+def set_slot_released():
+    global _slot_released
+    if _slot_released is not None:
+        _slot_released.set()
+        _slot_released = None
+
+
+# Release bisa terjadi di thread mana pun (request sinkron maupun async), dijadwalkan ke event loop
+def notify_slot_released():
+    _loop.call_soon_threadsafe(set_slot_released)
+
+
+def run_sync(coro, timeout=None):
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+
+class AsyncConnectionPool:
+    # Pool koneksi keep-alive asyncio untuk satu host, hanya dipakai dari dalam event loop bersama
+    STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError)
+
+    def __init__(self, scheme, host, port, maxsize=20, timeout=300):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self.idle = deque()
+
+    async def new_connection(self):
+        ssl_context = ssl.create_default_context() if self.scheme == 'https' else None
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=ssl_context), self.timeout)
+
+    async def get(self):
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await self.new_connection()
+        return reader, writer, False
+
+    def put(self, reader, writer):
+        if len(self.idle) < self.maxsize:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+
+    # Request HTTP/1.1 minimal: body dengan Content-Length atau chunked, koneksi dipakai ulang jika tidak ditutup server.
+    # Jumlah request bersamaan dibatasi AdaptiveLimiter di AsyncOdooClient.post_json
+    async def request(self, path, data, headers):
+        reader, writer, reused = await self.get()
+        try:
+            try:
+                response = await asyncio.wait_for(self.send(reader, writer, path, data, headers), self.timeout)
+            except self.STALE_CONNECTION_ERRORS:
+                writer.close()
+                if not reused:
+                    raise
+                # Koneksi dari pool sudah diputus server, ulangi sekali dengan koneksi baru
+                reader, writer = await self.new_connection()
+                response = await asyncio.wait_for(self.send(reader, writer, path, data, headers), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+
+        status, reason, response_headers, body, will_close = response
+        if will_close:
+            writer.close()
+        else:
+            self.put(reader, writer)
+        return status, reason, response_headers, body
+
+    async def send(self, reader, writer, path, data, headers):
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        head = [f"POST {path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(data)}"]
+        head.extend(f"{key}: {value}" for key, value in headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            response_headers[key.strip().lower()] = value.strip()
+
+        will_close = version == 'HTTP/1.0' or response_headers.get('connection', '').lower() == 'close'
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip(), 16)
+                if not size:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            body = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            body = await reader.read()
+            will_close = True
+        return int(status), reason, response_headers, body, will_close
+
+
+# Satu pool per (scheme, host, port), dibuat di dalam event loop bersama
+_async_pools = {}
+
+
+def get_async_pool(url):
+    key = get_server_key(url)
+    pool = _async_pools.get(key)
+    if pool is None:
+        pool = AsyncConnectionPool(*key)
+        _async_pools[key] = pool
+    return pool
+
+
+class AsyncOdooClient:
+    # Padanan async OdooClient untuk server yang sama, db/uid/password diambil dari client sinkron
+    def __init__(self, client):
+        self.client = client
+
+    async def call_odoo(self, service, method, *args):
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {
+                'service': service,
+                'method': method,
+                'args': args,
+            },
+            'id': random.randint(0, 1000000000),
+        }
+        result = await self.post_json(payload)
+        if result.get('error'):
+            raise Exception(result['error'])
+        return result['result']
+
+    async def execute_kw(self, model, method, args, kwargs=None):
+        params = [self.client.db, self.client.uid, self.client.password, model, method, args]
+        if kwargs is not None:
+            params.append(kwargs)
+        return await self.call_odoo('object', 'execute_kw', *params)
+
+    # Sama seperti OdooClient.post_json: tunggu slot limiter server, latency dan error ikut mengatur limit
+    async def post_json(self, payload, path=None):
+        limiter = self.client.limiter
+        key = self.client.get_rpc_key(payload, path)
+        start_time = time.monotonic()
+        while True:
+            # Event diambil sebelum try_acquire supaya release di antara keduanya tetap membangunkan
+            slot_released = get_slot_released_event()
+            if limiter.try_acquire(start_time):
+                break
+            await slot_released.wait()
+        start_time = time.monotonic()
+        error = False
+        try:
+            return await self.post_json_request(payload, path)
+        except RPCHTTPError as e:
+            error = e.status >= 500 or e.status == 429
+            raise
+        except (OSError, asyncio.IncompleteReadError):
+            error = True
+            raise
+        finally:
+            limiter.release(key, time.monotonic() - start_time, error)
+
+    async def post_json_request(self, payload, path=None):
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
+        data = json.dumps(payload).encode('utf-8')
+        if self.client.gzip_request:
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+
+        status, reason, response_headers, body = await get_async_pool(self.client.url).request(path or self.client.path, data, headers)
+        if status != 200:
+            raise RPCHTTPError(status, reason, self.client.url)
+        if response_headers.get('content-encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return json.loads(body.decode('utf-8'))
+
+
+def get_async_client(client):
+    async_client = getattr(client, 'async_client', None)
+    if async_client is None:
+        async_client = client.async_client = AsyncOdooClient(client)
+    return async_client
+
+
+async def gather_execute_kw(calls):
+    return await asyncio.gather(*[get_async_client(call[0]).execute_kw(*call[1:]) for call in calls], return_exceptions=True)
+
+
+# Menjalankan banyak execute_kw ke satu atau beberapa server bersamaan dari kode sinkron.
+# calls: list of (client, model, method, args) atau (client, model, method, args, kwargs)
+# Hasil berurutan sesuai calls, call yang gagal menghasilkan objek Exception
+def execute_kw_concurrent(calls):
+    if not calls:
+        return []
+    return run_sync(gather_execute_kw(calls))
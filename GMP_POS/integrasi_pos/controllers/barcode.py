@@ -13,3 +13,14 @@ class BarcodeConfigController(http.Controller):
             'panjang_barcode': config.panjang_barcode,
             'multiple_barcode_activate': config.multiple_barcode_activate
         }
+
+    # Index barcode -> produk (pos.barcode.index) dalam bentuk JSON gzip.
+    # since = watermark index yang sudah disimpan POS, kosong untuk mengambil index penuh
+    @http.route('/pos/barcode_index', type='http', auth='user', methods=['GET'])
+    def get_barcode_index(self, since=None, **kw):
+        blob = request.env['pos.barcode.index'].sudo().get_index_blob(since or None)
+        return request.make_response(blob, headers=[
+            ('Content-Type', 'application/json'),
+            ('Content-Encoding', 'gzip'),
+            ('Cache-Control', 'no-store'),
+        ])
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import pytz
 import re
 import concurrent.futures
+from .odoo_client import SyncJobQueue
 from threading import Lock
 import datetime
 
@@ -13,6 +14,8 @@ class DataTransaksi:
         self.target_client = target_client
         self.set_log_mc = SetLogMC(self.source_client)
         self.set_log_ss = SetLogSS(self.target_client)
+        # sync.job ada di MC (target_client), key = id transaksi di store
+        self.job_queue = SyncJobQueue(self.target_client, self.source_client.server_name, 'ss_to_mc')
 
     # Master Console --> Store Server
     # Store Server --> Master Console
@@ -282,10 +285,9 @@ class DataTransaksi:
 
                 except Exception as e:
                     print(f"💥 Gagal proses MO ID {record.get('id')}: {e}")
+                    raise
                     
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_unbuild_order, record) for record in transaksi_unbuild_order]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_unbuild_order, process_unbuild_order)
 
         except Exception as e:
             print(f"💣 ERROR di transfer_unbiild_order: {e}")
@@ -697,11 +699,9 @@ class DataTransaksi:
                     print(f"💥 Gagal proses MO ID {record.get('id')}: {e}")
                     import traceback
                     traceback.print_exc()
+                    raise
 
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_mrp_order, record) for record in transaksi_manufacture_order]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_manufacture_order, process_mrp_order)
 
         except Exception as e:
             print(f"💣 ERROR di transfer_manufacture_order: {e}")
@@ -928,11 +928,10 @@ class DataTransaksi:
                     write_date = self.get_write_date(model_name, record['id'])
                     self.set_log_mc.create_log_note_failed(record, 'Inventory Stock', error_message, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Inventory Stock', error_message, write_date)
+                    raise
             
             # Proses semua inventory stock dengan multithreading
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_inventory_stock, record) for record in inventory_stocks]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, inventory_stocks, process_inventory_stock)
             
             print(f"Transfer {description} selesai.")
             
@@ -958,38 +957,6 @@ class DataTransaksi:
             employee_ids = [record.get('employee_id')[0] if isinstance(record.get('employee_id'), list) else record.get('employee_id') for record in transaksi_posorder_invoice]
             pricelist_id = [record.get('pricelist_id')[0] if isinstance(record.get('pricelist_id'), list) else record.get('pricelist_id') for record in transaksi_posorder_invoice]
 
-            # Fetch partners
-            partners_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                        self.source_client.uid, self.source_client.password,
-                                                        'res.partner', 'search_read',
-                                                        [[['id', 'in', partner_ids]]],
-                                                        {'fields': ['id', 'id_mc']})
-            partners_source_dict = {partner['id']: partner['id_mc'] for partner in partners_source}
-
-            # Fetch sessions
-            sessions_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                        self.source_client.uid, self.source_client.password,
-                                                        'pos.session', 'search_read',
-                                                        [[['id', 'in', session_ids]]],
-                                                        {'fields': ['id', 'id_mc']})
-            sessions_source_dict = {session['id']: session['id_mc'] for session in sessions_source}
-
-            # Fetch employees
-            employees_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                            self.source_client.uid, self.source_client.password,
-                                                            'hr.employee', 'search_read',
-                                                            [[['id', 'in', employee_ids]]],
-                                                            {'fields': ['id', 'id_mc']})
-            employees_source_dict = {employee['id']: employee['id_mc'] for employee in employees_source}
-
-            # Fetch pricelist
-            pricelist_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                            self.source_client.uid, self.source_client.password,
-                                                            'product.pricelist', 'search_read',
-                                                            [[['id', 'in', pricelist_id]]],
-                                                            {'fields': ['id', 'id_mc']})
-            pricelist_source_dict = {pricelist['id']: pricelist['id_mc'] for pricelist in pricelist_source}
-
             # Pre-fetch all pos.order.line and pos.payment data
             order_ids = [record['id'] for record in transaksi_posorder_invoice]
             
@@ -1021,16 +988,8 @@ class DataTransaksi:
                     pos_payments_dict[order_id] = []
                 pos_payments_dict[order_id].append(payment)
 
-            # Pre-fetch existing pos orders in target
-            existing_pos_order_invoice_dict = {}
-            for record in transaksi_posorder_invoice:
-                existing_pos_order_invoice = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
-                                                                        self.target_client.uid, self.target_client.password,
-                                                                        'pos.order', 'search_read',
-                                                                        [[['vit_trxid', '=', record.get('name')], ['vit_id', '=', record.get('id')]]],
-                                                                        {'fields': ['id'], 'limit': 1})
-                if existing_pos_order_invoice:
-                    existing_pos_order_invoice_dict[record['id']] = existing_pos_order_invoice[0]['id']
+            # Pre-fetch existing pos orders in target, satu search_read untuk semua order
+            existing_pos_order_invoice_dict = self.get_existing_pos_order_invoice(transaksi_posorder_invoice)
 
             # ✅ PERBAIKAN: Extract user_ids dari pos.order.line dengan lebih aman
             user_ids_from_lines = []
@@ -1058,6 +1017,7 @@ class DataTransaksi:
                                                             {'fields': ['id', 'user_id', 'id_mc']})
                 
                 # Create mapping: source user_id -> target employee id_mc
+                employee_pairs = []
                 for emp in users_source:
                     source_user_id = emp.get('user_id')
                     if isinstance(source_user_id, list) and len(source_user_id) > 0:
@@ -1066,19 +1026,20 @@ class DataTransaksi:
                     target_employee_id_mc = emp.get('id_mc')
                     
                     if source_user_id and target_employee_id_mc:
-                        # Now get the user_id from target employee
-                        target_employee = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
-                                                                    self.target_client.uid, self.target_client.password,
-                                                                    'hr.employee', 'search_read',
-                                                                    [[['id', '=', target_employee_id_mc]]],
-                                                                    {'fields': ['user_id'], 'limit': 1})
-                        
-                        if target_employee and target_employee[0].get('user_id'):
-                            target_user_id = target_employee[0]['user_id']
-                            if isinstance(target_user_id, list) and len(target_user_id) > 0:
-                                target_user_id = target_user_id[0]
-                            users_source_dict[source_user_id] = target_user_id
-                            print(f"✅ Mapped user_id: source {source_user_id} -> target {target_user_id}")
+                        employee_pairs.append((source_user_id, target_employee_id_mc))
+
+                # Now get the user_id from target employee, semua employee dalam satu search_read
+                target_employees = self.target_client.execute_kw('hr.employee', 'search_read',
+                                                                 [[['id', 'in', list({target_employee_id_mc for source_user_id, target_employee_id_mc in employee_pairs})]]],
+                                                                 {'fields': ['user_id']}) if employee_pairs else []
+                target_employees_dict = {str(employee['id']): employee['user_id'] for employee in target_employees}
+                for source_user_id, target_employee_id_mc in employee_pairs:
+                    target_user_id = target_employees_dict.get(str(target_employee_id_mc))
+                    if target_user_id:
+                        if isinstance(target_user_id, list) and len(target_user_id) > 0:
+                            target_user_id = target_user_id[0]
+                        users_source_dict[source_user_id] = target_user_id
+                        print(f"✅ Mapped user_id: source {source_user_id} -> target {target_user_id}")
             
             print(f"✅ Total user_id mappings created: {len(users_source_dict)}")
 
@@ -1138,25 +1099,25 @@ class DataTransaksi:
                 for prod in product_target_service:
                     product_target_dict[prod['name']] = prod['id']
 
-            # Fetch taxes
+            # Terjemahan id store -> id_mc untuk semua model dalam satu RPC lewat id.mc.mapping
             tax_ids = [tax_id for product in pos_order_lines for tax_id in product.get('tax_ids', [])]
-            source_taxes = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                        self.source_client.uid, self.source_client.password,
-                                                        'account.tax', 'search_read',
-                                                        [[['id', 'in', tax_ids]]],
-                                                        {'fields': ['id', 'id_mc']})
-            source_taxes_dict = {tax['id']: tax['id_mc'] for tax in source_taxes}
-
-            # Pre-fetch payment methods
             payment_method_ids = [payment['payment_method_id'][0] for payment in pos_payments if payment.get('payment_method_id')]
-            payment_method_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
-                                                                self.source_client.uid, self.source_client.password,
-                                                                'pos.payment.method', 'search_read',
-                                                                [[['id', 'in', payment_method_ids]]],
-                                                                {'fields': ['id', 'id_mc', 'name']})
-            payment_method_source_dict = {payment['id']: payment['id_mc'] for payment in payment_method_source}
+            id_mc_map = self.get_id_mc_map({
+                'res.partner': partner_ids,
+                'pos.session': session_ids,
+                'hr.employee': employee_ids,
+                'product.pricelist': pricelist_id,
+                'account.tax': tax_ids,
+                'pos.payment.method': payment_method_ids,
+            })
+            partners_source_dict = id_mc_map['res.partner']
+            sessions_source_dict = id_mc_map['pos.session']
+            employees_source_dict = id_mc_map['hr.employee']
+            pricelist_source_dict = id_mc_map['product.pricelist']
+            source_taxes_dict = id_mc_map['account.tax']
+            payment_method_source_dict = id_mc_map['pos.payment.method']
             
-            # Function to process each record
+            # Function to process each record, return pos_order_data yang siap di-create di MC
             def process_record(record):
                 if record['id'] in existing_pos_order_invoice_dict:
                     print(f"Pos order {record['id']} already exists in target system. Skipping.")
@@ -1321,31 +1282,111 @@ class DataTransaksi:
 
                 print(f"✅ POS Order Data prepared for order {record.get('name')} with {len(pos_order_invoice_line_ids)} lines")
 
+                return pos_order_data
+
+            # Use ThreadPoolExecutor to prepare records in parallel
+            print(f"✅ Starting parallel processing of {len(transaksi_posorder_invoice)} orders with 20 workers...")
+            pos_orders_to_create = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
+                futures = {executor.submit(process_record, record): record for record in transaksi_posorder_invoice}
+                for future in concurrent.futures.as_completed(futures):
+                    record = futures[future]
+                    try:
+                        pos_order_data = future.result()
+                        if pos_order_data:
+                            pos_orders_to_create.append((record, pos_order_data))
+                    except Exception as e:
+                        message_exception = f"Terjadi kesalahan saat membuat invoice: {e}"
+                        print(f"❌ Error preparing POS Order {record.get('name')}: {message_exception}")
+                        write_date = self.get_write_date(model_name, record['id'])
+                        self.set_log_mc.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+                        self.set_log_ss.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+
+            # Create di MC per batch (multi-record create), lalu write-back is_integrated/id_mc ke store
+            batch_size = 100
+            for i in range(0, len(pos_orders_to_create), batch_size):
+                self.create_pos_order_invoice_batch(model_name, pos_orders_to_create[i:i + batch_size])
+
+            print(f"✅ Finished processing all {len(transaksi_posorder_invoice)} orders")
+
+        except Exception as e:
+            print(f"❌ Error during processing: {e}")
+            import traceback
+            print(traceback.format_exc())
+
+    # Mengambil id_mc untuk banyak model sekaligus: {model: [id store]} -> {model: {id store: id_mc}}
+    # Store tanpa model id.mc.mapping tetap dilayani dengan search_read id_mc per model
+    def get_id_mc_map(self, model_ids):
+        try:
+            id_mc_map = self.source_client.execute_kw('id.mc.mapping', 'get_id_mc_map', [model_ids])
+            return {model: {int(res_id): id_mc for res_id, id_mc in id_map.items()} for model, id_map in id_mc_map.items()}
+        except Exception as e:
+            print(f"id.mc.mapping not available on {self.source_client.server_name}, fallback to search_read: {e}")
+
+        id_mc_map = {}
+        for model, ids in model_ids.items():
+            records = self.source_client.execute_kw(model, 'search_read', [[['id', 'in', ids]]], {'fields': ['id', 'id_mc']})
+            id_mc_map[model] = {record['id']: record['id_mc'] for record in records}
+        return id_mc_map
+
+    # {id order store: id pos.order MC} untuk order yang sudah ada di MC.
+    # vit_id di MC bertipe Char sedangkan id order store integer, kedua sisi dibandingkan sebagai string
+    def get_existing_pos_order_invoice(self, records):
+        if not records:
+            return {}
+        existing_pos_order_invoice = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
+                                                                self.target_client.uid, self.target_client.password,
+                                                                'pos.order', 'search_read',
+                                                                [[['vit_id', 'in', [str(record['id']) for record in records]],
+                                                                  ['vit_trxid', 'in', [record.get('name') for record in records]]]],
+                                                                {'fields': ['id', 'vit_id', 'vit_trxid']})
+        existing_pos_order_keys = {(existing['vit_trxid'], str(existing['vit_id'])): existing['id'] for existing in existing_pos_order_invoice}
+        existing_pos_order_invoice_dict = {}
+        for record in records:
+            existing_id = existing_pos_order_keys.get((record.get('name'), str(record['id'])))
+            if existing_id:
+                existing_pos_order_invoice_dict[record['id']] = existing_id
+        return existing_pos_order_invoice_dict
+
+    # Create satu batch pos.order di MC dalam satu call, jika gagal (satu order invalid membatalkan seluruh batch)
+    # batch diulang per order agar order lain tetap masuk. Write-back ke store dikirim dalam satu round trip multicall
+    def create_pos_order_invoice_batch(self, model_name, batch):
+        start_time = time.time()
+        created_orders = []
+
+        # Cek ulang tepat sebelum create: order yang sudah ada di MC (push kedua, run yang berjalan bersamaan)
+        # tidak dibuat lagi, cukup ditandai integrated di store
+        existing_ids = self.get_existing_pos_order_invoice([record for record, pos_order_data in batch])
+        if existing_ids:
+            print(f"⚠️ {len(existing_ids)} POS Order sudah ada di MC, tidak dibuat ulang")
+            self.source_client.execute_kw_batch([
+                ('pos.order', 'write', [[record_id], {'is_integrated': True, 'id_mc': existing_id}])
+                for record_id, existing_id in existing_ids.items()
+            ])
+            batch = [(record, pos_order_data) for record, pos_order_data in batch if record['id'] not in existing_ids]
+            if not batch:
+                return
+
+        try:
+            new_pos_order_ids = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
+                                                            self.target_client.uid, self.target_client.password,
+                                                            'pos.order', 'create',
+                                                            [[pos_order_data for record, pos_order_data in batch]])
+            created_orders = [(record, new_pos_order_id) for (record, pos_order_data), new_pos_order_id in zip(batch, new_pos_order_ids)]
+        except Exception as e:
+            print(f"⚠️ Batch create {len(batch)} POS Order gagal, diulang per order: {e}")
+            # Batch bisa saja sudah ter-commit di MC (mis. timeout setelah commit): cek ulang sebelum create per order
+            existing_ids = self.get_existing_pos_order_invoice([record for record, pos_order_data in batch])
+            for record, pos_order_data in batch:
+                if record['id'] in existing_ids:
+                    created_orders.append((record, existing_ids[record['id']]))
+                    continue
                 try:
-                    start_time = time.time()
                     new_pos_order_id = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
                                                                     self.target_client.uid, self.target_client.password,
                                                                     'pos.order', 'create',
                                                                     [pos_order_data])
-
-                    print(f"✅ Pos Order baru telah dibuat dengan ID: {new_pos_order_id}")
-
-                    self.source_client.call_odoo(
-                        'object', 'execute_kw', self.source_client.db,
-                        self.source_client.uid, self.source_client.password,
-                        'pos.order', 'write',
-                        [[record['id']], {'is_integrated': True, 'id_mc': new_pos_order_id}]
-                    )
-
-                    end_time = time.time()
-                    duration = end_time - start_time
-
-                    write_date = self.get_write_date(model_name, record['id'])
-                    self.set_log_mc.create_log_note_success(record, start_time, end_time, duration, 'Invoice', write_date)
-                    self.set_log_ss.create_log_note_success(record, start_time, end_time, duration, 'Invoice', write_date)
-                    
-                    print(f"✅ Successfully created and logged POS Order {record.get('name')} (ID: {new_pos_order_id})")
-                    
+                    created_orders.append((record, new_pos_order_id))
                 except Exception as e:
                     message_exception = f"Terjadi kesalahan saat membuat invoice: {e}"
                     print(f"❌ Error creating POS Order {record.get('name')}: {message_exception}")
@@ -1353,18 +1394,39 @@ class DataTransaksi:
                     self.set_log_mc.create_log_note_failed(record, 'Invoice', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Invoice', message_exception, write_date)
 
-            # Use ThreadPoolExecutor to process records in parallel
-            print(f"✅ Starting parallel processing of {len(transaksi_posorder_invoice)} orders with 20 workers...")
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in transaksi_posorder_invoice]
-                concurrent.futures.wait(futures)
-            
-            print(f"✅ Finished processing all {len(transaksi_posorder_invoice)} orders")
+        if not created_orders:
+            return
 
-        except Exception as e:
-            print(f"❌ Error during processing: {e}")
-            import traceback
-            print(traceback.format_exc())
+        print(f"✅ {len(created_orders)} Pos Order baru telah dibuat di MC")
+
+        # id_mc berbeda per order, semua write dikirim dalam satu multicall
+        write_results = self.source_client.execute_kw_batch([
+            ('pos.order', 'write', [[record['id']], {'is_integrated': True, 'id_mc': new_pos_order_id}])
+            for record, new_pos_order_id in created_orders
+        ])
+
+        end_time = time.time()
+        duration = end_time - start_time
+
+        write_dates = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
+                                                    self.source_client.uid, self.source_client.password,
+                                                    model_name, 'search_read',
+                                                    [[['id', 'in', [record['id'] for record, new_pos_order_id in created_orders]]]],
+                                                    {'fields': ['write_date']})
+        write_dates_dict = {data['id']: data['write_date'] for data in write_dates}
+
+        for (record, new_pos_order_id), write_result in zip(created_orders, write_results):
+            write_date = write_dates_dict.get(record['id'])
+            if write_result.get('error'):
+                message_exception = f"Pos Order sudah dibuat di MC (ID: {new_pos_order_id}) tetapi gagal update is_integrated di store: {write_result['error']}"
+                print(f"❌ {message_exception}")
+                self.set_log_mc.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+                self.set_log_ss.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+                continue
+
+            self.set_log_mc.create_log_note_success(record, start_time, end_time, duration, 'Invoice', write_date)
+            self.set_log_ss.create_log_note_success(record, start_time, end_time, duration, 'Invoice', write_date)
+            print(f"✅ Successfully created and logged POS Order {record.get('name')} (ID: {new_pos_order_id})")
 
     def transfer_pos_order_invoice_ss_to_mc_session_closed_before_inv(self, model_name, fields, description, date_from, date_to):
         try:
@@ -1447,14 +1509,16 @@ class DataTransaksi:
 
             # Pre-fetch existing pos orders in target
             existing_pos_order_invoice_dict = {}
-            for record in transaksi_posorder_invoice:
-                existing_pos_order_invoice = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
-                                                                        self.target_client.uid, self.target_client.password,
-                                                                        'pos.order', 'search_read',
-                                                                        [[['vit_trxid', '=', record.get('name')], ['vit_id', '=', record.get('id')]]],
-                                                                        {'fields': ['id'], 'limit': 1})
-                if existing_pos_order_invoice:
-                    existing_pos_order_invoice_dict[record['id']] = existing_pos_order_invoice[0]['id']
+            existing_calls = [('pos.order', 'search_read',
+                               [[['vit_trxid', '=', record.get('name')], ['vit_id', '=', record.get('id')]]],
+                               {'fields': ['id'], 'limit': 1})
+                              for record in transaksi_posorder_invoice]
+            existing_results = self.target_client.execute_kw_batch(existing_calls)
+            for record, existing_pos_order_invoice in zip(transaksi_posorder_invoice, existing_results):
+                if existing_pos_order_invoice.get('error'):
+                    raise Exception(existing_pos_order_invoice['error'])
+                if existing_pos_order_invoice['result']:
+                    existing_pos_order_invoice_dict[record['id']] = existing_pos_order_invoice['result'][0]['id']
 
             product_ids = [line['product_id'][0] for line in pos_order_lines if line.get('product_id')]
             product_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
@@ -1622,11 +1686,10 @@ class DataTransaksi:
                     message_exception = f"Terjadi kesalahan saat membuat invoice: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'Invoice', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+                    raise
 
             # Use ThreadPoolExecutor to process records in parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in transaksi_posorder_invoice]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_posorder_invoice, process_record)
 
         except Exception as e:
             print(f"Error during processing: {e}")
@@ -1712,14 +1775,16 @@ class DataTransaksi:
 
             # Pre-fetch existing pos orders in target
             existing_pos_order_invoice_dict = {}
-            for record in transaksi_posorder_invoice:
-                existing_pos_order_invoice = self.target_client.call_odoo('object', 'execute_kw', self.target_client.db,
-                                                                        self.target_client.uid, self.target_client.password,
-                                                                        'pos.order', 'search_read',
-                                                                        [[['vit_trxid', '=', record.get('name')], ['vit_id', '=', record.get('id')]]],
-                                                                        {'fields': ['id'], 'limit': 1})
-                if existing_pos_order_invoice:
-                    existing_pos_order_invoice_dict[record['id']] = existing_pos_order_invoice[0]['id']
+            existing_calls = [('pos.order', 'search_read',
+                               [[['vit_trxid', '=', record.get('name')], ['vit_id', '=', record.get('id')]]],
+                               {'fields': ['id'], 'limit': 1})
+                              for record in transaksi_posorder_invoice]
+            existing_results = self.target_client.execute_kw_batch(existing_calls)
+            for record, existing_pos_order_invoice in zip(transaksi_posorder_invoice, existing_results):
+                if existing_pos_order_invoice.get('error'):
+                    raise Exception(existing_pos_order_invoice['error'])
+                if existing_pos_order_invoice['result']:
+                    existing_pos_order_invoice_dict[record['id']] = existing_pos_order_invoice['result'][0]['id']
 
             product_ids = [line['product_id'][0] for line in pos_order_lines if line.get('product_id')]
             product_source = self.source_client.call_odoo('object', 'execute_kw', self.source_client.db,
@@ -1887,11 +1952,10 @@ class DataTransaksi:
                     message_exception = f"Terjadi kesalahan saat membuat invoice: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'Invoice', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Invoice', message_exception, write_date)
+                    raise
 
             # Use ThreadPoolExecutor to process records in parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in transaksi_posorder_invoice]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_posorder_invoice, process_record)
 
         except Exception as e:
             print(f"Error during processing: {e}")
@@ -1999,10 +2063,9 @@ class DataTransaksi:
                     message_exception = f"Terjadi kesalahan saat membuat pos order baru: {e}"
                     # self.set_log_mc.create_log_note_failed(record, 'POS Session', message_exception, write_date)
                     # self.set_log_ss.create_log_note_failed(record, 'POS Session', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in transaksi_posorder_session]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_posorder_session, process_record)
 
         except Exception as e:
             print(f"Terjadi kesalahan saat memproses batch: {e}")
@@ -2393,10 +2456,9 @@ class DataTransaksi:
                     message_exception = f"Gagal membuat atau memposting TS In di Source baru: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'TS Out/TS In', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'TS Out/TS In', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in Ts_Out_data_source]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, Ts_Out_data_source, process_record)
         except Exception as e:
             print(f"Gagal membuat atau memposting TS Out di Source baru: {e}")
 
@@ -2901,10 +2963,9 @@ class DataTransaksi:
                     message_exception = f"Gagal membuat atau memposting Internal Transfers di Source baru: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'Internal Transfers', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Internal Transfers', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record, record) for record in Ts_Out_data_source]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, Ts_Out_data_source, process_record)
         except Exception as e:
             print(f"Gagal membuat atau memposting Internal Transfers di Source baru: {e}")
             
@@ -3097,10 +3158,9 @@ class DataTransaksi:
                     message_exception = f"Gagal membuat atau memposting Goods Receipt baru: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'Goods Receipts', message_exception, write_date)    
                     self.set_log_ss.create_log_note_failed(record, 'Goods Receipts', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_goods_receipts_record, record) for record in transaksi_goods_receipt]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_goods_receipt, proces_goods_receipts_record)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting Goods Receipts di Source baru: {e}")
@@ -3293,10 +3353,9 @@ class DataTransaksi:
                     message_exception = f"Gagal membuat atau memposting GRPO baru: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'GRPO', message_exception, write_date)    
                     self.set_log_ss.create_log_note_failed(record, 'GRPO', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_grpo_record, record) for record in transaksi_receipts]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_receipts, proces_grpo_record)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting Goods Receipts di Source baru: {e}")
@@ -3485,10 +3544,9 @@ class DataTransaksi:
                     write_date = self.get_write_date(model_name, record['id'])
                     self.set_log_mc.create_log_note_failed(record, 'Goods Issue', message, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'Goods Issue', message, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_goods_issue_record, record) for record in transaksi_goods_issue]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_goods_issue, proces_goods_issue_record)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting Goods Issue di Source baru: {e}")
@@ -4236,12 +4294,11 @@ class DataTransaksi:
                     write_date = self.get_write_date(model_name, record['id'])
                     self.set_log_mc.create_log_note_failed(record, 'End Shift', str(e), write_date)
                     self.set_log_ss.create_log_note_failed(record, 'End Shift', str(e), write_date)
+                    raise
 
 
             # Use ThreadPoolExecutor to process records in parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_record_endshift, record) for record in end_shift_store]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, end_shift_store, process_record_endshift)
 
         except Exception as e:
             print(f"Error during processing: {e}")
@@ -4450,8 +4507,7 @@ class SetLogMC:
     def create_log_note_success(self, record, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_record_success(record, start_time, end_time, duration, modul, write_date)
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -4459,8 +4515,7 @@ class SetLogMC:
     def create_log_note_update_success(self, record, record_id, updated_fields, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date)
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -4468,11 +4523,8 @@ class SetLogMC:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                            self.source_client.password, 'log.note', 'create', [log_record])
-                print(f"Data log note yang masuk: {log_record}")
+            self.source_client.log_buffer.add_failed(log_record)
+            print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
@@ -4555,8 +4607,7 @@ class SetLogSS:
     def create_log_note_success(self, record, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_record_success(record, start_time, end_time, duration, modul, write_date)
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -4564,8 +4615,7 @@ class SetLogSS:
     def create_log_note_update_success(self, record, record_id, updated_fields, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date)
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -4573,11 +4623,8 @@ class SetLogSS:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                            self.target_client.password, 'log.note', 'create', [log_record])
-                print(f"Data log note yang masuk: {log_record}")
+            self.target_client.log_buffer.add_failed(log_record)
+            print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
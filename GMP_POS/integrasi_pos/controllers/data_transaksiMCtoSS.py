@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import pytz
 import re
 import concurrent.futures
+from .odoo_client import SyncJobQueue
 
 # kalau ada case store nya beda zona waktu gimana
 class DataTransaksiMCtoSS:
@@ -11,6 +12,8 @@ class DataTransaksiMCtoSS:
         self.target_client = target_client
         self.set_log_mc = SetLogMC(self.source_client)
         self.set_log_ss = SetLogSS(self.target_client)
+        # sync.job ada di MC (source_client), key = id dokumen di MC
+        self.job_queue = SyncJobQueue(self.source_client, self.target_client.server_name, 'mc_to_ss')
 
     def transfer_customer_group(self, model_name, fields, description, date_from, date_to):
         # Ambil data dari sumber
@@ -81,12 +84,8 @@ class DataTransaksiMCtoSS:
                         index_store_ids = record.get('index_store', [])
                         
                         # Ambil setting config yang aktif untuk target integrasi
-                        setting_config_ids = self.source_client.call_odoo(
-                            'object', 'execute_kw', self.source_client.db,
-                            self.source_client.uid, self.source_client.password,
-                            'setting.config', 'search_read',
-                            [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                            {'fields': ['id']}
+                        setting_config_ids = self.source_client.search_read_cached(
+                            'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                         )
                         setting_config_ids = [config['id'] for config in setting_config_ids]
 
@@ -428,12 +427,8 @@ class DataTransaksiMCtoSS:
                     index_store_ids = record.get('index_store', [])
                     
                     # Ambil setting config yang aktif untuk target integrasi
-                    setting_config_ids = self.source_client.call_odoo(
-                        'object', 'execute_kw', self.source_client.db,
-                        self.source_client.uid, self.source_client.password,
-                        'setting.config', 'search_read',
-                        [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                        {'fields': ['id']}
+                    setting_config_ids = self.source_client.search_read_cached(
+                        'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                     )
                     setting_config_ids = [config['id'] for config in setting_config_ids]
 
@@ -472,10 +467,9 @@ class DataTransaksiMCtoSS:
                         print(f"⌛ BoM ID {record['id']} belum terintegrasi ke semua target.")
                 except Exception as e:
                     print(f"⚠️ Gagal update index_store/is_integrated untuk BoM {record['id']}: {e}")
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_bom, record) for record in transaksi_bom_master]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_bom_master, process_bom)
 
         except Exception as e:
             print(f"💣 ERROR di transfer_bom_master: {e}")
@@ -558,12 +552,8 @@ class DataTransaksiMCtoSS:
                 index_store_ids = rec.get('index_store', [])
 
                 # Ambil semua setting.config yang aktif
-                setting_config_ids = self.source_client.call_odoo(
-                    'object', 'execute_kw', self.source_client.db,
-                    self.source_client.uid, self.source_client.password,
-                    'setting.config', 'search_read',
-                    [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                    {'fields': ['id']}
+                setting_config_ids = self.source_client.search_read_cached(
+                    'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                 )
                 setting_config_ids = [config['id'] for config in setting_config_ids]
 
@@ -1431,12 +1421,8 @@ class DataTransaksiMCtoSS:
                     try:
                         # Dapatkan setting_config_ids
                         index_store_ids = record.get('index_store', [])
-                        setting_config_ids = self.source_client.call_odoo(
-                            'object', 'execute_kw', self.source_client.db,
-                            self.source_client.uid, self.source_client.password,
-                            'setting.config', 'search_read',
-                            [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                            {'fields': ['id']}
+                        setting_config_ids = self.source_client.search_read_cached(
+                            'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                         )
                         setting_config_ids = [config['id'] for config in setting_config_ids]
                         
@@ -1805,12 +1791,8 @@ class DataTransaksiMCtoSS:
                         
                         # Update status di source
                         index_store_ids = record.get('index_store', [])
-                        setting_config_ids = self.source_client.call_odoo(
-                            'object', 'execute_kw', self.source_client.db,
-                            self.source_client.uid, self.source_client.password,
-                            'setting.config', 'search_read',
-                            [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                            {'fields': ['id']}
+                        setting_config_ids = self.source_client.search_read_cached(
+                            'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                         )
                         setting_config_ids = [config['id'] for config in setting_config_ids]
                         
@@ -2297,12 +2279,8 @@ class DataTransaksiMCtoSS:
 
                     # === UPDATE vit_reward_trxid di SOURCE ===
                     index_store_ids = record.get('index_store', [])
-                    setting_config_ids = self.source_client.call_odoo(
-                        'object', 'execute_kw', self.source_client.db,
-                        self.source_client.uid, self.source_client.password,
-                        'setting.config', 'search_read',
-                        [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                        {'fields': ['id']}
+                    setting_config_ids = self.source_client.search_read_cached(
+                        'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                     )
                     setting_config_ids = [config['id'] for config in setting_config_ids]
                     
@@ -2515,12 +2493,8 @@ class DataTransaksiMCtoSS:
 
                         index_store_ids = record.get('index_store', [])
                         # Set the index_store field with setting.config IDs
-                        setting_config_ids = self.source_client.call_odoo(
-                            'object', 'execute_kw', self.source_client.db,
-                            self.source_client.uid, self.source_client.password,
-                            'setting.config', 'search_read',
-                            [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                            {'fields': ['id']}
+                        setting_config_ids = self.source_client.search_read_cached(
+                            'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                         )
                         setting_config_ids = [config['id'] for config in setting_config_ids]
                         self.source_client.call_odoo(
@@ -2677,12 +2651,8 @@ class DataTransaksiMCtoSS:
 
                         index_store_ids = record.get('index_store', [])
                         # Set the index_store field with setting.config IDs
-                        setting_config_ids = self.source_client.call_odoo(
-                            'object', 'execute_kw', self.source_client.db,
-                            self.source_client.uid, self.source_client.password,
-                            'setting.config', 'search_read',
-                            [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                            {'fields': ['id']}
+                        setting_config_ids = self.source_client.search_read_cached(
+                            'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
                         )
                         setting_config_ids = [config['id'] for config in setting_config_ids]
                         self.source_client.call_odoo(
@@ -2923,11 +2893,10 @@ class DataTransaksiMCtoSS:
                     message_exception = f"Gagal membuat atau memposting TS In baru: {e}"
                     self.set_log_mc.create_log_note_failed(record, 'TS Out/TS In', message_exception, write_date)
                     self.set_log_ss.create_log_note_failed(record, 'TS Out/TS In', message_exception, write_date)
+                    raise
 
             # Execute the function with a ThreadPoolExecutor for concurrent processing
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_ts_in_record, record) for record in transaksi_ts_in]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_ts_in, process_ts_in_record)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting TS In di Source: {e}")
@@ -3542,10 +3511,9 @@ class DataTransaksiMCtoSS:
                     message_exception = f"Gagal membuat atau memposting Goods Receipt baru: {e}"
                     self.set_log_ss.create_log_note_failed(record, 'Goods Receipts', message_exception, write_date)
                     self.set_log_mc.create_log_note_failed(record, 'Goods Receipts', message_exception, write_date)
+                    raise
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_goods_receipts_record_from_mc, record) for record in transaksi_goods_receipt]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_goods_receipt, proces_goods_receipts_record_from_mc)
         except Exception as e:
             print(f"Gagal membuat atau memposting Goods Receipts di Source baru: {e}")
 
@@ -3730,10 +3698,9 @@ class DataTransaksiMCtoSS:
                     message_exception = f"Gagal membuat atau memposting GRPO baru: {e}"
                     self.set_log_ss.create_log_note_failed(record, 'GRPO', message_exception, write_date)
                     self.set_log_mc.create_log_note_failed(record, 'GRPO', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_receipts_record_from_mc, record) for record in transaksi_receipt]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_receipt, proces_receipts_record_from_mc)
         except Exception as e:
             print(f"Gagal membuat atau memposting GRPO di Source baru: {e}")
 
@@ -3930,10 +3897,9 @@ class DataTransaksiMCtoSS:
                     message_exception = f"Gagal membuat atau memposting Goods Issue baru: {e}"
                     self.set_log_ss.create_log_note_failed(record, 'Goods Issue', message_exception, write_date)
                     self.set_log_mc.create_log_note_failed(record, 'Goods Issue', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(proces_goods_issue_record_from_mc, record) for record in transaksi_goods_issue]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, transaksi_goods_issue, proces_goods_issue_record_from_mc)
         except Exception as e:
             print(f"Gagal membuat atau memposting Goods Issue di Source baru: {e}")
 
@@ -4241,10 +4207,9 @@ class DataTransaksiMCtoSS:
                     message_exception = f"Terjadi kesalahan saat membuat invoice: {e}"
                     self.set_log_ss.create_log_note_failed(record, 'Purchase Order', message_exception, write_date)
                     self.set_log_mc.create_log_note_failed(record, 'Purchase Order', message_exception, write_date)
+                    raise
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_purchase_order_record, record) for record in purchase_order]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, purchase_order, process_purchase_order_record)
 
         except Exception as e:
                 print(f"Gagal membuat atau memposting Purchase Order di Source baru: {e}")
@@ -4304,12 +4269,8 @@ class DataTransaksiMCtoSS:
                 if existing_payment:
                     existing_payment_method_dict[record['id']] = existing_payment[0]['id']
 
-            setting_config_ids = self.source_client.call_odoo(
-                'object', 'execute_kw', self.source_client.db,
-                self.source_client.uid, self.source_client.password,
-                'setting.config', 'search_read',
-                [[['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]]],
-                {'fields': ['id']}
+            setting_config_ids = self.source_client.search_read_cached(
+                'setting.config', [['vit_config_server', '=', 'ss'], ['vit_linked_server', '=', True]], ['id']
             )
 
             if not setting_config_ids:
@@ -4386,9 +4347,7 @@ class DataTransaksiMCtoSS:
                             self.set_log_mc.create_log_note_failed(record, 'Payment Method', message_exception, write_date)    
                             self.set_log_ss.create_log_note_failed(record, 'Payment Method', message_exception, write_date)
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_payment_method_record_from_mc, record) for record in payment_method]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, payment_method, process_payment_method_record_from_mc)
         except Exception as e:
             print(f"Gagal membuat atau memposting Payment Method di Source baru: {e}")
 
@@ -4727,11 +4686,10 @@ class DataTransaksiMCtoSS:
                     write_date = self.get_write_date(model_name, record['id'])
                     self.set_log_mc.create_log_note_failed(record, 'Journal', message_exception, write_date)    
                     self.set_log_ss.create_log_note_failed(record, 'Journal', message_exception, write_date)
+                    raise
 
             # Use ThreadPoolExecutor to process records concurrently
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_journal_account, record) for record in journal_account]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, journal_account, process_journal_account)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting Payment Method di Source baru: {e}")
@@ -4834,11 +4792,10 @@ class DataTransaksiMCtoSS:
                     write_date = self.get_write_date(model_name, record['id'])
                     self.set_log_mc.create_log_note_failed(record, 'Chart of Account', message_exception, write_date)    
                     self.set_log_ss.create_log_note_failed(record, 'Chart of Account', message_exception, write_date)
+                    raise
 
             # Use ThreadPoolExecutor to process records concurrently
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(process_chart_account, record) for record in chart_account]
-                concurrent.futures.wait(futures)
+            self.job_queue.run(model_name, chart_account, process_chart_account)
 
         except Exception as e:
             print(f"Gagal membuat atau memposting Chart Account di Source baru: {e}")
@@ -5047,8 +5004,7 @@ class SetLogMC:
     def create_log_note_success(self, record, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_record_success(record, start_time, end_time, duration, modul, write_date)
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -5056,8 +5012,7 @@ class SetLogMC:
     def create_log_note_update_success(self, record, record_id, updated_fields, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date)
-            self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                         self.source_client.password, 'log.note', 'create', [log_record])
+            self.source_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -5065,11 +5020,8 @@ class SetLogMC:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.source_client.call_odoo('object', 'execute_kw', self.source_client.db, self.source_client.uid,
-                                            self.source_client.password, 'log.note', 'create', [log_record])
-                print(f"Data log note yang masuk: {log_record}")
+            self.source_client.log_buffer.add_failed(log_record)
+            print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
@@ -5152,8 +5104,7 @@ class SetLogSS:
     def create_log_note_success(self, record, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_record_success(record, start_time, end_time, duration, modul, write_date)
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -5161,8 +5112,7 @@ class SetLogSS:
     def create_log_note_update_success(self, record, record_id, updated_fields, start_time, end_time, duration, modul, write_date):
         try:
             log_record = self.log_update_record_success(record, record_id, updated_fields, start_time, end_time, duration, modul, write_date)
-            self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                         self.target_client.password, 'log.note', 'create', [log_record])
+            self.target_client.log_buffer.add(log_record)
             print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
@@ -5170,11 +5120,8 @@ class SetLogSS:
     def create_log_note_failed(self, record, modul, sync_status, write_date):
         try:
             log_record = self.log_record_failed(record, modul, sync_status, write_date)
-            log_record_existing = self.get_log_note_failed(log_record['vit_trx_key'], log_record['vit_sync_desc'])
-            if not log_record_existing:
-                self.target_client.call_odoo('object', 'execute_kw', self.target_client.db, self.target_client.uid,
-                                            self.target_client.password, 'log.note', 'create', [log_record])
-                print(f"Data log note yang masuk: {log_record}")
+            self.target_client.log_buffer.add_failed(log_record)
+            print(f"Data log note yang masuk: {log_record}")
         except Exception as e:
             print(f"An error occurred while creating log note: {e}")
 
@@ -7,6 +7,11 @@ from data_transaksiMCtoSS import DataTransaksiMCtoSS
 from decouple import config as get_config
 from datetime import datetime, timedelta
 
+# Model master MC to Store (index_store) yang is_integrated-nya difinalisasi di akhir main()
+FINALIZE_MODELS = [
+    'ir.sequence', 'stock.picking.type', 'res.partner.title', 'res.partner', 'account.tax', 'product.category',
+    'uom.category', 'uom.uom', 'pos.category', 'product.template', 'product.pricelist',
+]
 
 def main():
     # base_dir = os.path.dirname(os.getcwd())
@@ -29,7 +34,7 @@ def main():
         # decrypted_password = config.decrypt_password(instance['password'])
         odoo_ss_client = OdooClient(instance['url'], instance['server_name'], instance['db'], instance['username'], instance['password'])
 
-        integrator_master = DataIntegrator(odoo_mc_client, odoo_ss_client)
+        integrator_master = DataIntegrator(odoo_mc_client, odoo_ss_client, use_watermark=True)  # master data incremental lewat sync.watermark di MC
         integrator_transaksi = DataTransaksi(odoo_ss_client, odoo_mc_client)
         integrator_transaksiMCtoSS = DataTransaksiMCtoSS(odoo_mc_client, odoo_ss_client)
 
@@ -142,5 +147,13 @@ def main():
         # integrator_transaksiMCtoSS.update_session_status_MCtoSS('pos.session', ['name', 'id','state'], "Session Updated")
         # integrator_transaksiMCtoSS.purchase_order_from_mc('purchase.order', ['name', 'partner_id', 'partner_ref', 'currency_id', 'date_approve', 'date_planned', 'picking_type_id', 'vit_trxid'], 'Transaksi Purchase Order')
 
+    # Sama seperti run_stores di MC: is_integrated master difinalisasi sekali setelah semua store di instancesSS selesai
+    errors = {}
+    finalized = DataIntegrator.finalize_integrated(odoo_mc_client, FINALIZE_MODELS, errors)
+    print(f"Finalisasi is_integrated: {finalized}")
+    for model, e in errors.items():
+        print(f"Gagal finalisasi is_integrated {model}: {e}")
+    odoo_mc_client.log_buffer.flush()
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
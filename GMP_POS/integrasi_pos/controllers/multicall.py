@@ -0,0 +1,25 @@
+import threading
+from odoo import http
+from odoo.http import serialize_exception
+from odoo.service import model, security
+
+
+class MultiCallController(http.Controller):
+
+    # Menjalankan beberapa execute_kw dalam satu request JSON-RPC (dipakai OdooClient.execute_kw_batch)
+    # Setiap call berjalan di transaksinya sendiri, error dilaporkan per call tanpa menggagalkan call lain
+    @http.route('/jsonrpc/multicall', type='json', auth='none', save_session=False)
+    def multicall(self, db, uid, password, calls):
+        security.check(db, uid, password)
+        threading.current_thread().dbname = db
+        threading.current_thread().uid = uid
+
+        results = []
+        for call in calls:
+            obj, method, args = call[0], call[1], call[2]
+            kwargs = call[3] if len(call) > 3 else {}
+            try:
+                results.append({'result': model.execute_kw(db, uid, obj, method, args, kwargs)})
+            except Exception as e:
+                results.append({'error': {'code': 200, 'message': 'Odoo Server Error', 'data': serialize_exception(e)}})
+        return results
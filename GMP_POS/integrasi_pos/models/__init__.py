@@ -1,7 +1,9 @@
 # from . import log_note
 # from . import res_partner
 # from . import stock_picking
+from . import id_mc_mapping
 from . import pos_session
+from . import pos_barcode_index
 from . import pos_order
 # from . import pos_order_line
 # from . import master_warehouse
@@ -32,7 +34,6 @@ from . import pos_order
 # from . import uom_uom
 # from . import res_currency
 # from . import account_journal
-# from . import tes_maxworkers
 # from . import product_pricelist_item
 # from . import loyalty_card
 from . import pos_cashier_log
@@ -3,6 +3,6 @@ from odoo import fields, models
 
 
 class AccountTaxInherit(models.Model):
-    _inherit = 'account.tax'
+    _inherit = ['account.tax', 'id.mc.mapping.mixin']
 
     id_mc = fields.Char(string="ID MC", default=False)
\ No newline at end of file
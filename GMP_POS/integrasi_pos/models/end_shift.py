@@ -57,6 +57,29 @@ class EndShiftSession(models.Model):
                 ])
             record.pos_order_count = count
 
+    # Total pembayaran shift per payment method: {payment_method_id: {'amount': ..., 'payment_date': ...}}.
+    # Satu _read_group atas pos.payment, dipakai action_close, expected_amount di line, dan popup end shift
+    def get_payment_totals(self):
+        self.ensure_one()
+        if not (self.session_id and self.cashier_id and self.start_date and self.end_date):
+            return {}
+
+        groups = self.env['pos.payment']._read_group(
+            [
+                ('pos_order_id.session_id', '=', self.session_id.id),
+                ('pos_order_id.employee_id', '=', self.cashier_id.id),
+                ('pos_order_id.state', '=', 'invoiced'),
+                ('pos_order_id.create_date', '>=', self.start_date),
+                ('pos_order_id.create_date', '<=', self.end_date),
+            ],
+            groupby=['payment_method_id'],
+            aggregates=['amount:sum', 'payment_date:max'],
+        )
+        return {
+            payment_method.id: {'amount': amount, 'payment_date': payment_date}
+            for payment_method, amount, payment_date in groups
+        }
+
     def action_view_pos_orders(self):
         self.ensure_one()
         
@@ -117,41 +140,16 @@ class EndShiftSession(models.Model):
             })
 
             try:
-                pos_orders = self.env['pos.order'].search([
-                    ('session_id', '=', record.session_id.id),
-                    ('employee_id', '=', record.cashier_id.id),
-                    ('state', '=', 'invoiced'),
-                    ('create_date', '>=', record.start_date),
-                    ('create_date', '<=', record.end_date)
-                ], limit=1000)
-
-                payment_data = {}
-                for order in pos_orders:
-                    payments = order.payment_ids
-                    for payment in payments:
-                        method_id = payment.payment_method_id.id
-                        amount = payment.amount
-                        payment_date = payment.payment_date
-
-                        if method_id in payment_data:
-                            payment_data[method_id]['amount'] += amount
-                            if payment_date > payment_data[method_id]['payment_date']:
-                                payment_data[method_id]['payment_date'] = payment_date
-                        else:
-                            payment_data[method_id] = {
-                                'payment_method_id': method_id,
-                                'amount': amount,
-                                'payment_date': payment_date,
-                            }
+                payment_data = record.get_payment_totals()
 
                 record.line_ids.unlink()
-                for line_data in payment_data.values():
+                for payment_method_id, line_data in payment_data.items():
                     self.env['end.shift.line'].with_context(
                         skip_pin_validation=True,
                         skip_compute=True
                     ).create({
                         'end_shift_id': record.id,
-                        'payment_method_id': line_data['payment_method_id'],
+                        'payment_method_id': payment_method_id,
                         'amount': 0.0,
                         'payment_date': line_data['payment_date'],
                         'state': 'closed',
@@ -273,6 +271,8 @@ class EndShiftSessionLine(models.Model):
     @api.depends('end_shift_id.modal', 'payment_method_id', 'end_shift_id.session_id', 
              'end_shift_id.cashier_id', 'end_shift_id.start_date', 'end_shift_id.end_date', 'end_shift_id.state')
     def _compute_expected_amount(self):
+        # Total per payment method dihitung sekali per shift, bukan per line
+        shift_totals = {}
         for record in self:
             expected = 0.0
             
@@ -292,23 +292,10 @@ class EndShiftSessionLine(models.Model):
                 continue
             
             try:
-                Order = record.env['pos.order']
-                domain = [
-                    ('session_id', '=', record.end_shift_id.session_id.id),
-                    ('employee_id', '=', record.end_shift_id.cashier_id.id),
-                    ('state', '=', 'invoiced'),
-                    ('create_date', '>=', record.end_shift_id.start_date),
-                    ('create_date', '<=', record.end_shift_id.end_date),
-                    ('payment_ids.payment_method_id', '=', record.payment_method_id.id),
-                ]
-                orders = Order.search(domain)
-
-                total = 0.0
-                for order in orders:
-                    for payment in order.payment_ids.filtered(
-                        lambda p: p.payment_method_id.id == record.payment_method_id.id
-                    ):
-                        total += payment.amount
+                shift = record.end_shift_id
+                if shift.id not in shift_totals:
+                    shift_totals[shift.id] = shift.get_payment_totals()
+                total = shift_totals[shift.id].get(record.payment_method_id.id, {}).get('amount', 0.0)
 
                 if (record.payment_method_id.journal_id and 
                     record.payment_method_id.journal_id.type == 'cash'):
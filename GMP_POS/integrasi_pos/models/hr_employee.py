@@ -3,7 +3,7 @@ from odoo.exceptions import ValidationError
   
 
 class HrEmployee(models.Model):
-    _inherit = 'hr.employee'
+    _inherit = ['hr.employee', 'id.mc.mapping.mixin']
 
     is_integrated = fields.Boolean(string="User created", default=False, readonly=True, tracking=True)
     id_mc = fields.Char(string='ID MC', readonly=True, tracking=True)
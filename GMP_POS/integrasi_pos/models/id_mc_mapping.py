@@ -0,0 +1,87 @@
+from odoo import models, fields, api, _
+
+
+class IdMcMapping(models.Model):
+    _name = "id.mc.mapping"
+    _description = "ID MC Mapping"
+    _rec_name = "vit_model"
+
+    # Terjemahan id lokal store -> id_mc (id record di Master Console) per model.
+    # Satu tabel per store server, diisi oleh IdMcMappingMixin saat create/write id_mc
+    vit_model = fields.Char(string='Model', required=True, index=True)
+    vit_res_id = fields.Integer(string='Local ID', required=True)
+    vit_id_mc = fields.Char(string='ID MC')
+
+    _sql_constraints = [
+        ('model_res_id_uniq', 'unique(vit_model, vit_res_id)', 'Mapping ID MC per model dan record harus unik.'),
+    ]
+
+    def set_mappings(self, records):
+        if not records:
+            return
+        existing = self.search([('vit_model', '=', records._name), ('vit_res_id', 'in', records.ids)])
+        existing_dict = {mapping.vit_res_id: mapping for mapping in existing}
+        create_vals = []
+        for record in records:
+            mapping = existing_dict.get(record.id)
+            if mapping:
+                if mapping.vit_id_mc != (record.id_mc or False):
+                    mapping.write({'vit_id_mc': record.id_mc or False})
+            else:
+                create_vals.append({'vit_model': records._name, 'vit_res_id': record.id, 'vit_id_mc': record.id_mc or False})
+        if create_vals:
+            self.create(create_vals)
+
+    # Dipanggil integrator lewat RPC: {model: [local_id, ...]} -> {model: {local_id: id_mc}}
+    # Semua model dalam satu batch transaksi cukup dibaca dengan satu RPC
+    @api.model
+    def get_id_mc_map(self, model_ids):
+        result = {}
+        for model_name, ids in model_ids.items():
+            ids = list({int(res_id) for res_id in ids if res_id})
+            if not ids or model_name not in self.env or 'id_mc' not in self.env[model_name]._fields:
+                result[model_name] = {}
+                continue
+
+            Model = self.env[model_name].sudo()
+            if not getattr(Model, '_id_mc_mapped', False):
+                # Model tanpa hook mapping, baca id_mc langsung dari record
+                result[model_name] = {record.id: record.id_mc for record in Model.browse(ids).exists()}
+                continue
+
+            mappings = self.sudo().search_read([('vit_model', '=', model_name), ('vit_res_id', 'in', ids)], ['vit_res_id', 'vit_id_mc'])
+            id_map = {mapping['vit_res_id']: mapping['vit_id_mc'] for mapping in mappings}
+            missing_ids = [res_id for res_id in ids if res_id not in id_map]
+            if missing_ids:
+                # Record yang dibuat sebelum tabel mapping ada, isi sekali lalu dipakai oleh sync berikutnya
+                records = Model.browse(missing_ids).exists()
+                self.sudo().set_mappings(records)
+                id_map.update({record.id: record.id_mc for record in records})
+            result[model_name] = id_map
+        return result
+
+
+class IdMcMappingMixin(models.AbstractModel):
+    _name = "id.mc.mapping.mixin"
+    _description = "ID MC Mapping Mixin"
+
+    # Model yang mewarisi mixin ini menjaga id.mc.mapping tetap sinkron dengan field id_mc
+    _id_mc_mapped = True
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(IdMcMappingMixin, self).create(vals_list)
+        mapped_records = records.filtered('id_mc')
+        if mapped_records:
+            self.env['id.mc.mapping'].sudo().set_mappings(mapped_records)
+        return records
+
+    def write(self, vals):
+        res = super(IdMcMappingMixin, self).write(vals)
+        if 'id_mc' in vals:
+            self.env['id.mc.mapping'].sudo().set_mappings(self)
+        return res
+
+    def unlink(self):
+        self.env['id.mc.mapping'].sudo().search([('vit_model', '=', self._name), ('vit_res_id', 'in', self.ids)]).unlink()
+        return super(IdMcMappingMixin, self).unlink()
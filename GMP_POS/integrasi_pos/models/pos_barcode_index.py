@@ -0,0 +1,121 @@
+import gzip
+import json
+import threading
+from odoo import models, api
+
+# Blob index penuh terakhir per database: {dbname: (version, blob)}
+_full_index_cache = {}
+_full_index_lock = threading.Lock()
+
+
+class PosBarcodeIndex(models.AbstractModel):
+    _name = "pos.barcode.index"
+    _description = "POS Barcode Index"
+
+    # Index barcode -> produk untuk POS, dikirim sebagai JSON gzip lalu disimpan POS di IndexedDB.
+    # Satu baris per produk: [product_id, to_weight, barcode, [multiple barcode, ...]].
+    # watermark = write_date terakhir product/multiple.barcode, count = jumlah barcode di index;
+    # POS yang sudah punya index hanya mengambil delta sejak watermark, lalu membandingkan count
+    # untuk mendeteksi barcode yang terhapus
+
+    # Delta diambil mundur sejauh ini dari watermark karena write_date = waktu mulai transaksi,
+    # transaksi sync yang panjang bisa commit setelah watermark dibaca
+    DELTA_OVERLAP = '10 minutes'
+
+    def _has_multiple_barcode(self):
+        return 'multiple.barcode' in self.env
+
+    def _get_version(self):
+        cr = self.env.cr
+        cr.execute("""
+            SELECT MAX(GREATEST(pp.write_date, pt.write_date)),
+                   COUNT(NULLIF(pp.barcode, '')) FILTER (WHERE pp.active AND pt.available_in_pos)
+            FROM product_product pp
+            JOIN product_template pt ON pt.id = pp.product_tmpl_id
+        """)
+        watermark, count = cr.fetchone()
+        if self._has_multiple_barcode():
+            cr.execute("""
+                SELECT MAX(mb.write_date),
+                       COUNT(*) FILTER (WHERE pp.active AND pt.available_in_pos)
+                FROM multiple_barcode mb
+                JOIN product_product pp ON pp.id = mb.product_id
+                JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            """)
+            multi_watermark, multi_count = cr.fetchone()
+            watermark = max(filter(None, [watermark, multi_watermark]), default=None)
+            count += multi_count
+        return (str(watermark) if watermark else None), count
+
+    def _get_rows(self, product_ids=None):
+        # product_ids None = semua produk POS yang punya barcode (index penuh)
+        cr = self.env.cr
+        multi_barcodes = {}
+        if self._has_multiple_barcode():
+            if product_ids is None:
+                cr.execute("SELECT product_id, array_agg(barcode) FROM multiple_barcode WHERE product_id IS NOT NULL GROUP BY product_id")
+            else:
+                cr.execute("SELECT product_id, array_agg(barcode) FROM multiple_barcode WHERE product_id = ANY(%s) GROUP BY product_id", [product_ids])
+            multi_barcodes = dict(cr.fetchall())
+
+        query = """
+            SELECT pp.id, pt.to_weight, NULLIF(pp.barcode, ''), pp.active AND pt.available_in_pos
+            FROM product_product pp
+            JOIN product_template pt ON pt.id = pp.product_tmpl_id
+        """
+        if product_ids is None:
+            cr.execute(query + " WHERE pp.active AND pt.available_in_pos")
+        else:
+            cr.execute(query + " WHERE pp.id = ANY(%s)", [product_ids])
+
+        rows = []
+        removed = []
+        for product_id, to_weight, barcode, in_pos in cr.fetchall():
+            multi = multi_barcodes.get(product_id) or []
+            if in_pos and (barcode or multi):
+                rows.append([product_id, 1 if to_weight else 0, barcode, multi])
+            elif product_ids is not None:
+                removed.append(product_id)
+        return rows, removed
+
+    def _get_changed_product_ids(self, since):
+        cr = self.env.cr
+        params = {'since': since, 'overlap': self.DELTA_OVERLAP}
+        query = """
+            SELECT pp.id
+            FROM product_product pp
+            JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            WHERE GREATEST(pp.write_date, pt.write_date) > %(since)s::timestamp - %(overlap)s::interval
+        """
+        if self._has_multiple_barcode():
+            query += """
+            UNION
+            SELECT mb.product_id
+            FROM multiple_barcode mb
+            WHERE mb.product_id IS NOT NULL AND mb.write_date > %(since)s::timestamp - %(overlap)s::interval
+            """
+        cr.execute(query, params)
+        return [row[0] for row in cr.fetchall()]
+
+    def _make_blob(self, data):
+        return gzip.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+    @api.model
+    def get_index_blob(self, since=None):
+        watermark, count = self._get_version()
+        if since and watermark:
+            rows, removed = self._get_rows(self._get_changed_product_ids(since))
+            return self._make_blob({'full': False, 'watermark': watermark, 'count': count, 'rows': rows, 'removed': removed})
+
+        # Index penuh dibangun sekali per versi, POS lain di store yang sama memakai blob yang sama
+        version = (watermark, count)
+        dbname = self.env.cr.dbname
+        with _full_index_lock:
+            cached = _full_index_cache.get(dbname)
+        if cached and cached[0] == version:
+            return cached[1]
+        rows = self._get_rows()[0]
+        blob = self._make_blob({'full': True, 'watermark': watermark, 'count': count, 'rows': rows, 'removed': []})
+        with _full_index_lock:
+            _full_index_cache[dbname] = (version, blob)
+        return blob
@@ -5,7 +5,7 @@ from odoo import models, fields, api, SUPERUSER_ID
 from odoo.exceptions import UserError
 
 class PoSPaymentMethodInherit(models.Model):
-    _inherit = 'pos.payment.method'
+    _inherit = ['pos.payment.method', 'id.mc.mapping.mixin']
 
     id_mc = fields.Char(string="ID MC", default=False)
     is_updated = fields.Boolean(string="Updated", tracking=True)
\ No newline at end of file
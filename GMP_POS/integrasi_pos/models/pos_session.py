@@ -41,7 +41,7 @@ class ReportSaleDetailsInherit(models.AbstractModel):
         return result
 
 class PosSession(models.Model):
-    _inherit = 'pos.session'
+    _inherit = ['pos.session', 'id.mc.mapping.mixin']
 
     is_updated = fields.Boolean(string="Updated", default=False, readonly=True, tracking=True)
     name_session_pos = fields.Char(string="Name Session POS (Odoo Store)", readonly=True)
@@ -442,43 +442,6 @@ class PosSession(models.Model):
     def _pos_ui_hr_employee_config_settings(self, params):
         return self._get_pos_ui_hr_employee_config_settings(params)
 
-    def _loader_params_multiple_barcode(self):
-        return {
-            'search_params': {
-                'domain': [],
-                'fields': ['id', 'barcode', 'product_id'],
-            }
-        }
-
-    def _get_pos_ui_multiple_barcode(self, params):
-        try:
-            if 'multiple.barcode' not in self.env:
-                _logger.warning("⚠️ Model multiple.barcode not found")
-                return []
-                
-            records = self.env['multiple.barcode'].search_read(
-                params['search_params']['domain'],
-                params['search_params']['fields'],
-                limit=5000
-            )
-            
-            for rec in records:
-                if rec.get('product_id'):
-                    if isinstance(rec['product_id'], list) and len(rec['product_id']) >= 2:
-                        rec['product_id'] = [int(rec['product_id'][0]), str(rec['product_id'][1])]
-                    elif isinstance(rec['product_id'], int):
-                        product = self.env['product.product'].browse(rec['product_id'])
-                        rec['product_id'] = [rec['product_id'], product.display_name if product.exists() else '']
-                        
-            _logger.info(f"✅ Loaded {len(records)} multiple.barcode records")
-            return records
-        except Exception as e:
-            _logger.error(f"❌ Error loading multiple.barcode: {e}")
-            return []
-
-    def _pos_ui_multiple_barcode(self, params):
-        return self._get_pos_ui_multiple_barcode(params)
-    
     def _loader_params_barcode_config(self):
         return {
             'search_params': {
@@ -5,6 +5,6 @@ from odoo import models, fields, api, SUPERUSER_ID
 from odoo.exceptions import UserError
 
 class ProductPricelist(models.Model):
-    _inherit = 'product.pricelist'
+    _inherit = ['product.pricelist', 'id.mc.mapping.mixin']
 
     id_mc = fields.Char(string="ID MC", default=False)
\ No newline at end of file
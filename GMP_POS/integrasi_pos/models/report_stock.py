@@ -2,18 +2,21 @@ from datetime import datetime, timedelta
 from odoo import models, fields, api
 from collections import defaultdict
 from odoo.exceptions import UserError, AccessError
+from psycopg2.extras import execute_values
 
 class WizardGenerateStockLedger(models.TransientModel):
     _name = 'wizard.generate.stock.ledger'
     _description = 'Wizard to Generate Stock Ledger Report'
 
+    vit_rebuild = fields.Boolean(string='Rebuild From Start', help="Kosongkan ledger lalu hitung ulang seluruh history stock move")
+
     @api.model
     def default_get(self, fields):
         res = super().default_get(fields)
         return res
 
     def action_generate(self):
-        self.env['balance.stock'].get_report_stock_akhir()
+        self.env['balance.stock'].get_report_stock_akhir(rebuild=self.vit_rebuild)
         return {
             'type': 'ir.actions.act_window',
             'name': 'Stock Ledger',
@@ -29,20 +32,42 @@ class ReportStockAkhir(models.Model):
     _description = 'Report Stock Akhir Real'
 
     numbering = fields.Char(string="Nomor", tracking=True)
-    date_stock = fields.Datetime(string='Date', tracking=True)
+    date_stock = fields.Datetime(string='Date', tracking=True, index=True)
     reference = fields.Char(string='Reference', tracking=True)
-    product_id = fields.Many2one('product.product', string='Product', tracking=True)
+    product_id = fields.Many2one('product.product', string='Product', tracking=True, index=True)
     location_id = fields.Many2one('stock.location', string="From", tracking=True)
     location_dest_id = fields.Many2one('stock.location', string="To", tracking=True)
     stock_in = fields.Float(string="Stock In", tracking=True, digits=(16,3))
     stock_out = fields.Float(string="Stock Out", tracking=True, digits=(16,3))
     stock_akhir = fields.Float(string="Stock Akhir", tracking=True, digits=(16,3))
-    
-    def get_report_stock_akhir(self):
+
+    # id stock.move.line terakhir yang sudah masuk ledger
+    LAST_MOVE_LINE_PARAM = 'balance_stock.last_move_line_id'
+    INSERT_PAGE_SIZE = 1000
+    # id yang belum terlihat (transaksi yang belum commit) dalam sekian id terakhir tetap ditunggu di pending,
+    # di luar itu dianggap id dari transaksi yang di-rollback
+    MOVE_LINE_ID_LAG = 10000
+
+    # Ledger ditambah secara incremental: hanya move line done yang belum pernah diproses.
+    # Move line dengan id <= last id yang belum done saat generate dicatat di balance.stock.pending
+    # dan diproses saat sudah done. Begitu juga id yang belum terlihat karena transaksinya belum commit
+    # saat MAX(id) dibaca (dibatasi MOVE_LINE_ID_LAG). Saldo berjalan per (product, location internal) disimpan di
+    # balance.stock.checkpoint, stock_akhir per product = total saldo semua location internal.
+    # rebuild=True mengosongkan ledger lalu membangun ulang dari awal (koreksi data lama)
+    def get_report_stock_akhir(self, rebuild=False):
         cr = self.env.cr
+        ICP = self.env['ir.config_parameter'].sudo()
+
+        # Generate manual dan scheduler tidak boleh menulis ledger bersamaan
+        cr.execute("SELECT pg_advisory_xact_lock(hashtext('balance_stock_ledger'))")
 
-        # Hapus data lama
-        cr.execute("TRUNCATE balance_stock RESTART IDENTITY CASCADE;")
+        last_id = int(ICP.get_param(self.LAST_MOVE_LINE_PARAM) or 0)
+        if rebuild or not last_id:
+            cr.execute("TRUNCATE balance_stock, balance_stock_checkpoint, balance_stock_pending RESTART IDENTITY")
+            last_id = 0
+
+        cr.execute("SELECT COALESCE(MAX(id), 0) FROM stock_move_line")
+        max_id = cr.fetchone()[0]
 
         # Query yang mencakup semua pergerakan stock termasuk transfer internal
         cr.execute("""
@@ -56,13 +81,13 @@ class ReportStockAkhir(models.Model):
                     sml.location_dest_id,
                     sml.quantity,
                     src.usage as src_usage,
-                    src.complete_name as src_name,
-                    dest.usage as dest_usage,
-                    dest.complete_name as dest_name
+                    dest.usage as dest_usage
                 FROM stock_move_line sml
                 JOIN stock_location src ON src.id = sml.location_id
                 JOIN stock_location dest ON dest.id = sml.location_dest_id
                 WHERE sml.state = 'done'
+                  AND ((sml.id > %(last_id)s AND sml.id <= %(max_id)s)
+                       OR sml.id IN (SELECT move_line_id FROM balance_stock_pending))
             )
             SELECT
                 product_id,
@@ -89,37 +114,153 @@ class ReportStockAkhir(models.Model):
             FROM stock_moves
             GROUP BY product_id, DATE(date), reference, location_id, location_dest_id
             ORDER BY product_id, date_stock, reference;
-        """)
-
+        """, {'last_id': last_id, 'max_id': max_id})
         rows = cr.fetchall()
 
-        # Hitung cumulative stock & bulk insert
+        # Move line yang belum done/cancel tetap ditunggu di pending
+        cr.execute("""
+            WITH candidates AS (
+                SELECT move_line_id AS id FROM balance_stock_pending
+                UNION
+                SELECT id FROM stock_move_line WHERE id > %(last_id)s AND id <= %(max_id)s
+            )
+            SELECT sml.id
+            FROM candidates c
+            JOIN stock_move_line sml ON sml.id = c.id
+            WHERE sml.state NOT IN ('done', 'cancel')
+        """, {'last_id': last_id, 'max_id': max_id})
+        pending_ids = [row[0] for row in cr.fetchall()]
+
+        # Celah id di bawah max_id: baris dari transaksi yang masih berjalan belum terlihat, ditunggu seperti pending
+        cr.execute("""
+            SELECT gap.id
+            FROM (
+                SELECT generate_series(GREATEST(%(last_id)s, %(max_id)s - %(lag)s) + 1, %(max_id)s) AS id
+                UNION
+                SELECT move_line_id FROM balance_stock_pending WHERE move_line_id > %(max_id)s - %(lag)s
+            ) gap
+            WHERE NOT EXISTS (SELECT 1 FROM stock_move_line sml WHERE sml.id = gap.id)
+        """, {'last_id': last_id, 'max_id': max_id, 'lag': self.MOVE_LINE_ID_LAG})
+        pending_ids += [row[0] for row in cr.fetchall()]
+
+        if rows:
+            self._append_ledger_rows(rows)
+
+        cr.execute("DELETE FROM balance_stock_pending")
+        if pending_ids:
+            execute_values(cr._obj, "INSERT INTO balance_stock_pending (move_line_id) VALUES %s",
+                           [(move_line_id,) for move_line_id in pending_ids], page_size=self.INSERT_PAGE_SIZE)
+        ICP.set_param(self.LAST_MOVE_LINE_PARAM, max_id)
+        self.env.invalidate_all()
+
+    def _append_ledger_rows(self, rows):
+        cr = self.env.cr
+        product_ids = list({row[0] for row in rows})
+
+        # Lanjutkan nomor dan saldo dari checkpoint, bukan dari seluruh history
+        cr.execute("SELECT product_id, COUNT(*) FROM balance_stock WHERE product_id = ANY(%s) GROUP BY product_id", [product_ids])
+        numbering_per_product = dict(cr.fetchall())
+        cr.execute("SELECT product_id, location_id, stock_akhir FROM balance_stock_checkpoint WHERE product_id = ANY(%s)", [product_ids])
+        balance_per_location = {}
         last_stock_per_product = {}
-        numbering_per_product = {}
-        bulk_data = []
+        for product_id, location_id, stock_akhir in cr.fetchall():
+            balance_per_location[(product_id, location_id)] = stock_akhir
+            last_stock_per_product[product_id] = last_stock_per_product.get(product_id, 0.0) + stock_akhir
 
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        ledger_values = []
         for product_id, date_stock, reference, location_id, location_dest_id, stock_out, stock_in in rows:
             last_stock = last_stock_per_product.get(product_id, 0.0)
             stock_akhir = last_stock + stock_in - stock_out
             last_stock_per_product[product_id] = stock_akhir
 
+            # stock_out hanya terisi jika asal internal, stock_in jika tujuan internal
+            if stock_out:
+                balance_per_location[(product_id, location_id)] = balance_per_location.get((product_id, location_id), 0.0) - stock_out
+            if stock_in:
+                balance_per_location[(product_id, location_dest_id)] = balance_per_location.get((product_id, location_dest_id), 0.0) + stock_in
+
             numbering_per_product[product_id] = numbering_per_product.get(product_id, 0) + 1
 
-            bulk_data.append({
-                'numbering': str(numbering_per_product[product_id]),
-                'date_stock': date_stock,
-                'reference': reference,
-                'product_id': product_id,
-                'stock_in': stock_in,
-                'stock_out': stock_out,
-                'stock_akhir': stock_akhir,
-                'location_id': location_id,
-                'location_dest_id': location_dest_id
-            })
-
-        if bulk_data:
-            self.env['balance.stock'].create(bulk_data)
+            ledger_values.append((
+                str(numbering_per_product[product_id]), date_stock, reference, product_id, location_id, location_dest_id,
+                stock_in, stock_out, stock_akhir, uid, now, uid, now,
+            ))
+
+        execute_values(cr._obj, """
+            INSERT INTO balance_stock (numbering, date_stock, reference, product_id, location_id, location_dest_id,
+                                       stock_in, stock_out, stock_akhir, create_uid, create_date, write_uid, write_date)
+            VALUES %s
+        """, ledger_values, page_size=self.INSERT_PAGE_SIZE)
+
+        execute_values(cr._obj, """
+            INSERT INTO balance_stock_checkpoint (product_id, location_id, stock_akhir, create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (product_id, location_id)
+            DO UPDATE SET stock_akhir = EXCLUDED.stock_akhir, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+        """, [
+            (product_id, location_id, stock_akhir, uid, now, uid, now)
+            for (product_id, location_id), stock_akhir in balance_per_location.items()
+        ], page_size=self.INSERT_PAGE_SIZE)
+
+    # Saldo per (product, location internal) pada tanggal tertentu: {(product_id, location_id): qty}.
+    # Tanpa at_date langsung dari checkpoint (posisi generate terakhir)
+    @api.model
+    def get_stock_at(self, at_date=None, product_ids=None, location_ids=None):
+        cr = self.env.cr
+        params = {'product_ids': list(product_ids or []), 'location_ids': list(location_ids or [])}
+        filters = ["TRUE"]
+        if product_ids is not None:
+            filters.append("product_id = ANY(%(product_ids)s::int[])")
+        if location_ids is not None:
+            filters.append("location_id = ANY(%(location_ids)s::int[])")
+        where = " AND ".join(filters)
+
+        if not at_date:
+            cr.execute(f"""
+                SELECT product_id, location_id, stock_akhir
+                FROM balance_stock_checkpoint
+                WHERE {where}
+            """, params)
+        else:
+            params['at_date'] = at_date
+            cr.execute(f"""
+                SELECT product_id, location_id, SUM(qty)
+                FROM (
+                    SELECT product_id, location_dest_id AS location_id, stock_in AS qty
+                    FROM balance_stock
+                    WHERE stock_in != 0 AND date_stock <= %(at_date)s
+                    UNION ALL
+                    SELECT product_id, location_id, -stock_out
+                    FROM balance_stock
+                    WHERE stock_out != 0 AND date_stock <= %(at_date)s
+                ) moves
+                WHERE {where}
+                GROUP BY product_id, location_id
+            """, params)
+        return {(product_id, location_id): qty for product_id, location_id, qty in cr.fetchall()}
 
     @api.model
     def _scheduler_generate_stock_report(self):
-        self.get_report_stock_akhir()
\ No newline at end of file
+        self.get_report_stock_akhir()
+
+
+class ReportStockCheckpoint(models.Model):
+    _name = 'balance.stock.checkpoint'
+    _description = 'Stock Ledger Checkpoint'
+
+    product_id = fields.Many2one('product.product', string='Product', required=True, index=True)
+    location_id = fields.Many2one('stock.location', string='Location', required=True)
+    stock_akhir = fields.Float(string='Stock Akhir', digits=(16,3))
+
+    _sql_constraints = [
+        ('product_location_uniq', 'unique(product_id, location_id)', 'Checkpoint per product dan location harus unik.'),
+    ]
+
+
+class ReportStockPending(models.Model):
+    _name = 'balance.stock.pending'
+    _description = 'Stock Ledger Pending Move Line'
+
+    move_line_id = fields.Integer(string='Move Line ID', required=True, index=True)
@@ -3,7 +3,7 @@ from odoo.exceptions import ValidationError
   
 
 class ResPartner(models.Model): 
-    _inherit = 'res.partner'
+    _inherit = ['res.partner', 'id.mc.mapping.mixin']
 
     customer_code = fields.Char(string='Customer Code', tracking=True)
     is_integrated = fields.Boolean(string="User created", default=False, readonly=True, tracking=True)
@@ -0,0 +1,212 @@
+/** @odoo-module **/
+
+// Index barcode -> produk dari /pos/barcode_index, disimpan di IndexedDB.
+// Startup berikutnya cukup membaca IndexedDB lalu mengambil delta sejak watermark terakhir.
+// Baris index: [product_id, to_weight, barcode, [multiple barcode, ...]]
+const IDB_STORE = "barcode_index";
+const IDB_KEY = "index";
+// Jarak minimal antar sync delta saat barcode tidak ditemukan di index
+const MISS_SYNC_INTERVAL = 60 * 1000;
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+export class BarcodeIndex {
+    constructor(dbName) {
+        this.idbName = `integrasi_pos_barcode_index_${dbName || "default"}`;
+        this.rows = new Map();
+        this.byBarcode = new Map();
+        this.byMultiBarcode = new Map();
+        this.watermark = null;
+        this.ready = false;
+        this.lastSync = 0;
+        this.syncing = null;
+        this.loading = null;
+    }
+
+    async openIdb() {
+        if (!window.indexedDB) {
+            return null;
+        }
+        const request = window.indexedDB.open(this.idbName, 1);
+        request.onupgradeneeded = () => request.result.createObjectStore(IDB_STORE);
+        return await idbRequest(request);
+    }
+
+    async readIdb() {
+        try {
+            const db = await this.openIdb();
+            if (!db) return null;
+            const saved = await idbRequest(db.transaction(IDB_STORE, "readonly").objectStore(IDB_STORE).get(IDB_KEY));
+            db.close();
+            return saved || null;
+        } catch (error) {
+            console.warn("⚠️ Barcode index IndexedDB tidak bisa dibaca:", error);
+            return null;
+        }
+    }
+
+    async writeIdb() {
+        try {
+            const db = await this.openIdb();
+            if (!db) return;
+            const value = { watermark: this.watermark, rows: [...this.rows.values()] };
+            await idbRequest(db.transaction(IDB_STORE, "readwrite").objectStore(IDB_STORE).put(value, IDB_KEY));
+            db.close();
+        } catch (error) {
+            console.warn("⚠️ Barcode index gagal disimpan ke IndexedDB:", error);
+        }
+    }
+
+    load() {
+        this.loading = this._load();
+        return this.loading;
+    }
+
+    async _load() {
+        const saved = await this.readIdb();
+        if (saved) {
+            this.reset(saved.rows || []);
+            this.watermark = saved.watermark;
+            console.log(`✅ Barcode index dari IndexedDB: ${this.rows.size} produk`);
+        }
+        await this.sync();
+    }
+
+    sync() {
+        // Sync yang sedang berjalan dipakai bersama, scan beruntun tidak memicu request ganda
+        if (!this.syncing) {
+            this.syncing = this._sync().finally(() => {
+                this.syncing = null;
+            });
+        }
+        return this.syncing;
+    }
+
+    async _sync() {
+        this.lastSync = Date.now();
+        try {
+            let data = await this.fetchIndex(this.watermark);
+            this.apply(data);
+            if (!data.full && this.count() !== data.count) {
+                // Ada barcode yang terhapus di server, delta tidak cukup
+                data = await this.fetchIndex(null);
+                this.apply(data);
+            }
+            this.ready = true;
+            console.log(`✅ Barcode index ${data.full ? "penuh" : "delta"}: ${this.rows.size} produk, ${this.count()} barcode`);
+            await this.writeIdb();
+        } catch (error) {
+            console.error("❌ Gagal sync barcode index:", error);
+            // Index lama dari IndexedDB tetap dipakai jika ada
+            this.ready = this.rows.size > 0;
+        }
+    }
+
+    async fetchIndex(since) {
+        const url = since ? `/pos/barcode_index?since=${encodeURIComponent(since)}` : "/pos/barcode_index";
+        const response = await fetch(url, { credentials: "same-origin" });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return await response.json();
+    }
+
+    reset(rows) {
+        this.rows.clear();
+        this.byBarcode.clear();
+        this.byMultiBarcode.clear();
+        for (const row of rows) {
+            this.addRow(row);
+        }
+    }
+
+    apply(data) {
+        if (data.full) {
+            this.reset(data.rows);
+        } else {
+            for (const productId of data.removed) {
+                this.removeRow(productId);
+            }
+            for (const row of data.rows) {
+                this.removeRow(row[0]);
+                this.addRow(row);
+            }
+        }
+        this.watermark = data.watermark;
+    }
+
+    addRow(row) {
+        const [productId, , barcode, multiBarcodes] = row;
+        this.rows.set(productId, row);
+        if (barcode) {
+            this.byBarcode.set(barcode, productId);
+        }
+        for (const multiBarcode of multiBarcodes) {
+            if (!this.byMultiBarcode.has(multiBarcode)) {
+                this.byMultiBarcode.set(multiBarcode, new Set());
+            }
+            this.byMultiBarcode.get(multiBarcode).add(productId);
+        }
+    }
+
+    removeRow(productId) {
+        const row = this.rows.get(productId);
+        if (!row) return;
+        const [, , barcode, multiBarcodes] = row;
+        if (barcode && this.byBarcode.get(barcode) === productId) {
+            this.byBarcode.delete(barcode);
+        }
+        for (const multiBarcode of multiBarcodes) {
+            const productIds = this.byMultiBarcode.get(multiBarcode);
+            if (productIds) {
+                productIds.delete(productId);
+                if (!productIds.size) this.byMultiBarcode.delete(multiBarcode);
+            }
+        }
+        this.rows.delete(productId);
+    }
+
+    count() {
+        let total = 0;
+        for (const [, , barcode, multiBarcodes] of this.rows.values()) {
+            total += (barcode ? 1 : 0) + multiBarcodes.length;
+        }
+        return total;
+    }
+
+    isWeighted(productId) {
+        const row = this.rows.get(productId);
+        return row ? Boolean(row[1]) : false;
+    }
+
+    // Barcode yang belum ada di index memicu sync delta (dibatasi MISS_SYNC_INTERVAL) untuk produk baru.
+    // Hasil undefined = index belum tersedia, pemanggil memakai pencarian ke server
+    async resolve(lookup) {
+        await this.loading;
+        if (this.syncing) await this.syncing;
+        if (!this.ready) return undefined;
+        let result = lookup();
+        if (result === null && Date.now() - this.lastSync > MISS_SYNC_INTERVAL) {
+            await this.sync();
+            result = lookup();
+        }
+        return result;
+    }
+
+    async findProductId(barcode) {
+        return await this.resolve(() => this.byBarcode.get(barcode) ?? null);
+    }
+
+    async findMultiBarcodeProductIds(barcode) {
+        const productIds = await this.resolve(() => {
+            const ids = this.byMultiBarcode.get(barcode);
+            return ids ? [...ids] : null;
+        });
+        return productIds === undefined ? undefined : productIds || [];
+    }
+}
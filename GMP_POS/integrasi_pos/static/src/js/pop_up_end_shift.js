@@ -204,7 +204,6 @@ export class EndShiftSessionButtonPopup extends AbstractAwaitablePopup {
             const currentSession = this.pos.get_order().pos_session_id;
 
             const startDateStr = this.formatDateForSearch(startShiftField);
-            const endDateStr = this.formatDateForSearch(endingShiftField);
     
             const existingEndShift = await this.orm.searchRead(
                 'end.shift',
@@ -224,52 +223,11 @@ export class EndShiftSessionButtonPopup extends AbstractAwaitablePopup {
     
             const endShiftId = existingEndShift[0].id;
 
-            const posOrders = await this.orm.searchRead(
-                'pos.order',
-                [
-                    ['session_id', '=', currentSession],
-                    ['state', '=', 'invoiced'],
-                    ['create_date', '>=', startDateStr],
-                    ['create_date', '<=', endDateStr]
-                ],
-                ['payment_ids']
-            );
-    
-            const paymentData = {};
-            for (const order of posOrders) {
-                const payments = await this.orm.searchRead(
-                    'pos.payment',
-                    [
-                        ['id', 'in', order.payment_ids],
-                    ],
-                    ['payment_date', 'payment_method_id', 'amount']
-                );
-    
-                for (const payment of payments) {
-                    const methodId = payment.payment_method_id[0];
-                    const amount = payment.amount;
-                    const paymentDate = payment.payment_date;
-            
-                    if (methodId in paymentData) {
-                        paymentData[methodId].expected_amount += amount;
-                        if (new Date(paymentDate) > new Date(paymentData[methodId].payment_date)) {
-                            paymentData[methodId].payment_date = paymentDate;
-                        }
-                    } else {
-                        paymentData[methodId] = {
-                            payment_method_id: methodId,
-                            payment_date: paymentDate,
-                        };
-                    }
-                }
-            }
-    
-            const line_ids = Object.values(paymentData);
-    
+            // Line per payment method dibuat ulang oleh action_close dari total pos.payment
+            // yang di-group di server (end.shift.get_payment_totals)
             await this.orm.write('end.shift', [endShiftId], {
                 start_date: this.formatDateToUTC(startShiftField),
                 end_date: this.formatDateToUTC(endingShiftField),
-                line_ids: [[5, 0, 0]].concat(line_ids.map(line => [0, 0, line])),
             });
     
             await this.orm.call(
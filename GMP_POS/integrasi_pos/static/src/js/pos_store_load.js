@@ -2,6 +2,8 @@
 
 import { patch } from "@web/core/utils/patch";
 import { PosStore } from "@point_of_sale/app/store/pos_store";
+import { session } from "@web/session";
+import { BarcodeIndex } from "./barcode_index";
 
 patch(PosStore.prototype, {
     async _processData(loadedData) {
@@ -183,15 +185,10 @@ patch(PosStore.prototype, {
                 console.warn("⚠️ No partners to patch");
             }
 
-            // 📦 Multiple Barcodes
-            this.multiple_barcodes = [];
-            const rawBarcodes = loadedData["multiple.barcode"];
-            if (Array.isArray(rawBarcodes)) {
-                this.multiple_barcodes = rawBarcodes;
-                console.log(`✅ Loaded ${this.multiple_barcodes.length} multiple barcodes`);
-            } else {
-                console.warn("⚠️ No multiple barcodes loaded");
-            }
+            // 📦 Barcode Index (barcode & multiple barcode -> produk), dimuat dari IndexedDB + delta server
+            // tanpa menahan startup POS; scan yang datang sebelum selesai menunggu sync pertama
+            this.barcodeIndex = new BarcodeIndex(session.db);
+            this.barcodeIndex.load();
 
             // 💰 POS Cashier Logs
             this.cashier_logs = [];
@@ -216,7 +213,6 @@ patch(PosStore.prototype, {
                 employees: this.hr_employee.length,
                 employeeConfigs: this.hr_employee_config.length,
                 partners: this.partners ? this.partners.length : 0,
-                multipleBarcodes: this.multiple_barcodes.length,
                 cashierLogs: this.cashier_logs.length,
             });
 
@@ -300,12 +296,9 @@ patch(PosStore.prototype, {
      */
     getProductByMultipleBarcode(barcode) {
         try {
-            const barcodeRecord = this.multiple_barcodes.find(b => b.barcode === barcode);
-            if (barcodeRecord && barcodeRecord.product_id) {
-                const productId = Array.isArray(barcodeRecord.product_id) 
-                    ? barcodeRecord.product_id[0] 
-                    : barcodeRecord.product_id;
-                return this.db.get_product_by_id(productId);
+            const productIds = this.barcodeIndex?.byMultiBarcode.get(barcode);
+            if (productIds && productIds.size) {
+                return this.db.get_product_by_id([...productIds][0]) || null;
             }
             return null;
         } catch (e) {
@@ -81,6 +81,20 @@ patch(ProductScreen.prototype, {
         return null;
     },
 
+    async _loadProductsByIds(productIds) {
+        const missingIds = productIds.filter(id => !this.pos.db.get_product_by_id(id));
+        if (missingIds.length) {
+            try {
+                await this.pos._loadMissingProducts(missingIds, []);
+            } catch (e) {
+                // Fallback jika method signature berbeda
+                console.warn("⚠️ Fallback loading products...");
+                await this.pos._addProducts(missingIds, false);
+            }
+        }
+        return productIds.map(id => this.pos.db.get_product_by_id(id)).filter(Boolean);
+    },
+
     async _searchProductByBarcode(barcode) {
         // Cari di local DB terlebih dahulu
         let product = this.pos.db.get_product_by_barcode(barcode);
@@ -89,41 +103,33 @@ patch(ProductScreen.prototype, {
             return product;
         }
 
-        // Jika tidak ada di local DB, search_read ke server
-        console.log("🔍 Produk tidak di local DB, mencari ke server dengan search_read...");
-        try {
-            const products = await this.env.services.orm.searchRead(
-                "product.product",
-                [["barcode", "=", barcode], ["available_in_pos", "=", true]],
-                ["id"],
-                { limit: 1 }
-            );
-
-            if (products && products.length > 0) {
-                const productId = products[0].id;
-                console.log("✅ Produk ID ditemukan di server:", productId);
-                
-                // Load produk secara lengkap - pass empty array untuk lines
-                try {
-                    await this.pos._loadMissingProducts([productId], []);
-                } catch (e) {
-                    // Fallback jika method signature berbeda
-                    console.warn("⚠️ Fallback loading product...");
-                    await this.pos._addProducts([productId], false);
-                }
-                
-                // Sekarang produk sudah lengkap dengan semua method-nya
-                product = this.pos.db.get_product_by_id(productId);
-                
-                if (product) {
-                    console.log("✅ Produk berhasil dimuat:", product.display_name);
-                    return product;
-                }
+        // Cari di barcode index (IndexedDB), server hanya dipanggil jika index belum tersedia
+        let productId = await this.pos.barcodeIndex?.findProductId(barcode);
+        if (productId === undefined) {
+            console.log("🔍 Barcode index belum tersedia, mencari ke server dengan search_read...");
+            try {
+                const products = await this.env.services.orm.searchRead(
+                    "product.product",
+                    [["barcode", "=", barcode], ["available_in_pos", "=", true]],
+                    ["id"],
+                    { limit: 1 }
+                );
+                productId = products.length ? products[0].id : null;
+            } catch (error) {
+                console.error("❌ Error search_read product:", error);
+                productId = null;
             }
-        } catch (error) {
-            console.error("❌ Error search_read product:", error);
+        }
+        if (!productId) {
+            return null;
         }
 
+        // Load produk secara lengkap agar semua method-nya tersedia
+        [product] = await this._loadProductsByIds([productId]);
+        if (product) {
+            console.log("✅ Produk berhasil dimuat:", product.display_name);
+            return product;
+        }
         return null;
     },
 
@@ -153,7 +159,7 @@ patch(ProductScreen.prototype, {
                     kode_produk,
                 });
 
-                // Search produk timbangan dari server dengan search_read
+                // Kode produk timbangan dicari lewat barcode index lokal
                 const productWeightCandidate = await this._searchProductByBarcode(kode_produk);
                 if (productWeightCandidate?.to_weight) {
                     resultProducts.push(productWeightCandidate);
@@ -163,7 +169,7 @@ patch(ProductScreen.prototype, {
             }
         }
 
-        // Match full barcode langsung (search_read ke server jika perlu)
+        // Match full barcode langsung lewat local DB / barcode index
         // Hanya cari barcode penuh jika BUKAN produk timbangan
         if (!isTimbangan) {
             const directMatch = await this._searchProductByBarcode(barcode);
@@ -176,73 +182,37 @@ patch(ProductScreen.prototype, {
         if (config?.multiple_barcode_activate) {
             console.log("✅ [MULTI-BARCODE MODE ACTIVE] Scanning with multiple_barcode_activate = TRUE");
 
-            // Cek di local DB dulu
-            if (this.pos.db?.product_by_id) {
-                const allProducts = Object.values(this.pos.db.product_by_id);
-                for (const product of allProducts) {
-                    // Untuk timbangan, cek dengan kode_produk
-                    // Untuk non-timbangan, cek dengan barcode penuh
-                    const barcodeToCheck = isTimbangan && kode_produk ? kode_produk : barcode;
-                    const matches = (product.multi_barcode_ids || []).some(bc => bc === barcodeToCheck);
-                    
-                    if (matches) {
-                        // Pastikan produk sesuai dengan jenis scan (timbangan/non-timbangan)
-                        if ((isTimbangan && product.to_weight) || (!isTimbangan && !product.to_weight)) {
-                            resultProducts.push(product);
-                            console.log("📡 Multiple Barcode Match Detected (Local):", {
-                                barcode_scanned: barcode,
-                                barcode_checked: barcodeToCheck,
-                                matched_with: product.multi_barcode_ids,
-                                matched_product_id: product.id,
-                                matched_product_name: product.display_name || product.name,
-                                is_timbangan: isTimbangan,
-                            });
-                        }
-                    }
+            const barcodeToCheck = isTimbangan && kode_produk ? kode_produk : barcode;
+            let productIds = await this.pos.barcodeIndex?.findMultiBarcodeProductIds(barcodeToCheck);
+            if (productIds === undefined) {
+                // Barcode index belum tersedia, search_read ke server
+                try {
+                    const serverProducts = await this.env.services.orm.searchRead(
+                        "product.product",
+                        [["multi_barcode_ids", "in", [barcodeToCheck]],
+                         ["available_in_pos", "=", true]],
+                        ["id"]
+                    );
+                    productIds = serverProducts.map(p => p.id);
+                } catch (error) {
+                    console.error("❌ Error search_read multi-barcode products:", error);
+                    productIds = [];
                 }
             }
 
-            // Search ke server untuk multi-barcode dengan search_read
-            try {
-                const barcodeToSearch = isTimbangan && kode_produk ? kode_produk : barcode;
-                const serverProducts = await this.env.services.orm.searchRead(
-                    "product.product",
-                    [["multi_barcode_ids", "in", [barcodeToSearch]], 
-                     ["available_in_pos", "=", true]],
-                    ["id"]
-                );
-
-                if (serverProducts && serverProducts.length > 0) {
-                    // Load semua produk secara lengkap
-                    const productIds = serverProducts.map(p => p.id);
-                    try {
-                        await this.pos._loadMissingProducts(productIds, []);
-                    } catch (e) {
-                        // Fallback jika method signature berbeda
-                        console.warn("⚠️ Fallback loading products...");
-                        await this.pos._addProducts(productIds, false);
-                    }
-                    
-                    for (const productData of serverProducts) {
-                        const product = this.pos.db.get_product_by_id(productData.id);
-                        if (product) {
-                            // Pastikan produk sesuai dengan jenis scan
-                            if ((isTimbangan && product.to_weight) || (!isTimbangan && !product.to_weight)) {
-                                resultProducts.push(product);
-                                console.log("📡 Multiple Barcode Match Detected (Server):", {
-                                    barcode_scanned: barcode,
-                                    barcode_checked: barcodeToSearch,
-                                    matched_with: product.multi_barcode_ids,
-                                    matched_product_id: product.id,
-                                    matched_product_name: product.display_name || product.name,
-                                    is_timbangan: isTimbangan,
-                                });
-                            }
-                        }
-                    }
+            const products = productIds.length ? await this._loadProductsByIds(productIds) : [];
+            for (const product of products) {
+                // Pastikan produk sesuai dengan jenis scan (timbangan/non-timbangan)
+                if ((isTimbangan && product.to_weight) || (!isTimbangan && !product.to_weight)) {
+                    resultProducts.push(product);
+                    console.log("📡 Multiple Barcode Match Detected:", {
+                        barcode_scanned: barcode,
+                        barcode_checked: barcodeToCheck,
+                        matched_product_id: product.id,
+                        matched_product_name: product.display_name || product.name,
+                        is_timbangan: isTimbangan,
+                    });
                 }
-            } catch (error) {
-                console.error("❌ Error search_read multi-barcode products:", error);
             }
         }
 
@@ -353,7 +323,7 @@ patch(ProductScreen.prototype, {
         const panjangBarcode = parseInt(config?.panjang_barcode || "7");
         const kode_produk = barcode.slice(0, barcode.length - panjangBarcode);
 
-        // Search ke server dengan search_read jika perlu
+        // Cari lewat local DB / barcode index
         let product = await this._searchProductByBarcode(kode_produk);
         if (!product) {
             product = await this._searchProductByBarcode(barcode);
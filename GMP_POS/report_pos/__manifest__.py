@@ -11,6 +11,7 @@
     'depends': ['base', 'sale', 'stock', 'point_of_sale', 'account'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/sales_report_view.xml',
         'views/sales_report_menu_view.xml',
         'views/report_layout_templates.xml',
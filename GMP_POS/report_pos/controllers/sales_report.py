@@ -93,13 +93,9 @@ class SalesReportDetailController(http.Controller):
             [html], landscape=False
         )
 
-        # kirim ke browser
-        pdfhttpheaders = [
-            ('Content-Type', 'application/pdf'),
-            ('Content-Length', len(pdf)),
-            ('Content-Disposition', 'attachment; filename="sales_report_detail.pdf"')
-        ]
-        return request.make_response(pdf, headers=pdfhttpheaders)
+        # simpan PDF ke filestore lalu kirim lewat URL download
+        attachment = request.env['sales.report']._create_report_attachment('sales_report_detail.pdf', 'application/pdf', raw=pdf)
+        return request.redirect('/web/content/%s?download=true' % attachment.id)
 
     @http.route('/sales/report/recap', type='http', auth='user', website=True)
     def portal_sales_report_recap(self, **kw):
@@ -146,54 +142,24 @@ class SalesReportDetailController(http.Controller):
         if not date_from or not date_to:
             return request.not_found()
 
-        domain = [
-            ('date_order', '>=', date_from),
-            ('date_order', '<=', date_to),
-        ]
-
-        # if invoice_no:
-        #     move = request.env['account.move'].sudo().search([('name', '=', invoice_no)], limit=1)
-        #     if move:
-        #         domain.append(('account_move', '=', move.id))
-
-        # if pos_order_ref:
-        #     domain.append(('name', '=', pos_order_ref))
-
-        orders = request.env['pos.order'].sudo().search(domain)
+        date_from = fields.Date.from_string(date_from)
+        date_to = fields.Date.from_string(date_to)
+        Fact = request.env['pos.sales.fact'].sudo()
+        facts = Fact.read_facts('order', date_from, date_to, ['vit_date', 'vit_spending_range'])
+        fact_dict = {(fact['vit_date'], fact['vit_spending_range']): fact for fact in facts}
 
         # Ambil daftar tanggal unik
-        tanggal_set = set(
-            fields.Datetime.context_timestamp(request.env.user, o.date_order).date()
-            for o in orders
-        )
-        tanggal_list = sorted(list(tanggal_set))
-
-        # Range Spending seperti di Python XLSX kamu
-        range_spending = [
-            (0, 50000, "0 - 50.000"),
-            (50001, 100000, "50.001 - 100.000"),
-            (100001, 250000, "100.001 - 250.000"),
-            (250001, 500000, "250.001 - 500.000"),
-            (500001, 1000000, "500.001 - 1.000.000"),
-            (1000001, 3000000, "1.000.001 - 3.000.000"),
-            (3000001, 5000000, "3.000.001 - 5.000.000"),
-            (5000001, 20000000, "5.000.001 - 20.000.000"),
-            (20000001, float('inf'), ">20.000.001"),
-        ]
+        tanggal_list = sorted(set(fact['vit_date'] for fact in facts))
 
         # Bentuk data_rows
         data_rows = []
-        for min_spending, max_spending, label in range_spending:
+        for idx, (min_spending, max_spending, label) in enumerate(Fact.SPENDING_RANGES, 1):
             row_data = {'label': label}
             for tgl in tanggal_list:
-                order_filtered = orders.filtered(lambda o:
-                    fields.Datetime.context_timestamp(request.env.user, o.date_order).date() == tgl and
-                    min_spending <= o.amount_total <= max_spending
-                )
-
-                total_qty = sum(sum(line.qty for line in o.lines) for o in order_filtered)
-                total_trx = len(order_filtered)
-                total_sales = sum(o.amount_total for o in order_filtered)
+                fact = fact_dict.get((tgl, idx), {})
+                total_qty = fact.get('qty', 0)
+                total_trx = fact.get('trx', 0)
+                total_sales = fact.get('amount', 0)
 
                 row_data[f"{tgl.strftime('%d/%m/%Y')}_qty"] = total_qty or ''
                 row_data[f"{tgl.strftime('%d/%m/%Y')}_trx"] = total_trx or ''
@@ -202,7 +168,6 @@ class SalesReportDetailController(http.Controller):
             data_rows.append(row_data)
 
         values = {
-            'orders': orders,
             'tanggal_list': tanggal_list,  # dikirim ke QWeb
             'data_rows': data_rows,
             'date_from': fields.Date.from_string(date_from).strftime('%d/%m/%Y'),
@@ -221,57 +186,23 @@ class SalesReportDetailController(http.Controller):
         if not date_from or not date_to:
             return request.not_found()
 
-        domain = [
-            ('date_order', '>=', date_from),
-            ('date_order', '<=', date_to),
-        ]
-
-        # if invoice_no:
-        #     move = request.env['account.move'].sudo().search([('name', '=', invoice_no)], limit=1)
-        #     if move:
-        #         domain.append(('account_move', '=', move.id))
-
-        # if pos_order_ref:
-        #     domain.append(('name', '=', pos_order_ref))
-
-        orders = request.env['pos.order'].sudo().search(domain)
+        date_from = fields.Date.from_string(date_from)
+        date_to = fields.Date.from_string(date_to)
+        facts = request.env['pos.sales.fact'].sudo().read_facts('order', date_from, date_to, ['vit_date', 'vit_hour'])
+        fact_dict = {(fact['vit_date'], fact['vit_hour']): fact for fact in facts}
 
         # Ambil daftar tanggal unik
-        tanggal_set = set(
-            fields.Datetime.context_timestamp(request.env.user, o.date_order).date()
-            for o in orders
-        )
-        tanggal_list = sorted(list(tanggal_set))
-
-        # Range Spending seperti di Python XLSX kamu
-        hourly = []
-        for data_hour in range(24):
-            hourly.append(data_hour)
-        # range_spending = [
-        #     (0, 50000, "0 - 50.000"),
-        #     (50001, 100000, "50.001 - 100.000"),
-        #     (100001, 250000, "100.001 - 250.000"),
-        #     (250001, 500000, "250.001 - 500.000"),
-        #     (500001, 1000000, "500.001 - 1.000.000"),
-        #     (1000001, 3000000, "1.000.001 - 3.000.000"),
-        #     (3000001, 5000000, "3.000.001 - 5.000.000"),
-        #     (5000001, 20000000, "5.000.001 - 20.000.000"),
-        #     (20000001, float('inf'), ">20.000.001"),
-        # ]
+        tanggal_list = sorted(set(fact['vit_date'] for fact in facts))
 
         # Bentuk data_rows
         data_rows = []
-        for hour in hourly:
+        for hour in range(24):
             row_data = {}
             for tgl in tanggal_list:
-                order_filtered = orders.filtered(lambda o: fields.Datetime.context_timestamp(request.env.user, o.date_order).date() == tgl and fields.Datetime.context_timestamp(request.env.user, o.date_order).hour == hour)
-                # total_qty = sum(sum(line.qty for line in o.lines) for o in order_filtered)
-                # total_trx = len(order_filtered)
-                # total_sales = sum(o.amount_total for o in order_filtered)
-
-                total_qty = sum(order_filtered.mapped(lambda o: sum(o.lines.mapped('qty'))))
-                total_trx = len(order_filtered)
-                total_sales = sum(order_filtered.mapped('amount_total'))
+                fact = fact_dict.get((tgl, hour), {})
+                total_qty = fact.get('qty', 0)
+                total_trx = fact.get('trx', 0)
+                total_sales = fact.get('amount', 0)
 
                 row_data[f"{tgl.strftime('%d/%m/%Y')}_qty"] = total_qty or ''
                 row_data[f"{tgl.strftime('%d/%m/%Y')}_trx"] = total_trx or ''
@@ -280,7 +211,6 @@ class SalesReportDetailController(http.Controller):
             data_rows.append(row_data)
 
         values = {
-            'orders': orders,
             'tanggal_list': tanggal_list,  # dikirim ke QWeb
             'data_rows': data_rows,
             'date_from': fields.Date.from_string(date_from).strftime('%d/%m/%Y'),
@@ -300,21 +230,21 @@ class SalesReportDetailController(http.Controller):
         if not date_from or not date_to:
             return request.not_found()
 
-        domain = [
-            ('date_order', '>=', date_from),
-            ('date_order', '<=', date_to),
-        ]
-
-        if invoice_no:
-            move = request.env['account.move'].sudo().search([('name', '=', invoice_no)], limit=1)
-            if move:
-                domain.append(('account_move', '=', move.id))
-
-        if pos_order_ref:
-            domain.append(('name', '=', pos_order_ref))
-
-        orders = request.env['pos.order'].sudo().search(domain)
-        if not orders:
+        order_ids = None
+        if invoice_no or pos_order_ref:
+            domain = []
+            if invoice_no:
+                move = request.env['account.move'].sudo().search([('name', '=', invoice_no)], limit=1)
+                if move:
+                    domain.append(('account_move', '=', move.id))
+            if pos_order_ref:
+                domain.append(('name', '=', pos_order_ref))
+            if domain:
+                order_ids = request.env['pos.order'].sudo().search(domain).ids
+
+        facts = request.env['pos.sales.fact'].sudo().read_facts(
+            'category', fields.Date.from_string(date_from), fields.Date.from_string(date_to), ['pos_category_id', 'vit_hour'], order_ids=order_ids)
+        if not facts:
             return request.render('report_pos.report_sales_hourly_category', {
                 'orders': [],
                 'tanggal_list': [],
@@ -326,39 +256,23 @@ class SalesReportDetailController(http.Controller):
 
         jam_list = ['{:02d}'.format(j) for j in range(24)]
         categories = request.env['pos.category'].sudo().search([])
+        fact_dict = {(fact['pos_category_id'], fact['vit_hour']): fact for fact in facts}
 
         data_rows = []
         for category in categories:
             row_data = {'kategori': category.name}
             for jam in jam_list:
-                jam_int = int(jam)
-                total_qty = 0
-                total_sales = 0
-                trx_set = set()
-
-                for order in orders:
-                    order_dt = fields.Datetime.context_timestamp(request.env.user, order.date_order)
-                    if order_dt.hour != jam_int:
-                        continue
-                    if not (fields.Date.from_string(date_from) <= order_dt.date() <= fields.Date.from_string(date_to)):
-                        continue
-
-                    matching_lines = order.lines.filtered(
-                        lambda l: category.id in l.product_id.product_tmpl_id.pos_categ_ids.ids
-                    )
-                    if matching_lines:
-                        trx_set.add(order.id)
-                        total_qty += sum(matching_lines.mapped('qty'))
-                        total_sales += sum(matching_lines.mapped('price_subtotal_incl'))
+                fact = fact_dict.get((category.id, int(jam)), {})
+                total_qty = fact.get('qty', 0)
+                total_sales = fact.get('amount', 0)
 
                 row_data[f"{jam}_qty"] = total_qty or ''
-                row_data[f"{jam}_trx"] = len(trx_set) or ''
+                row_data[f"{jam}_trx"] = fact.get('trx', 0) or ''
                 row_data[f"{jam}_sales"] = "{:,.0f}".format(total_sales) if total_sales else ''
             
             data_rows.append(row_data)
 
         values = {
-            'orders': orders,
             'data_rows': data_rows,
             'jam_list': jam_list,
             'date_from': fields.Date.from_string(date_from).strftime('%d/%m/%Y'),
@@ -510,13 +424,9 @@ class SalesReportDetailController(http.Controller):
             html, landscape=False
         )
 
-        # kirim PDF ke browser
-        pdfhttpheaders = [
-            ('Content-Type', 'application/pdf'),
-            ('Content-Length', len(pdf)),
-            ('Content-Disposition', 'attachment; filename="contribution_report.pdf"')
-        ]
-        return request.make_response(pdf, headers=pdfhttpheaders)
+        # simpan PDF ke filestore lalu kirim lewat URL download
+        attachment = request.env['sales.report']._create_report_attachment('contribution_report.pdf', 'application/pdf', raw=pdf)
+        return request.redirect('/web/content/%s?download=true' % attachment.id)
     
     @http.route('/my/sales/report/settlement_end_of_shift', type='http', auth='user', website=True)
     def portal_sales_report_settlement_end_of_shift(self, **kw):
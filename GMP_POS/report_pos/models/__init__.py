@@ -1,2 +1,3 @@
 from . import sales_report
-from . import sales_report_preview
\ No newline at end of file
+from . import sales_report_preview
+from . import sales_fact
@@ -0,0 +1,242 @@
+from datetime import datetime, time, timedelta
+import pytz
+from odoo import models, fields, api
+
+
+class PosSalesFact(models.Model):
+    _name = 'pos.sales.fact'
+    _description = 'POS Sales Fact'
+    _order = 'vit_date, vit_hour'
+
+    # Ringkasan penjualan POS per (tanggal, jam, store, user, dimensi) yang dibaca report_pos dengan satu GROUP BY.
+    # Setiap vit_kind berdiri sendiri, satu order dihitung paling banyak sekali per nilai dimensi:
+    #   order    -> semua order, amount = amount_total, dengan vit_spending_range untuk report spending
+    #   category -> line per POS category, amount = price_subtotal_incl
+    #   brand    -> line per brand produk, amount = price_subtotal_incl
+    #   payment  -> order yang memakai payment method tsb, qty/amount = seluruh line order
+    # Data per tanggal (zona waktu TZ) dibangun ulang utuh sehingga refresh aman diulang
+    vit_kind = fields.Selection([
+        ('order', 'Order'),
+        ('category', 'Category'),
+        ('brand', 'Brand'),
+        ('payment', 'Payment Method'),
+    ], string='Kind', required=True, index=True)
+    vit_date = fields.Date(string='Date', required=True, index=True)
+    vit_hour = fields.Integer(string='Hour')
+    config_id = fields.Many2one('pos.config', string='Store')
+    user_id = fields.Many2one('res.users', string='User')
+    pos_category_id = fields.Many2one('pos.category', string='POS Category')
+    vit_brand = fields.Char(string='Brand')
+    payment_method_id = fields.Many2one('pos.payment.method', string='Payment Method')
+    vit_spending_range = fields.Integer(string='Spending Range')
+    vit_qty = fields.Float(string='Quantity')
+    vit_trx_count = fields.Integer(string='Trx')
+    vit_amount = fields.Float(string='Amount')
+
+    TZ = 'Asia/Jakarta'
+    WATERMARK_PARAM = 'report_pos.sales_fact_watermark'
+    # Order yang ditulis sedikit sebelum watermark tetap dicek ulang (transaksi yang commit terlambat)
+    WATERMARK_OVERLAP = timedelta(minutes=10)
+
+    # (min, max, label) sesuai report spending, index list = vit_spending_range - 1
+    SPENDING_RANGES = [
+        (0, 50000, "0 - 50.000"),
+        (50001, 100000, "50.001 - 100.000"),
+        (100001, 250000, "100.001 - 250.000"),
+        (250001, 500000, "250.001 - 500.000"),
+        (500001, 1000000, "500.001 - 1.000.000"),
+        (1000001, 3000000, "1.000.001 - 3.000.000"),
+        (3000001, 5000000, "3.000.001 - 5.000.000"),
+        (5000001, 20000000, "5.000.001 - 20.000.000"),
+        (20000001, float('inf'), ">20.000.001"),
+    ]
+
+    GROUP_FIELDS = ('vit_date', 'vit_hour', 'config_id', 'user_id', 'pos_category_id', 'vit_brand', 'payment_method_id', 'vit_spending_range')
+    FACT_COLUMNS = ('vit_kind', 'vit_date', 'vit_hour', 'config_id', 'user_id', 'pos_category_id', 'vit_brand',
+                    'payment_method_id', 'vit_spending_range', 'vit_qty', 'vit_trx_count', 'vit_amount')
+
+    def _spending_range_sql(self):
+        cases = []
+        for index, (min_spending, max_spending, label) in enumerate(self.SPENDING_RANGES, 1):
+            if max_spending == float('inf'):
+                cases.append(f"WHEN o.amount_total >= {min_spending} THEN {index}")
+            else:
+                cases.append(f"WHEN o.amount_total >= {min_spending} AND o.amount_total <= {max_spending} THEN {index}")
+        return "CASE " + " ".join(cases) + " END"
+
+    # SELECT baris fact dari pos.order yang lolos order_filter (SQL dengan parameter bernama)
+    def _aggregate_query(self, order_filter):
+        brand_sql = "pt.brand" if 'brand' in self.env['product.template']._fields else "NULL"
+        return f"""
+            WITH o AS (
+                SELECT po.id, po.config_id, po.user_id, po.amount_total,
+                       (po.date_order AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date AS vit_date,
+                       EXTRACT(HOUR FROM po.date_order AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::int AS vit_hour
+                FROM pos_order po
+                WHERE po.state != 'cancel' AND {order_filter}
+            ),
+            l AS (
+                SELECT pol.order_id, pol.qty, pol.price_subtotal_incl, pt.id AS tmpl_id,
+                       COALESCE(NULLIF({brand_sql}, ''), '-') AS brand
+                FROM pos_order_line pol
+                JOIN o ON o.id = pol.order_id
+                JOIN product_product pp ON pp.id = pol.product_id
+                JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            ),
+            ot AS (
+                SELECT order_id, SUM(qty) AS qty, SUM(price_subtotal_incl) AS amount
+                FROM l GROUP BY order_id
+            )
+            SELECT 'order', o.vit_date, o.vit_hour, o.config_id, o.user_id, NULL::int, NULL::varchar, NULL::int,
+                   {self._spending_range_sql()}, SUM(COALESCE(ot.qty, 0)), COUNT(*), SUM(o.amount_total)
+            FROM o LEFT JOIN ot ON ot.order_id = o.id
+            GROUP BY 2, 3, 4, 5, 9
+            UNION ALL
+            SELECT 'category', o.vit_date, o.vit_hour, o.config_id, o.user_id, rel.pos_category_id, NULL, NULL,
+                   NULL, SUM(l.qty), COUNT(DISTINCT o.id), SUM(l.price_subtotal_incl)
+            FROM l
+            JOIN o ON o.id = l.order_id
+            JOIN pos_category_product_template_rel rel ON rel.product_template_id = l.tmpl_id
+            GROUP BY 2, 3, 4, 5, 6
+            UNION ALL
+            SELECT 'brand', o.vit_date, o.vit_hour, o.config_id, o.user_id, NULL, l.brand, NULL,
+                   NULL, SUM(l.qty), COUNT(DISTINCT o.id), SUM(l.price_subtotal_incl)
+            FROM l
+            JOIN o ON o.id = l.order_id
+            GROUP BY 2, 3, 4, 5, 7
+            UNION ALL
+            SELECT 'payment', o.vit_date, o.vit_hour, o.config_id, o.user_id, NULL, NULL, pm.payment_method_id,
+                   NULL, SUM(COALESCE(ot.qty, 0)), COUNT(*), SUM(COALESCE(ot.amount, 0))
+            FROM (SELECT DISTINCT pos_order_id, payment_method_id FROM pos_payment WHERE pos_order_id IN (SELECT id FROM o)) pm
+            JOIN o ON o.id = pm.pos_order_id
+            LEFT JOIN ot ON ot.order_id = o.id
+            GROUP BY 2, 3, 4, 5, 8
+        """
+
+    # Filter order per tanggal lokal, memakai index date_order lewat batas UTC
+    def _date_filter_params(self, dates):
+        tz = pytz.timezone(self.TZ)
+        start = tz.localize(datetime.combine(min(dates), time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        stop = tz.localize(datetime.combine(max(dates) + timedelta(days=1), time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        order_filter = ("po.date_order >= %(start)s AND po.date_order < %(stop)s "
+                        "AND (po.date_order AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date = ANY(%(dates)s)")
+        return order_filter, {'tz': self.TZ, 'start': start, 'stop': stop, 'dates': list(dates)}
+
+    @api.model
+    def refresh_dates(self, dates):
+        dates = sorted(set(dates))
+        if not dates:
+            return
+        cr = self.env.cr
+        # Refresh tanggal yang sama dari dua transaksi tidak boleh berjalan bersamaan (duplikat baris)
+        cr.execute("SELECT pg_advisory_xact_lock(hashtext('pos_sales_fact_refresh'))")
+        cr.execute("DELETE FROM pos_sales_fact WHERE vit_date = ANY(%s)", [dates])
+        order_filter, params = self._date_filter_params(dates)
+        columns = ", ".join(self.FACT_COLUMNS)
+        cr.execute(f"""
+            INSERT INTO pos_sales_fact ({columns}, create_uid, create_date, write_uid, write_date)
+            SELECT f.*, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM ({self._aggregate_query(order_filter)}) f
+        """, dict(params, uid=self.env.uid))
+        self.invalidate_model()
+
+    @api.model
+    def refresh_orders(self, orders):
+        tz = pytz.timezone(self.TZ)
+        self.refresh_dates({
+            pytz.utc.localize(order.date_order).astimezone(tz).date()
+            for order in orders if order.date_order
+        })
+
+    # Bangun ulang fact untuk rentang tanggal (default semua order), dipakai untuk backfill awal
+    @api.model
+    def backfill(self, date_from=None, date_to=None):
+        cr = self.env.cr
+        cr.execute("SELECT MIN(date_order), MAX(date_order), MAX(write_date) FROM pos_order")
+        first_order, last_order, watermark = cr.fetchone()
+        if not first_order:
+            return
+        tz = pytz.timezone(self.TZ)
+        date_from = date_from or pytz.utc.localize(first_order).astimezone(tz).date()
+        date_to = date_to or pytz.utc.localize(last_order).astimezone(tz).date()
+        # Per bulan agar satu statement tidak terlalu besar
+        day = date_from
+        while day <= date_to:
+            chunk_end = min(day + timedelta(days=30), date_to)
+            self.refresh_dates([day + timedelta(days=offset) for offset in range((chunk_end - day).days + 1)])
+            day = chunk_end + timedelta(days=1)
+        if not self.env['ir.config_parameter'].sudo().get_param(self.WATERMARK_PARAM):
+            self.env['ir.config_parameter'].sudo().set_param(self.WATERMARK_PARAM, str(watermark))
+
+    # Refresh tanggal yang punya order baru/berubah sejak watermark terakhir (order dari sesi yang masih
+    # berjalan, order hasil sync ke MC, refund, dll). Pertama kali dipanggil = backfill semua order
+    @api.model
+    def refresh_pending(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        watermark = ICP.get_param(self.WATERMARK_PARAM)
+        if not watermark:
+            self.backfill()
+            return
+
+        cr = self.env.cr
+        since = fields.Datetime.to_datetime(watermark) - self.WATERMARK_OVERLAP
+        cr.execute("""
+            SELECT DISTINCT (date_order AT TIME ZONE 'UTC' AT TIME ZONE %s)::date
+            FROM pos_order
+            WHERE write_date > %s AND date_order IS NOT NULL
+        """, [self.TZ, since])
+        dates = [row[0] for row in cr.fetchall()]
+        if not dates:
+            return
+        cr.execute("SELECT MAX(write_date) FROM pos_order")
+        new_watermark = cr.fetchone()[0]
+        self.refresh_dates(dates)
+        ICP.set_param(self.WATERMARK_PARAM, str(new_watermark))
+
+    # Dijalankan ir.cron (data/ir_cron_data.xml): backfill awal dan refresh berkala di luar request report
+    @api.model
+    def _scheduler_refresh_sales_fact(self):
+        self.sudo().refresh_pending()
+
+    # Baris report: list of dict {groupby..., 'qty', 'trx', 'amount'} untuk vit_kind pada rentang tanggal lokal.
+    # Hanya membaca: fact diperbarui oleh cron dan saat closing sesi, bukan oleh request report.
+    # Jika order_ids diisi (filter invoice/order ref), agregasi dihitung langsung dari order tersebut
+    @api.model
+    def read_facts(self, kind, date_from, date_to, groupby, order_ids=None):
+        groupby = [name for name in groupby if name in self.GROUP_FIELDS]
+        group_sql = ", ".join(groupby)
+        select_group = (group_sql + ", ") if groupby else ""
+        cr = self.env.cr
+
+        if order_ids is None:
+            source = "pos_sales_fact"
+            params = {}
+        else:
+            columns = ", ".join(self.FACT_COLUMNS)
+            source = f"(SELECT * FROM ({self._aggregate_query('po.id = ANY(%(order_ids)s)')}) f ({columns}))"
+            params = {'tz': self.TZ, 'order_ids': list(order_ids)}
+
+        params.update({'kind': kind, 'date_from': date_from, 'date_to': date_to})
+        cr.execute(f"""
+            SELECT {select_group}SUM(vit_qty), SUM(vit_trx_count), SUM(vit_amount)
+            FROM {source} fact
+            WHERE vit_kind = %(kind)s AND vit_date >= %(date_from)s AND vit_date <= %(date_to)s
+            {"GROUP BY " + group_sql if groupby else ""}
+            {"ORDER BY " + group_sql if groupby else ""}
+        """, params)
+        result = []
+        for row in cr.fetchall():
+            values = dict(zip(groupby, row[:len(groupby)]))
+            values.update({'qty': row[-3] or 0.0, 'trx': row[-2] or 0, 'amount': row[-1] or 0.0})
+            result.append(values)
+        return result
+
+
+class PosSession(models.Model):
+    _inherit = 'pos.session'
+
+    def _validate_session(self, balancing_account=False, amount_to_balance=0, bank_payment_method_diffs=None):
+        res = super()._validate_session(balancing_account, amount_to_balance, bank_payment_method_diffs)
+        # Fact penjualan untuk tanggal sesi ini langsung dibangun ulang saat closing
+        self.env['pos.sales.fact'].sudo().refresh_orders(self.order_ids)
+        return res
@@ -1,7 +1,9 @@
 # 1. Standard Python libraries
 from datetime import datetime
-import base64
-import io
+import hashlib
+import os
+import shutil
+import tempfile
 import xlsxwriter
 # 2. Odoo core
 from odoo import models, fields, _, api
@@ -9,6 +11,9 @@ from odoo.exceptions import UserError, ValidationError
 from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
 # 3. Odoo addons
 
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+FILE_CHUNK_SIZE = 1024 * 1024
+
 class SalesReportDetail(models.TransientModel):
     _name = 'sales.report'
     _description = 'Sales Report'
@@ -20,6 +25,8 @@ class SalesReportDetail(models.TransientModel):
     vit_counting_no = fields.Char(string='Counting No.')
     
     vit_customer_name_id = fields.Many2one('res.partner', string='Customer Name')
+
+    REPORT_CHUNK_SIZE = 1000
   
 # [{'id': 17, 'name': 'S01/0016', 'date_order': datetime.datetime(2025, 6, 17, 7, 45, 20), 'user_id': (2, 'Administrator'), 'amount_difference': 0.0, 'amount_tax': 0.0, 'amount_total': 0.0, 'amount_paid': 0.0, 'amount_return': 0.0, 'margin': 0.0, 'margin_percent': 0.0, 'is_total_cost_computed': True, 'lines': [31, 32], 'company_id': (1, 'Visi-Intech'), 'country_code': 'ID', 'pricelist_id': False, 'partner_id': (10, 'Astri Ririn'), 'sequence_number': 14, 'session_id': (5, 'POS/00003'), 'config_id': (1, 'S01'), 'currency_id': (12, 'IDR'), 'currency_rate': 1.0, 'state': 'paid', 'account_move': False, 'picking_ids': [79], 'picking_count': 1, 'failed_pickings': False, 'picking_type_id': (9, 'Store 01: PoS Orders'), 'procurement_group_id': False, 'floating_order_name': False, 'general_note': '', 'nb_print': 0, 'pos_reference': 'Order 00005-008-0014', 'sale_journal': (12, 'Point of Sale'), 'fiscal_position_id': False, 'payment_ids': [], 'session_move_id': False, 'to_invoice': False, 'shipping_date': False, 'is_invoiced': False, 'is_tipped': False, 'tip_amount': 0.0, 'refund_orders_count': 0, 'refunded_order_id': False, 'has_refundable_lines': True, 'ticket_code': 'k7my0', 'tracking_number': '514', 'uuid': 'f123d9f8-3721-40f3-9d18-dd3132506887', 'email': 'ririn.e@visi-intech.com', 'mobile': False, 'is_edited': False, 'has_deleted_line': False, 'order_edit_tracking': False, 'available_payment_method_ids': [2, 3, 1], 'display_name': 'S01/0016', 'create_uid': (2, 'Administrator'), 'create_date': datetime.datetime(2025, 6, 17, 7, 45, 22, 29417), 'write_uid': (2, 'Administrator'), 'write_date': datetime.datetime(2025, 6, 17, 7, 45, 22, 29417), 'l10n_id_qris_transaction_ids': [], 'employee_id': False, 'cashier': 'Administrator', 'online_payment_method_id': False, 'next_online_payment_amount': 0.0, 'table_id': False, 'customer_count': 0, 'takeaway': False, 'crm_team_id': False, 'sale_order_count': 0, 'table_stand_number': False, 'use_self_order_online_payment': False}]
     
@@ -50,8 +57,7 @@ class SalesReportDetail(models.TransientModel):
         if not orders:
             raise UserError("Tidak ada data POS di periode tersebut.")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -76,7 +82,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for order in orders:
+        for order in self._iter_chunked(orders):
             local_date_order = fields.Datetime.context_timestamp(self, order.date_order)
             for order_line in order.lines:
                 worksheet.write(row, 0, order.user_id.name or '')
@@ -110,25 +116,7 @@ class SalesReportDetail(models.TransientModel):
                 worksheet.write(row, 26, self.format_number(order_line.price_subtotal_incl) if order_line.price_subtotal_incl else '')
                 row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Detail.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Detail.xlsx')
 
     def action_generate_report_recap(self):
         # self.ensure_one()
@@ -157,8 +145,7 @@ class SalesReportDetail(models.TransientModel):
         if not orders:
             raise UserError("Tidak ada data POS di periode tersebut.")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -181,7 +168,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for order in orders:
+        for order in self._iter_chunked(orders):
             total_qty = sum(order.lines.mapped('qty'))
             total_bersih = sum(order.lines.mapped('price_subtotal_incl'))
             local_date_order = fields.Datetime.context_timestamp(self, order.date_order)
@@ -204,25 +191,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(row, 15, self.format_number(total_bersih) if total_bersih else '')
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Recap.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Recap.xlsx')
 
     def action_generate_report_spending(self):
         # self.ensure_one()
@@ -234,25 +203,14 @@ class SalesReportDetail(models.TransientModel):
         if not date_from or not date_to:
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        # account_move = self.env['account.move'].search([('name', '=', invoice_no)], limit=1)
-
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
-        # if account_move:
-        #     domain.append(('account_move', '=', account_move.id))
-        # if pos_order_ref:
-        #     domain.append(('name', '=', pos_order_ref))
-
-        orders = self.env['pos.order'].search(domain)
+        # Agregat per (tanggal, range spending) dari pos.sales.fact, tanpa membaca order satu per satu
+        Fact = self.env['pos.sales.fact']
+        facts = Fact.read_facts('order', date_from, date_to, ['vit_date', 'vit_spending_range'])
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -264,22 +222,10 @@ class SalesReportDetail(models.TransientModel):
         worksheet.write(0, 0, "Laporan History Penjualan")
         worksheet.write(1, 0, "[ {} - {} ]".format(tanggal_dari, tanggal_sampai))
         worksheet.write(2, 0, "Dicetak Tanggal {}".format(tanggal_cetak))
-        
-        range_spending = [
-            (0, 50000, "0 - 50.000"),
-            (50001, 100000, "50.001 - 100.000"),
-            (100001, 250000, "100.001 - 250.000"),
-            (250001, 500000, "250.001 - 500.000"),
-            (500001, 1000000, "500.001 - 1.000.000"),
-            (1000001, 3000000, "1.000.001 - 3.000.000"),
-            (3000001, 5000000, "3.000.001 - 5.000.000"),
-            (5000001, 20000000, "5.000.001 - 20.000.000"),
-            (20000001, float('inf'), ">20.000.001"),
-        ]
-        
-        tanggal_set = set(fields.Datetime.context_timestamp(self, order.date_order).date() for order in orders)
-        tanggal_list = sorted(list(tanggal_set))
-        
+
+        tanggal_list = sorted(set(fact['vit_date'] for fact in facts))
+        fact_dict = {(fact['vit_date'], fact['vit_spending_range']): fact for fact in facts}
+
         header = ["Nomor", "Nama"]
         for tgl in tanggal_list:
             header += [f"Qty-{tgl.strftime('%d/%m/%Y')}", f"Trx-{tgl.strftime('%d/%m/%Y')}", f"Sales-{tgl.strftime('%d/%m/%Y')}"]
@@ -288,17 +234,16 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for idx, (min_spending, max_spending, label) in enumerate(range_spending, 1):
+        for idx, (min_spending, max_spending, label) in enumerate(Fact.SPENDING_RANGES, 1):
             worksheet.write(row, 0, idx)
             worksheet.write(row, 1, label)
 
             col = 2
             for tgl in tanggal_list:
-                order_filtered = orders.filtered(lambda o: fields.Datetime.context_timestamp(self, o.date_order).date() == tgl and min_spending <= o.amount_total <= max_spending)
-
-                total_qty = sum(order_filtered.mapped(lambda o: sum(o.lines.mapped('qty'))))
-                total_trx = len(order_filtered)
-                total_sales = sum(order_filtered.mapped('amount_total'))
+                fact = fact_dict.get((tgl, idx), {})
+                total_qty = fact.get('qty', 0)
+                total_trx = fact.get('trx', 0)
+                total_sales = fact.get('amount', 0)
 
                 worksheet.write(row, col, total_qty or '')
                 worksheet.write(row, col + 1, total_trx or '')
@@ -307,25 +252,7 @@ class SalesReportDetail(models.TransientModel):
                 col += 3
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Spending.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Spending.xlsx')
     
     def action_generate_report_hourly(self):
         # self.ensure_one()
@@ -337,25 +264,12 @@ class SalesReportDetail(models.TransientModel):
         if not date_from or not date_to:
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        # account_move = self.env['account.move'].search([('name', '=', invoice_no)], limit=1)
-
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
-        # if account_move:
-        #     domain.append(('account_move', '=', account_move.id))
-        # if pos_order_ref:
-        #     domain.append(('name', '=', pos_order_ref))
-
-        orders = self.env['pos.order'].search(domain)
+        facts = self.env['pos.sales.fact'].read_facts('order', date_from, date_to, ['vit_date', 'vit_hour'])
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -369,8 +283,8 @@ class SalesReportDetail(models.TransientModel):
         worksheet.write(2, 0, "Dicetak Tanggal {}".format(tanggal_cetak))
 
         # Ambil semua tanggal unik dalam order
-        tanggal_set = set(fields.Datetime.context_timestamp(self, order.date_order).date() for order in orders)
-        tanggal_list = sorted(list(tanggal_set))
+        tanggal_list = sorted(set(fact['vit_date'] for fact in facts))
+        fact_dict = {(fact['vit_date'], fact['vit_hour']): fact for fact in facts}
 
         # Buat header kolom
         headers = ["Jam"]
@@ -387,11 +301,10 @@ class SalesReportDetail(models.TransientModel):
 
             col = 1
             for tgl in tanggal_list:
-                order_filtered = orders.filtered(lambda o: fields.Datetime.context_timestamp(self, o.date_order).date() == tgl and fields.Datetime.context_timestamp(self, o.date_order).hour == hour)
-
-                total_qty = sum(order_filtered.mapped(lambda o: sum(o.lines.mapped('qty'))))
-                total_trx = len(order_filtered)
-                total_sales = sum(order_filtered.mapped('amount_total'))
+                fact = fact_dict.get((tgl, hour), {})
+                total_qty = fact.get('qty', 0)
+                total_trx = fact.get('trx', 0)
+                total_sales = fact.get('amount', 0)
 
                 worksheet.write(row, col, total_qty or '0')
                 worksheet.write(row, col + 1, total_trx or '0')
@@ -400,25 +313,7 @@ class SalesReportDetail(models.TransientModel):
                 col += 3
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Hourly.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Hourly.xlsx')
         
     def action_generate_sales_report_loyalty_customer(self):
         # self.ensure_one()
@@ -434,8 +329,7 @@ class SalesReportDetail(models.TransientModel):
             raise UserError("Tidak ada data Loyalty pada customer tersebut.")
         loyalty_card = loyalty_card.sorted(key=lambda c: c.partner_id.name or '')
         
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -454,7 +348,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for order in loyalty_card:
+        for order in self._iter_chunked(loyalty_card):
             worksheet.write(row, 0, order.partner_id.customer_code or '')
             worksheet.write(row, 1, order.partner_id.name or '')
             worksheet.write(row, 2, order.partner_id.mobile or '')
@@ -462,25 +356,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(row, 4, self.format_number(order.points) if order.points else '0')
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Report_Loyalty_Customer.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Report_Loyalty_Customer.xlsx')
         
     def action_generate_sales_report_history_loyalty_customer(self):
         # self.ensure_one()
@@ -491,8 +367,7 @@ class SalesReportDetail(models.TransientModel):
         loyalty = self.env['loyalty.card'].search([('partner_id', 'in', customer.ids), ('program_type', '=', 'loyalty')]) # loyalty.card(130,)
         loyalty_history = self.env['loyalty.history'].search([('card_id', 'in', loyalty.ids)], order='id desc') # loyalty.card(130,)
         
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
         
@@ -516,7 +391,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for order in loyalty_history:
+        for order in self._iter_chunked(loyalty_history):
             date_order = order.pos_order_id.date_order
             local_date_order = ''
             if date_order:
@@ -560,25 +435,72 @@ class SalesReportDetail(models.TransientModel):
             # worksheet.write(row, 11, order.is_integrated or '')
             row += 1
 
+        return self._download_workbook(workbook, 'Report_History_Loyalty_Customer.xlsx')
+
+    # Filter invoice / POS order ref dipakai apa adanya; None = tanpa filter, report membaca pos.sales.fact
+    def _get_filtered_order_ids(self, invoice_no, pos_order_ref):
+        account_move = self.env['account.move'].search([('name', '=', invoice_no)], limit=1) if invoice_no else False
+        if not account_move and not pos_order_ref:
+            return None
+        domain = []
+        if account_move:
+            domain.append(('account_move', '=', account_move.id))
+        if pos_order_ref:
+            domain.append(('name', '=', pos_order_ref))
+        return self.env['pos.order'].search(domain).ids
+
+    # Record listing dibaca per chunk: prefetch ORM terbatas pada satu chunk dan cache dikosongkan
+    # sebelum chunk berikutnya, sehingga memori tidak tumbuh mengikuti jumlah order
+    def _iter_chunked(self, records):
+        for index in range(0, len(records), self.REPORT_CHUNK_SIZE):
+            yield from records.browse(records.ids[index:index + self.REPORT_CHUNK_SIZE])
+            self.env.invalidate_all()
+
+    # Workbook constant_memory ditulis ke file sementara baris demi baris (setiap report menulis
+    # baris berurutan), bukan disimpan utuh di memori
+    def _create_workbook(self):
+        fd, path = tempfile.mkstemp(prefix='report_pos_', suffix='.xlsx')
+        os.close(fd)
+        return xlsxwriter.Workbook(path, {'constant_memory': True})
+
+    def _download_workbook(self, workbook, filename):
         workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
+        try:
+            attachment = self._create_report_attachment(filename, XLSX_MIMETYPE, file_path=workbook.filename)
+        finally:
+            os.unlink(workbook.filename)
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'new',
+        }
 
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Report_History_Loyalty_Customer.xlsx',
+    # File report disalin langsung ke filestore (tanpa base64 di memori), fallback ke raw jika
+    # attachment disimpan di database
+    def _create_report_attachment(self, filename, mimetype, file_path=None, raw=None):
+        Attachment = self.env['ir.attachment']
+        vals = {
+            'name': filename,
             'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
             'res_model': self._name,
             'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
+            'mimetype': mimetype,
         }
+        if file_path is None or Attachment._storage() != 'file':
+            if raw is None:
+                with open(file_path, 'rb') as report_file:
+                    raw = report_file.read()
+            return Attachment.create(dict(vals, raw=raw))
+
+        checksum = hashlib.sha1()
+        with open(file_path, 'rb') as report_file:
+            for chunk in iter(lambda: report_file.read(FILE_CHUNK_SIZE), b''):
+                checksum.update(chunk)
+        checksum = checksum.hexdigest()
+        fname, full_path = Attachment._get_path(None, checksum)
+        if not os.path.exists(full_path):
+            shutil.copyfile(file_path, full_path)
+        return Attachment.create(dict(vals, store_fname=fname, file_size=os.path.getsize(file_path), checksum=checksum))
 
     def format_number(self, number):
         return f"{number:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
@@ -599,27 +521,16 @@ class SalesReportDetail(models.TransientModel):
         invoice_no = self.vit_invoice_no or False
         pos_order_ref = self.vit_pos_order_ref or False
 
-        account_move = self.env['account.move'].search([('name', '=', invoice_no)], limit=1)
-
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
-        if account_move:
-            domain.append(('account_move', '=', account_move.id))
-        if pos_order_ref:
-            domain.append(('name', '=', pos_order_ref))
+        if not date_from or not date_to:
+            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        orders = self.env['pos.order'].search(domain)
+        order_ids = self._get_filtered_order_ids(invoice_no, pos_order_ref)
+        facts = self.env['pos.sales.fact'].read_facts('category', date_from, date_to, ['pos_category_id', 'vit_hour'], order_ids=order_ids)
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
-        if not date_from or not date_to:
-            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -644,60 +555,26 @@ class SalesReportDetail(models.TransientModel):
         for col, title in enumerate(headers):
             worksheet.write(4, col, title, header_format)
 
+        fact_dict = {(fact['pos_category_id'], fact['vit_hour']): fact for fact in facts}
+
         row = 5
         for category in categories:
             worksheet.write(row, 0, category.name or '')
 
             col = 1
             for jam in jam_list:
-                jam_int = int(jam)
-                total_qty = 0
-                total_sales = 0
-                trx_set = set()
-
-                for order in orders:
-                    order_dt = fields.Datetime.context_timestamp(self, order.date_order)
-
-                    # Tambahan filter jam dan tanggal
-                    if order_dt.hour != jam_int:
-                        continue
-                    if not (date_from <= order_dt.date() <= date_to):
-                        continue
-
-                    matching_lines = order.lines.filtered(
-                        lambda l: category.id in l.product_id.product_tmpl_id.pos_categ_ids.ids
-                    )
-                    if matching_lines:
-                        trx_set.add(order.id)
-                        total_qty += sum(matching_lines.mapped('qty'))
-                        total_sales += sum(matching_lines.mapped('price_subtotal_incl'))
-                
+                fact = fact_dict.get((category.id, int(jam)), {})
+                total_qty = fact.get('qty', 0)
+                total_sales = fact.get('amount', 0)
+
                 worksheet.write(row, col, total_qty or '0')
-                worksheet.write(row, col + 1, len(trx_set) or '0')
+                worksheet.write(row, col + 1, fact.get('trx', 0) or '0')
                 worksheet.write(row, col + 2, self.format_number(total_sales) if total_sales else '0')
 
                 col += 3
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Hourly_by_Categories.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Hourly_by_Categories.xlsx')
     
     def action_generate_sales_report_hourly_payment(self):
         # raise ValidationError(_(f"action_generate_sales_report_hourly_payment"))
@@ -706,27 +583,16 @@ class SalesReportDetail(models.TransientModel):
         invoice_no = self.vit_invoice_no or False
         pos_order_ref = self.vit_pos_order_ref or False
 
-        account_move = self.env['account.move'].search([('name', '=', invoice_no)], limit=1)
-
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
-        if account_move:
-            domain.append(('account_move', '=', account_move.id))
-        if pos_order_ref:
-            domain.append(('name', '=', pos_order_ref))
+        if not date_from or not date_to:
+            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        orders = self.env['pos.order'].search(domain)
+        order_ids = self._get_filtered_order_ids(invoice_no, pos_order_ref)
+        facts = self.env['pos.sales.fact'].read_facts('payment', date_from, date_to, ['payment_method_id', 'vit_hour'], order_ids=order_ids)
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
-        if not date_from or not date_to:
-            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -751,114 +617,67 @@ class SalesReportDetail(models.TransientModel):
         for col, title in enumerate(headers):
             worksheet.write(4, col, title, header_format)
 
+        # Qty/Sales = seluruh line order yang memakai payment method tersebut
+        fact_dict = {(fact['payment_method_id'], fact['vit_hour']): fact for fact in facts}
+
         row = 5
         for category in payment:
             worksheet.write(row, 0, category.name or '')
 
             col = 1
             for jam in jam_list:
-                jam_int = int(jam)
-                total_qty = 0
-                total_sales = 0
-                trx_set = set()
-
-                for order in orders:
-                    order_dt = fields.Datetime.context_timestamp(self, order.date_order)
-
-                    # Tambahan filter jam dan tanggal
-                    if order_dt.hour != jam_int:
-                        continue
-                    if not (date_from <= order_dt.date() <= date_to):
-                        continue
-
-                    # Menyaring transaksi berdasarkan metode pembayaran
-                    payments = order.payment_ids.filtered(lambda p: p.payment_method_id.name == category.name)
-                    if not payments:
-                        continue  # Jika tidak ada pembayaran dengan metode yang sesuai, lanjutkan ke order berikutnya
-
-                    matching_lines = order.lines  # Semua baris produk dalam order
-                    if matching_lines:
-                        trx_set.add(order.id)
-                        total_qty += sum(matching_lines.mapped('qty'))
-                        total_sales += sum(matching_lines.mapped('price_subtotal_incl'))
-                
+                fact = fact_dict.get((category.id, int(jam)), {})
+                total_qty = fact.get('qty', 0)
+                total_sales = fact.get('amount', 0)
+
                 worksheet.write(row, col, total_qty or '0')
-                worksheet.write(row, col + 1, len(trx_set) or '0')
+                worksheet.write(row, col + 1, fact.get('trx', 0) or '0')
                 worksheet.write(row, col + 2, self.format_number(total_sales) if total_sales else '0')
 
                 col += 3
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Hourly_by_Payment.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Hourly_by_Payment.xlsx')
     
     def action_generate_sales_report_hourly_contribution_by_category(self):
         date_from = self.vit_date_from or False
         date_to = self.vit_date_to or False
 
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
+        if not date_from or not date_to:
+            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        orders = self.env['pos.order'].search(domain)
+        facts = self.env['pos.sales.fact'].read_facts('category', date_from, date_to, ['pos_category_id', 'config_id', 'user_id'])
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
-        if not date_from or not date_to:
-            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        
+        categories = self.env['pos.category'].browse({fact['pos_category_id'] for fact in facts})
+        configs = self.env['pos.config'].browse({fact['config_id'] for fact in facts if fact['config_id']})
+        users = self.env['res.users'].browse({fact['user_id'] for fact in facts if fact['user_id']})
+        category_names = {category.id: category.name for category in categories}
+        config_names = {config.id: config.name for config in configs}
+        user_names = {user.id: user.name for user in users}
+
         # Kumpulkan data per kategori
         category_data = {}
-
-        for order in orders:
-            for line in order.lines:
-                if not line.product_id:
-                    continue
-                # Ambil kategori (bisa banyak), fallback ke '-'
-                tmpl = line.product_id.product_tmpl_id
-                categories = tmpl.pos_categ_ids
-                category_names = categories.mapped('name') if categories else ['-']
-                
-                for category in categories:
-                    key = category.name
-                    data = category_data.setdefault(key, {
-                        'user': order.user_id.name or '',
-                        'store_code': order.config_id.name or '',
-                        'store_name': order.config_id.name or '',
-                        'category': key,
-                        'qty': 0,
-                        'trx_set': set(),
-                        'valuesales': 0.0,
-                        'valuestock': 0.0,  # Optional if needed
-                        'durasi': (date_to - date_from).days + 1 if date_from and date_to else 0
-                    })
-
-                    data['qty'] += line.qty
-                    data['trx_set'].add(order.id)
-                    data['valuesales'] += line.price_subtotal_incl
-
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        for fact in facts:
+            key = category_names.get(fact['pos_category_id'])
+            data = category_data.setdefault(key, {
+                'user': user_names.get(fact['user_id']) or '',
+                'store_code': config_names.get(fact['config_id']) or '',
+                'store_name': config_names.get(fact['config_id']) or '',
+                'category': key,
+                'qty': 0,
+                'trx': 0,
+                'valuesales': 0.0,
+                'durasi': (date_to - date_from).days + 1 if date_from and date_to else 0
+            })
+
+            data['qty'] += fact['qty']
+            data['trx'] += fact['trx']
+            data['valuesales'] += fact['amount']
+
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -885,7 +704,7 @@ class SalesReportDetail(models.TransientModel):
 
         row = 5
         for data in category_data.values():
-            trx_count = len(data['trx_set'])
+            trx_count = data['trx']
             ATV = data['valuesales'] / trx_count if trx_count else 0
             UPT = data['qty'] / trx_count if trx_count else 0
             AUR = data['valuesales'] / data['qty'] if data['qty'] else 0
@@ -904,76 +723,50 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(row, 10, data['durasi'])
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Contribution_by_Category.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Contribution_by_Category.xlsx')
 
     def action_generate_sales_report_hourly_contribution_by_brand(self):
         date_from = self.vit_date_from or False
         date_to = self.vit_date_to or False
 
-        domain = []
-        if date_from:
-            domain.append(('date_order', '>=', date_from))
-        if date_to:
-            domain.append(('date_order', '<=', date_to))
+        if not date_from or not date_to:
+            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        orders = self.env['pos.order'].search(domain)
+        facts = self.env['pos.sales.fact'].read_facts('brand', date_from, date_to, ['vit_brand', 'config_id', 'user_id'])
 
-        if not orders:
+        if not facts:
             raise UserError("Tidak ada data POS di periode tersebut.")
-        if not date_from or not date_to:
-            raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        
+        configs = self.env['pos.config'].browse({fact['config_id'] for fact in facts if fact['config_id']})
+        users = self.env['res.users'].browse({fact['user_id'] for fact in facts if fact['user_id']})
+        config_names = {config.id: config.name for config in configs}
+        user_names = {user.id: user.name for user in users}
+
         # Data dikumpulkan berdasarkan brand
         brand_data = {}
-
-        for order in orders:
-            for line in order.lines:
-                tmpl = line.product_id.product_tmpl_id
-                brand_name = tmpl.brand or '-'  # akses brand (Char)
-
-                key = (brand_name, order.config_id.name)
-
-                data = brand_data.setdefault(key, {
-                    'user': order.user_id.name or '',
-                    'store_code': order.config_id.name or '',
-                    'store_name': order.config_id.name or '',
-                    'brand': brand_name,
-                    'qty': 0,
-                    'trx_set': set(),
-                    'valuesales': 0.0,
-                    'valuestock': 0.0,
-                    'persenstock': 0,
-                    'persenil': 0,
-                    'durasi': (date_to - date_from).days + 1 if date_from and date_to else "-",
-                })
-
-                data['qty'] += line.qty
-                data['trx_set'].add(order.id)
-                data['valuesales'] += line.price_subtotal_incl
-                # Jika ingin valuestock, uncomment:
-                data['valuestock'] += line.product_id.standard_price * line.qty
-
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        for fact in facts:
+            brand_name = fact['vit_brand'] or '-'
+            store_name = config_names.get(fact['config_id']) or ''
+            key = (brand_name, store_name)
+
+            data = brand_data.setdefault(key, {
+                'user': user_names.get(fact['user_id']) or '',
+                'store_code': store_name,
+                'store_name': store_name,
+                'brand': brand_name,
+                'qty': 0,
+                'trx': 0,
+                'valuesales': 0.0,
+                'persenstock': 0,
+                'persenil': 0,
+                'durasi': (date_to - date_from).days + 1 if date_from and date_to else "-",
+            })
+
+            data['qty'] += fact['qty']
+            data['trx'] += fact['trx']
+            data['valuesales'] += fact['amount']
+
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -1002,7 +795,7 @@ class SalesReportDetail(models.TransientModel):
         total_valuesales = sum(d['valuesales'] for d in brand_data.values()) or 1
 
         for data in brand_data.values():
-            trx_count = len(data['trx_set'])
+            trx_count = data['trx']
             ATV = data['valuesales'] / trx_count if trx_count else 0
             UPT = data['qty'] / trx_count if trx_count else 0
             AUR = data['valuesales'] / data['qty'] if data['qty'] else 0
@@ -1022,25 +815,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(row, 10, data['durasi'])
             row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Contribution_by_Brand.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Contribution_by_Brand.xlsx')
 
     def action_generate_sales_report_cashier_transaction(self):
         date_from = self.vit_date_from or False
@@ -1068,8 +843,7 @@ class SalesReportDetail(models.TransientModel):
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -1091,7 +865,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for order in orders:
+        for order in self._iter_chunked(orders):
             local_date_order = fields.Datetime.context_timestamp(self, order.date_order)
             for order_line in order.payment_ids:
                 worksheet.write(row, 0, order.user_id.name or '')
@@ -1107,25 +881,7 @@ class SalesReportDetail(models.TransientModel):
                 worksheet.write(row, 10, order_line.payment_date.strftime('%Y-%m-%d %H:%M:%S') if order_line.payment_date else '')
                 row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Cashier_Transaction.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Cashier_Transaction.xlsx')
     
     def action_generate_sales_report_settlement_end_of_shift(self):
         date_from = self.vit_date_from or False
@@ -1145,8 +901,7 @@ class SalesReportDetail(models.TransientModel):
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -1168,7 +923,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for shift in end_shift:
+        for shift in self._iter_chunked(end_shift):
             if shift.line_ids:
                 for order_line in shift.line_ids:
                     local_date_order = fields.Datetime.context_timestamp(self, order_line.payment_date)
@@ -1202,25 +957,7 @@ class SalesReportDetail(models.TransientModel):
                 worksheet.write(row, 11, shift.session_id.name or '')
                 row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Settlement_End_of_Shift.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Settlement_End_of_Shift.xlsx')
 
     def action_generate_sales_report_settlement_end_of_day(self):
         date_from = self.vit_date_from or False
@@ -1239,8 +976,7 @@ class SalesReportDetail(models.TransientModel):
         if not date_from or not date_to:
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -1262,7 +998,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for shift in end_shift:
+        for shift in self._iter_chunked(end_shift):
             for order_line in shift.line_ids:
                 local_date_order = fields.Datetime.context_timestamp(self, order_line.payment_date)
                 worksheet.write(row, 0, shift.session_id.user_id.name or '')
@@ -1277,25 +1013,7 @@ class SalesReportDetail(models.TransientModel):
                 worksheet.write(row, 9, shift.session_id.name or '')
                 row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Settlement_End_of_Day.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
+        return self._download_workbook(workbook, 'Sales_Report_Settlement_End_of_Day.xlsx')
     
     def action_generate_sales_report_stock_counting(self):
         # raise ValidationError(_(f"action_generate_sales_report_stock_counting"))
@@ -1320,8 +1038,7 @@ class SalesReportDetail(models.TransientModel):
         if not date_from or not date_to:
             raise UserError("Tidak dapat menampilkan report. Mohon pilih Date From dan Date To")
 
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = self._create_workbook()
         worksheet = workbook.add_worksheet()
         header_format = self.get_header_format(workbook)
 
@@ -1343,7 +1060,7 @@ class SalesReportDetail(models.TransientModel):
             worksheet.write(4, col, title, header_format)
 
         row = 5
-        for stock in stock_counting:
+        for stock in self._iter_chunked(stock_counting):
             for order_line in stock.inventory_counting_ids:
                 local_inventory_date = fields.Datetime.context_timestamp(self, stock.inventory_date)
                 worksheet.write(row, 0, stock.doc_num or '')
@@ -1358,22 +1075,4 @@ class SalesReportDetail(models.TransientModel):
                 worksheet.write(row, 9, order_line.uom_id.name or '')
                 row += 1
 
-        workbook.close()
-        xlsx_data = output.getvalue()
-        output.close()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Report_Stock_Counting.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(xlsx_data),
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        })
-
-        download_url = '/web/content/%s?download=true' % attachment.id
-        return {
-            'type': 'ir.actions.act_url',
-            'url': download_url,
-            'target': 'new',
-        }
\ No newline at end of file
+        return self._download_workbook(workbook, 'Sales_Report_Stock_Counting.xlsx')